@@ -7,9 +7,11 @@ with process definitions, elements, and flows.
 """
 
 import os
+import re
 import sys
-import json
+from collections import Counter
 from datetime import datetime
+from operator import itemgetter
 
 # Add the source directory to the module path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
@@ -19,7 +21,77 @@ from src.api.api_config import APIConfig
 from src.api.prompt_builder import PromptBuilder
 from src.api.schema_loader import SchemaLoader
 from src.api.validation_layer import ValidationLayer
+from src.api.logical_validator import LogicalValidator
 from src.util.config import Config
+from src.util.fast_json import FastJSON
+
+# Characters that are replaced by '_' in output file names (same set as not str.isalnum)
+UNSAFE_FILENAME_CHARS = re.compile(r'[\W_]')
+
+def generate_entities_combined(context, schema, api_options):
+    """
+    Generates process definitions, BPMN elements and sequence flows with a single LLM call.
+    
+    Args:
+        context (dict): Generation context with description and phases
+        schema (dict): Schema definitions for all entity types
+        api_options (dict): Options for the API call
+        
+    Returns:
+        tuple: Validated (process_definitions, bpmn_elements, sequence_flows) lists
+    """
+    prompt = PromptBuilder.build_combined_entities_prompt(context, schema, {'process_definitions': 1, 'bpmn_elements': 10})
+    combined = DataGenerator.call_llm_multi(APIConfig.format_prompt(prompt),
+                                            ('process_definitions', 'bpmn_elements', 'sequence_flows'),
+                                            api_options)
+    
+    proc_data = ValidationLayer.validate('process_definitions', combined['process_definitions'], context)
+    context['process_definitions'] = proc_data
+    elements_data = ValidationLayer.validate('bpmn_elements', combined['bpmn_elements'], context)
+    context['bpmn_elements'] = elements_data
+    flows_data = ValidationLayer.validate('sequence_flows', combined['sequence_flows'], context)
+    context['sequence_flows'] = flows_data
+    return proc_data, elements_data, flows_data
+
+def generate_entities_separately(context, schema, api_options):
+    """
+    Generates process definitions, BPMN elements and sequence flows with one LLM call each.
+    Every step depends on the result of the previous one, so the calls are submitted
+    asynchronously and the local work of each step runs while the next request is in flight.
+    
+    Args:
+        context (dict): Generation context with description and phases
+        schema (dict): Schema definitions for all entity types
+        api_options (dict): Options for the API call
+        
+    Returns:
+        tuple: Validated (process_definitions, bpmn_elements, sequence_flows) lists
+    """
+    # Generate process definitions
+    proc_prompt = PromptBuilder.build_entity_prompt('process_definitions', schema['process_definitions'], context, 1)
+    proc_future = DataGenerator.call_llm_async(APIConfig.format_prompt(proc_prompt), api_options)
+    
+    # Validate the generated process definitions
+    proc_data = ValidationLayer.validate('process_definitions', proc_future.result(), context)
+    context['process_definitions'] = proc_data
+    
+    # Generate BPMN elements
+    elements_prompt = PromptBuilder.build_phase_entities_prompt('process', 'BPMN Elements', 
+                                                               list(map(itemgetter('process_id'), proc_data)), 10)
+    elements_future = DataGenerator.call_llm_async(APIConfig.format_prompt(elements_prompt), api_options)
+    
+    # Validate the generated BPMN elements
+    elements_data = ValidationLayer.validate('bpmn_elements', elements_future.result(), context)
+    context['bpmn_elements'] = elements_data
+    
+    # Generate Sequence Flows
+    flows_prompt = PromptBuilder.build_flow_prompt(context)
+    flows_future = DataGenerator.call_llm_async(APIConfig.format_prompt(flows_prompt), api_options)
+    
+    # Validate the generated Sequence Flows
+    flows_data = ValidationLayer.validate('sequence_flows', flows_future.result(), context)
+    context['sequence_flows'] = flows_data
+    return proc_data, elements_data, flows_data
 
 def main():
     """Main function that generates a complete BPMN process"""
@@ -41,8 +113,7 @@ def main():
     print(f"\nGenerating BPMN process for: {product_description}")
     
     # Prepare API options
-    api_options = APIConfig.get_default_options()
-    api_options['debug'] = True
+    api_options = APIConfig.with_overrides(debug=True)
     
     # Load schema
     schema = SchemaLoader.load()
@@ -55,61 +126,35 @@ def main():
     # 1. Generate process phases
     print("\n1. Generating process phases...")
     prompt = PromptBuilder.build_process_map_prompt(product_description)
-    phases = DataGenerator.call_llm(APIConfig.format_prompt(prompt), api_options)
+    phases = DataGenerator.call_llm_async(APIConfig.format_prompt(prompt), api_options).result()
     context['phases'] = phases
     
     print(f"   ✅ {len(phases)} process phases generated.")
     
-    # 2. Generate process definitions
-    print("\n2. Generating process definitions...")
-    proc_prompt = PromptBuilder.build_entity_prompt('process_definitions', schema['process_definitions'], context, 1)
-    proc_data = DataGenerator.call_llm(APIConfig.format_prompt(proc_prompt), api_options)
-    
-    # Validate the generated process definitions
-    proc_data = ValidationLayer.validate('process_definitions', proc_data, schema['process_definitions'], context)
-    context['process_definitions'] = proc_data
-    
-    print(f"   ✅ Process definition generated: {proc_data[0].get('process_name', 'Unnamed')}")
-    
-    # 3. Generate BPMN elements
-    print("\n3. Generating BPMN elements...")
-    elements_prompt = PromptBuilder.build_phase_entities_prompt('process', 'BPMN Elements', 
-                                                               [p['process_id'] for p in proc_data], 10)
-    elements_data = DataGenerator.call_llm(APIConfig.format_prompt(elements_prompt), api_options)
-    
-    # Validate the generated BPMN elements
-    elements_data = ValidationLayer.validate('bpmn_elements', elements_data, schema['bpmn_elements'], context)
-    context['bpmn_elements'] = elements_data
-    context['allElementRows'] = elements_data
+    # 2.-4. Generate process definitions, BPMN elements and sequence flows
+    # in one combined call, falling back to separate calls if the combined
+    # response is incomplete.
+    print("\n2. Generating process definitions, BPMN elements and sequence flows...")
+    proc_data, elements_data, flows_data = generate_entities_combined(context, schema, api_options)
+    if not (proc_data and elements_data and flows_data):
+        print("   ⚠️ Combined response incomplete, generating entities separately.")
+        proc_data, elements_data, flows_data = generate_entities_separately(context, schema, api_options)
     
+    print(f"   ✅ Process definition generated: {proc_data[0].get('process_name', 'Unnamed') if proc_data else 'None'}")
     print(f"   ✅ {len(elements_data)} BPMN elements generated.")
     
     # Count element types
-    element_types = {}
-    for elem in elements_data:
-        elem_type = elem.get('element_type', 'unknown')
-        if elem_type not in element_types:
-            element_types[elem_type] = 0
-        element_types[elem_type] += 1
-    
-    for elem_type, count in element_types.items():
-        print(f"      - {elem_type}: {count}")
+    # element_type is a required field, so every validated element has it
+    element_types = Counter(map(itemgetter('element_type'), elements_data))
     
-    # 4. Generate Sequence Flows
-    print("\n4. Generating Sequence Flows...")
-    flows_prompt = PromptBuilder.build_flow_prompt(context)
-    flows_data = DataGenerator.call_llm(APIConfig.format_prompt(flows_prompt), api_options)
-    
-    # Validate the generated Sequence Flows
-    flows_data = ValidationLayer.validate('sequence_flows', flows_data, schema['sequence_flows'], context)
-    context['sequence_flows'] = flows_data
-    context['allFlowRows'] = flows_data
+    for elem_type, count in element_types.most_common():
+        print(f"      - {elem_type}: {count}")
     
     print(f"   ✅ {len(flows_data)} Sequence Flows generated.")
     
-    # 5. Semantic validation of the entire model
-    print("\n5. Performing semantic validation...")
-    issues = ValidationLayer.validate_semantic(context)
+    # 3. Semantic validation of the entire model
+    print("\n3. Performing semantic validation...")
+    issues = LogicalValidator.check_integrity(context, api_options)
     
     if issues:
         print(f"   ⚠️ {len(issues)} semantic issues found:")
@@ -120,17 +165,18 @@ def main():
     
     # Save the generated data
     output_dir = os.path.join(os.path.dirname(__file__), "../output")
-    os.makedirs(output_dir, exist_ok=True)
+    Config.ensure_dir(output_dir)
     
     # Create filename from timestamp and product description
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_desc = "".join(c if c.isalnum() else "_" for c in product_description[:30])
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
+    safe_desc = UNSAFE_FILENAME_CHARS.sub('_', product_description[:30])
     output_file = os.path.join(output_dir, f"bpmn_process_{timestamp}_{safe_desc}.json")
     
     # Save complete context as JSON
     output_data = {
         'product_description': product_description,
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': now.isoformat(),
         'process_definitions': context.get('process_definitions', []),
         'phases': context.get('phases', []),
         'bpmn_elements': context.get('bpmn_elements', []),
@@ -139,7 +185,7 @@ def main():
     }
     
     with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+        FastJSON.dump(output_data, f, indent=True)
         
     print(f"\nThe generated process data has been saved to {output_file}.")
     
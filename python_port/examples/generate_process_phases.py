@@ -9,7 +9,7 @@ It demonstrates the basic usage of DataGenerator and PromptBuilder.
 import os
 import sys
 import json
-from datetime import datetime
+import time
 
 # Add the source directory to the module path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
@@ -39,21 +39,20 @@ def main():
     print(f"\nGenerating process phases for: {product_description}")
     
     # Prepare API options
-    api_options = APIConfig.get_default_options()
-    api_options['debug'] = True
+    api_options = APIConfig.with_overrides(debug=True)
     
     # Create prompt with PromptBuilder
     prompt = PromptBuilder.build_process_map_prompt(product_description)
     print("\nSending prompt to the LLM...")
     
     # Time the API response time
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     # Generate data with DataGenerator
     response = DataGenerator.call_llm(prompt, api_options)
     
     # Time end
-    elapsed = (datetime.now() - start_time).total_seconds()
+    elapsed = time.perf_counter() - start_time
     
     # Output the results
     print(f"\nData successfully generated! (Time: {elapsed:.2f} seconds)")
@@ -73,7 +72,7 @@ def main():
         print("-" * 30)
         # Try to save the string as is
         output_dir = os.path.join(os.path.dirname(__file__), "../output")
-        os.makedirs(output_dir, exist_ok=True)
+        Config.ensure_dir(output_dir)
         output_file = os.path.join(output_dir, "process_phases_raw.txt")
         
         with open(output_file, "w", encoding="utf-8") as f:
@@ -102,7 +101,7 @@ def main():
         
         # Save the data to a JSON file
         output_dir = os.path.join(os.path.dirname(__file__), "../output")
-        os.makedirs(output_dir, exist_ok=True)
+        Config.ensure_dir(output_dir)
         output_file = os.path.join(output_dir, "process_phases.json")
         
         with open(output_file, "w", encoding="utf-8") as f:
@@ -2,14 +2,16 @@
 """
 Test script to verify the OpenRouter API connection.
 
-This script checks if the OpenRouter API connection works correctly
-with Microsoft/Mai-DS-R1:Free model.
+This script checks if the OpenRouter API connection works correctly.
+It sends several probes to each configured model concurrently and
+reports the spread of response times per model.
 """
 
 import os
 import sys
-import json
-from datetime import datetime
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the source directory to the module path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
@@ -18,6 +20,31 @@ from src.api.data_generator import DataGenerator
 from src.api.api_config import APIConfig
 from src.util.config import Config
 
+# Number of concurrent probes sent to each model
+PROBES_PER_MODEL = 3
+
+def probe(model, prompt, api_options):
+    """
+    Sends one test prompt to a model and measures the response time.
+    
+    Args:
+        model (str): Model to probe
+        prompt (str): Formatted test prompt
+        api_options (dict): API options, the model is overridden
+        
+    Returns:
+        tuple: (model, elapsed seconds, response or None, error message or None)
+    """
+    options = dict(api_options, model=model)
+    start_time = time.perf_counter()
+    try:
+        response = DataGenerator.call_llm(prompt, options)
+        # call_llm returns an empty list when every attempt failed
+        error = None if response else "Empty response"
+    except Exception as e:
+        response, error = None, str(e)
+    return model, time.perf_counter() - start_time, response, error
+
 def main():
     """Main function testing the API connection"""
     # Ensure environment variables are loaded
@@ -26,51 +53,53 @@ def main():
         print("Please set this key and restart.")
         return
     
+    # Probe every configured model (without duplicates)
+    models = list(dict.fromkeys([Config.DEFAULT_MODEL, APIConfig.DEFAULT_MODEL]))
+    
     print("-" * 50)
     print("OpenRouter API Connection Test")
     print("-" * 50)
     print(f"Using API key: {Config.OPENROUTER_API_KEY[:8]}...{Config.OPENROUTER_API_KEY[-4:]}")
-    print(f"Using model: {Config.DEFAULT_MODEL}")
+    print(f"Using models: {', '.join(models)} ({PROBES_PER_MODEL} probes each)")
     print("-" * 50)
     
     # Prepare a simple test prompt
     test_prompt = "Please respond with a simple 'Hello World!' message to confirm connectivity."
+    formatted_prompt = APIConfig.format_prompt(test_prompt)
     
-    # Get default API options
-    api_options = APIConfig.get_default_options()
-    api_options['debug'] = True
+    # Get default API options (debug output would interleave between the probes)
+    api_options = APIConfig.with_overrides(debug=False)
     
-    # Time the API response time
-    start_time = datetime.now()
-    print(f"Sending test prompt to {Config.DEFAULT_MODEL}...")
+    # Send all probes at the same time, so the test takes as long as the slowest call
+    jobs = [model for model in models for _ in range(PROBES_PER_MODEL)]
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(lambda model: probe(model, formatted_prompt, api_options), jobs))
+    total_elapsed = time.perf_counter() - start_time
     
-    try:
-        # Call the API
-        formatted_prompt = APIConfig.format_prompt(test_prompt)
-        response = DataGenerator.call_llm(formatted_prompt, api_options)
-        
-        # Calculate elapsed time
-        elapsed = (datetime.now() - start_time).total_seconds()
-        
-        print("-" * 50)
-        print(f"API call successful! (Time: {elapsed:.2f} seconds)")
-        print("-" * 50)
-        print("Response:")
-        print(response)
-        print("-" * 50)
-        
-        return True
-    except Exception as e:
-        # Calculate elapsed time even for failures
-        elapsed = (datetime.now() - start_time).total_seconds()
+    # Report the latency spread per model
+    all_ok = True
+    for model in models:
+        model_results = [r for r in results if r[0] == model]
+        latencies = [elapsed for _, elapsed, _, error in model_results if error is None]
+        errors = [error for _, _, _, error in model_results if error is not None]
         
         print("-" * 50)
-        print(f"API call failed! (Time: {elapsed:.2f} seconds)")
-        print("-" * 50)
-        print(f"Error: {str(e)}")
-        print("-" * 50)
-        
-        return False
+        print(f"Model: {model}")
+        if latencies:
+            print(f"Successful calls: {len(latencies)}/{len(model_results)} "
+                  f"(min {min(latencies):.2f}s, median {statistics.median(latencies):.2f}s, max {max(latencies):.2f}s)")
+            print("Sample response:")
+            print(next(response for _, _, response, error in model_results if error is None))
+        for error in errors:
+            all_ok = False
+            print(f"Error: {error}")
+    
+    print("-" * 50)
+    print(f"{'API connection successful' if all_ok else 'API connection test had failures'}! (Total time: {total_elapsed:.2f} seconds)")
+    print("-" * 50)
+    
+    return all_ok
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,9 +9,7 @@ import os
 import sys
 import traceback
 import argparse
-from src.api.data_generation_pipeline import DataGenerationPipeline
 from src.api.api_config import APIConfig
-from src.bridges.bpmn_generator import BPMNGenerator
 
 # Add DEFAULT_MODEL to APIConfig if not exists
 if not hasattr(APIConfig, 'DEFAULT_MODEL'):
@@ -91,6 +89,12 @@ def main():
         help='Skip BPMN XML generation (generate only JSON data)'
     )
     
+    parser.add_argument(
+        '--parallel-batches',
+        action='store_true',
+        help='Request all BPMN element batches at once instead of one after another'
+    )
+    
     args = parser.parse_args()
     
     # Always enable debug mode for now
@@ -119,6 +123,14 @@ def main():
             print("Error: Product description is required.")
             return 1
     
+    # Import the pipeline only now - it pulls in requests, urllib3 etc.,
+    # which --help and argument errors do not need
+    from src.api.data_generation_pipeline import DataGenerationPipeline
+    from src.util.console_log import ConsoleLog
+    
+    # Show the pipeline's progress messages (and every LLM call in debug mode)
+    ConsoleLog.configure(debug=args.debug)
+    
     # Configure API options    
     api_options = {
         'model': args.model,
@@ -132,7 +144,8 @@ def main():
         'processes': 1,  # Always generate 1 process definition
         'elements': args.elements,
         'flows': args.flows,
-        'resources': 5   # Default resource count
+        'resources': 5,  # Default resource count
+        'parallel_element_batches': args.parallel_batches
     }
     
     try:
@@ -154,9 +167,12 @@ def main():
             if not args.no_xml:
                 print("\n7. Generating BPMN 2.0 XML file...")
                 
+                # The XML backend is only needed (and imported) for this step
+                from src.bridges.bpmn_generator import BPMNGenerator
+                
                 # Setup the BPMN generator
                 bpmn_output_path = os.path.join(pipeline.output_dir, "generated_process.bpmn")
-                bpmn_generator = BPMNGenerator(output_path=bpmn_output_path)
+                bpmn_generator = BPMNGenerator(output_path=bpmn_output_path, pretty=args.debug)
                 
                 # Generate the BPMN XML
                 xml_path = bpmn_generator.generate_from_context(context)
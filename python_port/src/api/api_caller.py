@@ -4,9 +4,31 @@ APICaller module handles the communication with language model APIs.
 
 import os
 import json
+import atexit
+import threading
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .schema_loader import SchemaLoader
 from ..util.config import Config
+from ..util.fast_json import FastJSON
+
+class APICallError(ValueError):
+    """
+    Raised when a request to the language model API fails for good, i.e.
+    after the session's retries (see APICaller.MAX_RETRIES) or because the
+    request cannot succeed at all (missing API key, client errors).
+    """
+    
+    def __init__(self, message, status_code=None):
+        """
+        Args:
+            message (str): Error description
+            status_code (int, optional): HTTP status of the last response
+                                         (None for connection errors and timeouts)
+        """
+        super().__init__(message)
+        self.status_code = status_code
 
 class APICaller:
     """
@@ -17,35 +39,101 @@ class APICaller:
     # Updated API endpoint URL for OpenRouter
     OPENROUTER_API_BASE = "https://openrouter.ai/api/v1/chat/completions"
     
+    # Request parameters that are passed through from the options when present
+    OPTIONAL_PARAMETERS = ('stop', 'top_p', 'presence_penalty', 'frequency_penalty')
+    
+    # Retry policy for transient failures (rate limits and server errors).
+    # Delays grow exponentially with random jitter, so concurrent calls do not
+    # retry in lockstep; a Retry-After header from the server takes precedence.
+    MAX_RETRIES = 5
+    RETRY_BACKOFF_FACTOR = 0.3
+    RETRY_BACKOFF_JITTER = 0.2
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    # Seconds to wait for the connection and for the response (the 'timeout'
+    # option overrides the latter); long completions easily take over 30 s
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 120
+    
+    # Connections kept alive to OpenRouter. Pipeline steps, lanes and element
+    # batches run concurrently, so the pool is sized above requests' default of
+    # 10; otherwise surplus connections are closed after use and reopened later.
+    POOL_MAXSIZE = 16
+    
+    _session = None
+    _session_lock = threading.Lock()
+    
+    @classmethod
+    def _get_session(cls):
+        """
+        Returns the shared HTTP session, creating it on first use.
+        Reusing one session keeps the connection to OpenRouter alive, so only
+        the first request pays for the TCP and TLS handshake. The session
+        retries failed requests according to the retry policy above.
+        
+        Returns:
+            requests.Session: Session with the static OpenRouter headers set
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    session.headers.update({
+                        "Authorization": f"Bearer {Config.OPENROUTER_API_KEY}",
+                        "Content-Type": "application/json"
+                    })
+                    retry = Retry(
+                        total=cls.MAX_RETRIES,
+                        backoff_factor=cls.RETRY_BACKOFF_FACTOR,
+                        backoff_jitter=cls.RETRY_BACKOFF_JITTER,
+                        status_forcelist=cls.RETRY_STATUS_CODES,
+                        allowed_methods=frozenset(['POST']),
+                        respect_retry_after_header=True,
+                        raise_on_status=False  # Hand the last response to raise_for_status
+                    )
+                    session.mount("https://", HTTPAdapter(pool_maxsize=cls.POOL_MAXSIZE, max_retries=retry))
+                    atexit.register(session.close)
+                    cls._session = session
+        return cls._session
+    
     @staticmethod
-    def send_prompt(prompt, options=None):
+    def _get_timeout(options):
+        """Returns the (connect, read) timeout for a request"""
+        return (APICaller.CONNECT_TIMEOUT, options.get('timeout', APICaller.READ_TIMEOUT))
+    
+    @staticmethod
+    def _get_status_code(error):
+        """Returns the HTTP status of a failed request, or None if no response arrived"""
+        response = getattr(error, 'response', None)
+        return response.status_code if response is not None else None
+    
+    @staticmethod
+    def _build_request(prompt, options, debug=False):
         """
-        Sends a prompt to the language model API and returns the response.
+        Builds the OpenRouter request payload and per-call headers.
         
         Args:
             prompt (str): The prompt text to send
-            options (dict, optional): Options to control the API request
+            options (dict): Options to control the API request
+            debug (bool, optional): Print the request summary
                 
         Returns:
-            dict: The parsed JSON response from the API
+            tuple: (data, headers) for the chat completions request
             
         Raises:
-            ValueError: If API key is missing or API call fails
+            APICallError: If API key is missing
         """
-        if options is None:
-            options = {}
-            
         # Get API key from environment
         api_key = Config.OPENROUTER_API_KEY
         if not api_key:
-            raise ValueError("OpenRouter API key not found. Please set OPENROUTER_API_KEY environment variable.")
+            raise APICallError("OpenRouter API key not found. Please set OPENROUTER_API_KEY environment variable.")
         
         # Extract API parameters
         model = options.get('model', "openai/gpt-3.5-turbo")  # Changed to a more reliable model
         temperature = options.get('temperature', Config.DEFAULT_TEMPERATURE)
         
         # Debug output
-        if options.get('debug', Config.DEBUG_MODE):
+        if debug:
             print(f"--- APICaller: Sending request to model {model} ---")
             print(f"Temperature: {temperature}")
             print(f"Prompt length: {len(prompt)} characters")
@@ -67,82 +155,175 @@ class APICaller:
             data['stream'] = False
         
         # Add optional parameters if they exist in options
-        if 'stop' in options:
-            data['stop'] = options['stop']
-        if 'top_p' in options:
-            data['top_p'] = options['top_p']
-        if 'presence_penalty' in options:
-            data['presence_penalty'] = options['presence_penalty']
-        if 'frequency_penalty' in options:
-            data['frequency_penalty'] = options['frequency_penalty']
+        for key in APICaller.OPTIONAL_PARAMETERS:
+            if key in options:
+                data[key] = options[key]
+        
+        # Structured output: the model has to answer with {"items": [...]} matching the schema
+        if options.get('json_schema'):
+            data['response_format'] = APICaller._build_response_format(options['json_schema'])
         
         # Set up headers according to OpenRouter requirements
+        # (Authorization and Content-Type are set on the shared session;
+        # the JSON body itself is serialized with FastJSON)
         headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
             "HTTP-Referer": options.get('http_referer', "https://github.com/bpmn-python-port"), 
             "X-Title": options.get('x_title', "BPMN-MATLAB Python Port")
         }
         
-        # Make the API call with retry logic
-        max_retries = 2
-        retry_count = 0
-        backoff_time = 1  # Start with 1 second backoff
+        return data, headers
+    
+    @staticmethod
+    def _build_response_format(schema):
+        """
+        Builds the response_format parameter for structured output.
+        Structured output needs an object at the top level, so the entities
+        are requested as the array in its "items" field.
         
-        while retry_count < max_retries:
-            try:
-                if options.get('debug', Config.DEBUG_MODE):
-                    print(f"API attempt {retry_count+1} of {max_retries}")
-                
-                response = requests.post(
-                    APICaller.OPENROUTER_API_BASE,
-                    headers=headers,
-                    json=data,
-                    timeout=30  # Add timeout
-                )
-                
-                # Check for rate limiting and retry if needed
-                if response.status_code == 429:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        time.sleep(backoff_time)
-                        backoff_time *= 2  # Exponential backoff
-                        continue
-                
-                # Print actual error content for debugging
-                if response.status_code >= 400 and options.get('debug', Config.DEBUG_MODE):
-                    print(f"API Error: {response.status_code} - {response.text}")
+        Args:
+            schema (dict): Schema definition of one entity (see SchemaLoader.load)
                 
-                # Handle response
-                response.raise_for_status()
-                result = response.json()
+        Returns:
+            dict: response_format value of type "json_schema"
+        """
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "entities",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "items": {"type": "array", "items": SchemaLoader.to_json_schema(schema)}
+                    },
+                    "required": ["items"]
+                }
+            }
+        }
+    
+    @staticmethod
+    def stream_prompt(prompt, options=None):
+        """
+        Sends a prompt with streaming enabled and yields the response text
+        as it is generated. OpenRouter answers with server-sent events; each
+        event carries the next piece of the completion in choices[0].delta.
+        
+        Args:
+            prompt (str): The prompt text to send
+            options (dict, optional): Options to control the API request
                 
-                # Extract the actual text response based on OpenRouter's format
-                if 'choices' in result and len(result['choices']) > 0:
-                    choice = result['choices'][0]
-                    if 'message' in choice:
-                        content = choice['message'].get('content', '')
-                        return content
-                    elif 'delta' in choice:  # For streaming responses
-                        content = choice['delta'].get('content', '')
-                        return content
-                    elif 'text' in choice:  # Fallback for non-chat models
-                        return choice['text']
+        Yields:
+            str: Pieces of the response text in the order they arrive
+            
+        Raises:
+            APICallError: If API key is missing or API call fails
+        """
+        if options is None:
+            options = {}
+        debug = bool(options.get('debug', Config.DEBUG_MODE))
+        
+        data, headers = APICaller._build_request(prompt, options, debug)
+        data['stream'] = True
+        
+        try:
+            response = APICaller._get_session().post(
+                APICaller.OPENROUTER_API_BASE,
+                headers=headers,
+                data=FastJSON.dumps_bytes(data),
+                timeout=APICaller._get_timeout(options),
+                stream=True
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise APICallError(f"Streaming API call failed: {str(e)}", APICaller._get_status_code(e))
+        
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                # Skip keep-alive lines and SSE comments (": OPENROUTER PROCESSING")
+                if not line or not line.startswith("data:"):
+                    continue
                 
-                # If we made it here but couldn't extract content, show the response
-                if options.get('debug', Config.DEBUG_MODE):
-                    print(f"Unexpected response format: {result}")
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
                 
-                return json.dumps(result)  # Return the full response as a string
+                try:
+                    event = FastJSON.loads(payload)
+                except json.JSONDecodeError:
+                    if debug:
+                        print(f"Skipping malformed stream event: {payload[:100]}")
+                    continue
                 
-            except requests.exceptions.RequestException as e:
-                if options.get('debug', Config.DEBUG_MODE):
-                    print(f"Request exception: {str(e)}")
+                choices = event.get('choices')
+                if choices:
+                    content = choices[0].get('delta', {}).get('content')
+                    if content:
+                        yield content
+    
+    @staticmethod
+    def send_prompt(prompt, options=None):
+        """
+        Sends a prompt to the language model API and returns the response.
+        
+        Args:
+            prompt (str): The prompt text to send
+            options (dict, optional): Options to control the API request
                 
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(backoff_time)
-                    backoff_time *= 2  # Exponential backoff
-                else:
-                    # No fallback, just raise the error
-                    raise ValueError(f"API call failed after {max_retries} attempts: {str(e)}")
\ No newline at end of file
+        Returns:
+            dict: The parsed JSON response from the API
+            
+        Raises:
+            APICallError: If API key is missing or API call fails
+        """
+        if options is None:
+            options = {}
+        debug = bool(options.get('debug', Config.DEBUG_MODE))
+        
+        data, headers = APICaller._build_request(prompt, options, debug)
+        
+        # Make the API call (retries are handled by the session's adapter)
+        try:
+            response = APICaller._get_session().post(
+                APICaller.OPENROUTER_API_BASE,
+                headers=headers,
+                data=FastJSON.dumps_bytes(data),
+                timeout=APICaller._get_timeout(options)
+            )
+            
+            # Print actual error content for debugging
+            if response.status_code >= 400 and debug:
+                print(f"API Error: {response.status_code} - {response.text}")
+            
+            # Handle response
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if debug:
+                print(f"Request exception: {str(e)}")
+            status_code = APICaller._get_status_code(e)
+            # Only transient failures went through the session's retries
+            if status_code in APICaller.RETRY_STATUS_CODES or isinstance(e, requests.exceptions.ConnectionError):
+                message = f"API call failed after {APICaller.MAX_RETRIES + 1} attempts: {str(e)}"
+            elif status_code is not None:
+                message = f"API call failed with status {status_code} (not retried): {str(e)}"
+            else:
+                message = f"API call failed (not retried): {str(e)}"
+            raise APICallError(message, status_code)
+        
+        result = FastJSON.loads(response.content)
+        
+        # Extract the actual text response based on OpenRouter's format
+        if 'choices' in result and len(result['choices']) > 0:
+            choice = result['choices'][0]
+            if 'message' in choice:
+                content = choice['message'].get('content', '')
+                return content
+            elif 'delta' in choice:  # For streaming responses
+                content = choice['delta'].get('content', '')
+                return content
+            elif 'text' in choice:  # Fallback for non-chat models
+                return choice['text']
+        
+        # If we made it here but couldn't extract content, show the response
+        if debug:
+            print(f"Unexpected response format: {result}")
+        
+        return FastJSON.dumps(result)  # Return the full response as a string
\ No newline at end of file
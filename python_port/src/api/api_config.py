@@ -3,6 +3,7 @@ APIConfig module handles API configuration settings for LLM API calls.
 Analogous to the MATLAB APIConfig class.
 """
 
+import functools
 from ..util.config import Config
 
 class APIConfig:
@@ -14,15 +15,41 @@ class APIConfig:
     # Set the default model explicitly
     DEFAULT_MODEL = "thudm/glm-z1-9b:free"  # Valid model for OpenRouter
     
+    # Standard instructions appended to every prompt by format_prompt
+    FORMAT_INSTRUCTIONS = (
+        "\n\nIMPORTANT: Respond exclusively with a valid JSON array or object. "
+        "Do not use code blocks with ```json or ```. "
+        "Start your answer directly with [ or { and do not add any additional text."
+    )
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _base_options():
+        """Builds the default API options once; callers only ever get copies"""
+        return Config.get_api_options()
+    
     @staticmethod
     def get_default_options():
         """
         Returns default API options for LLM interactions
         
         Returns:
-            dict: Dictionary with default API options
+            dict: Dictionary with default API options (a copy the caller may modify)
         """
-        return Config.get_api_options()
+        return dict(APIConfig._base_options())
+    
+    @staticmethod
+    def with_overrides(**overrides):
+        """
+        Returns the default API options with some values replaced.
+        
+        Args:
+            **overrides: Options to set on top of the defaults (e.g., debug=True)
+            
+        Returns:
+            dict: Dictionary with the combined API options
+        """
+        return {**APIConfig._base_options(), **overrides}
     
     @staticmethod
     def format_prompt(prompt):
@@ -35,9 +62,4 @@ class APIConfig:
         Returns:
             str: Formatted prompt with additional instructions
         """
-        format_instructions = (
-            "\n\nIMPORTANT: Respond exclusively with a valid JSON array or object. "
-            "Do not use code blocks with ```json or ```. "
-            "Start your answer directly with [ or { and do not add any additional text."
-        )
-        return prompt + format_instructions
\ No newline at end of file
+        return f"{prompt}{APIConfig.FORMAT_INSTRUCTIONS}"
\ No newline at end of file
@@ -5,8 +5,9 @@ Coordinates the entire BPMN data generation process from product description to
 """
 
 import os
-import json
 import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from .data_generator import DataGenerator
 from .prompt_builder import PromptBuilder
@@ -14,6 +15,12 @@ from .schema_loader import SchemaLoader
 from .validation_layer import ValidationLayer
 from .logical_validator import LogicalValidator
 from .api_config import APIConfig
+from ..util.fast_json import FastJSON
+
+logger = logging.getLogger(__name__)
+
+# Default output directory (python_port/output), resolved once per process
+_BASE_OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output'))
 
 class DataGenerationPipeline:
     """
@@ -23,7 +30,13 @@ class DataGenerationPipeline:
     3. Generating BPMN elements (tasks, events, gateways)
     4. Creating sequence flows
     5. Validating the integrity of the overall model
+    
+    Steps that only depend on the BPMN elements (pools and lanes, sequence
+    flows, resources) and the product specifications run concurrently.
     """
+    
+    # Worker threads for pipeline steps whose LLM calls can overlap
+    MAX_PARALLEL_STEPS = 4
 
     def __init__(self, product_description=None, api_options=None, output_dir=None):
         """
@@ -35,14 +48,15 @@ class DataGenerationPipeline:
             output_dir (str): Directory to save output files
         """
         self.product_description = product_description
-        self.api_options = api_options or APIConfig.get_default_options()
+        # Work on a copy, so the caller's options (or shared defaults) are never modified
+        self.api_options = dict(api_options) if api_options else APIConfig.get_default_options()
         
         # Include product description in API options for reference
         if product_description:
             self.api_options['product_description'] = product_description
             
         # Setup output directory
-        base_output_dir = output_dir or os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output'))
+        base_output_dir = output_dir or _BASE_OUTPUT_DIR
         
         # Create timestamped subfolder for this run
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -50,7 +64,7 @@ class DataGenerationPipeline:
         self.output_dir = os.path.join(base_output_dir, self.run_name)
         os.makedirs(self.output_dir, exist_ok=True)
         
-        # Load schemas
+        # Load schemas (cached by SchemaLoader and read-only)
         self.schemas = SchemaLoader.load()
         
         # Initialize context to store all generated data
@@ -59,13 +73,24 @@ class DataGenerationPipeline:
         # Performance metrics
         self.timings = {}
         
+        # Output file of each context entry, written to index.json at the end of a run
+        self._context_files = {}
+        
+        # Output files are written on a background thread (see _save_json),
+        # indented for reading only in debug mode; run() stops the thread when it ends
+        self._indent_json = bool(self.api_options.get('debug'))
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-io")
+        self._pending_writes = []
+        
     def run(self, batch_sizes=None):
         """
         Run the complete pipeline to generate BPMN data
         
         Args:
             batch_sizes (dict): Number of items to generate for each entity type
-                                e.g. {'elements': 10, 'flows': 15}
+                                e.g. {'elements': 10, 'flows': 15}; set
+                                'parallel_element_batches' to request all
+                                element batches at once
                                 
         Returns:
             dict: The complete context with all generated data
@@ -87,18 +112,29 @@ class DataGenerationPipeline:
             }
             
         # Record start time
-        pipeline_start = time.time()
+        pipeline_start = time.perf_counter()
         success = True
         data_generated = False
         
+        executor = ThreadPoolExecutor(max_workers=self.MAX_PARALLEL_STEPS, thread_name_prefix="pipeline")
+        specs_future = None
+        
         try:
+            # The product specifications only need the description, so request them right away
+            specs_future = executor.submit(self._request_product_specifications)
+            
             # Step 1: Generate process phases
             try:
-                self._generate_phases(batch_sizes.get('phases', 5))
+                phases_future = executor.submit(self._generate_phases, batch_sizes.get('phases', 5))
+                
+                # Every later prompt needs the phases, but the schema part can be prepared meanwhile
+                PromptBuilder.warm_schema_fields(self.schemas)
+                
+                phases_future.result()
                 if self.context.get('process_phases'):
                     data_generated = True
             except Exception as e:
-                print(f"Phase generation failed: {str(e)}")
+                logger.error("Phase generation failed: %s", e)
                 success = False
             
             # Step 2: Generate process definitions
@@ -108,7 +144,7 @@ class DataGenerationPipeline:
                     if not self.context.get('process_definitions'):
                         data_generated = False
                 except Exception as e:
-                    print(f"Process definition generation failed: {str(e)}")
+                    logger.error("Process definition generation failed: %s", e)
                     success = False
                     data_generated = False
             
@@ -117,69 +153,85 @@ class DataGenerationPipeline:
                 try:
                     elements = self._generate_bpmn_elements_recursive(
                         batch_sizes.get('elements', 10),
-                        batch_sizes.get('max_element_batches', 3)
+                        batch_sizes.get('max_element_batches', 3),
+                        parallel=batch_sizes.get('parallel_element_batches', False)
                     )
                     if not elements or len(elements) == 0:
                         data_generated = False
                 except Exception as e:
-                    print(f"BPMN elements generation failed: {str(e)}")
+                    logger.error("BPMN elements generation failed: %s", e)
                     success = False
                     data_generated = False
             
-            # Step 4: Generate pools and lanes based on generated elements
+            # Steps 4-6 only read the elements and each write their own context keys,
+            # so they run concurrently
             if success and data_generated and self.context.get('bpmn_elements'):
+                # Step 4: Generate pools and lanes based on generated elements
+                pool_batch_sizes = {
+                    'pools': batch_sizes.get('pools', 2),
+                    'lanes_per_pool': batch_sizes.get('lanes_per_pool', 3)
+                }
+                pools_future = executor.submit(self._generate_pools_and_lanes, pool_batch_sizes)
+                
+                # Step 5: Generate sequence flows
+                flows_future = executor.submit(self._generate_sequence_flows, batch_sizes.get('flows', 15))
+                
+                # Step 6: Generate resources (optional)
+                resources_future = None
+                if batch_sizes.get('resources', 0) > 0:
+                    resources_future = executor.submit(self._generate_resources, batch_sizes.get('resources', 5))
+                
                 try:
-                    pool_batch_sizes = {
-                        'pools': batch_sizes.get('pools', 2),
-                        'lanes_per_pool': batch_sizes.get('lanes_per_pool', 3)
-                    }
-                    self._generate_pools_and_lanes(pool_batch_sizes)
+                    pools_future.result()
                 except Exception as e:
-                    print(f"Pools and lanes generation failed: {str(e)}")
+                    logger.error("Pools and lanes generation failed: %s", e)
                     # Continue even if pool/lane generation fails
-            
-            # Step 5: Generate sequence flows
-            if success and data_generated and self.context.get('bpmn_elements'):
+                
                 try:
-                    self._generate_sequence_flows(batch_sizes.get('flows', 15))
+                    flows_future.result()
                     if not self.context.get('sequence_flows'):
                         data_generated = False
                 except Exception as e:
-                    print(f"Sequence flows generation failed: {str(e)}")
+                    logger.error("Sequence flows generation failed: %s", e)
                     success = False
                     data_generated = False
                 
-            # Step 6: Generate resources (optional)
-            if success and data_generated and self.context.get('bpmn_elements') and batch_sizes.get('resources', 0) > 0:
-                try:
-                    self._generate_resources(batch_sizes.get('resources', 5))
-                except Exception as e:
-                    print(f"Resource generation failed: {str(e)}")
-                    # Continue even if resource generation fails
+                if resources_future:
+                    try:
+                        resources_future.result()
+                    except Exception as e:
+                        logger.error("Resource generation failed: %s", e)
+                        # Continue even if resource generation fails
                 
             # Step 7: Check for logical integrity issues
             if success and data_generated and self.context.get('bpmn_elements') and self.context.get('sequence_flows'):
                 try:
                     self._validate_integrity()
                 except Exception as e:
-                    print(f"Integrity validation failed: {str(e)}")
+                    logger.error("Integrity validation failed: %s", e)
                     # Continue even if integrity validation fails
                 
         except Exception as e:
-            print(f"Pipeline error: {str(e)}")
+            logger.error("Pipeline error: %s", e)
             success = False
             
         finally:
-            # Save complete context regardless of success
-            self._save_json('complete_context.json', self.context)
+            total_time = time.perf_counter() - pipeline_start
+            
+            # Add product specifications to the context
+            self._add_product_specifications(specs_future)
+            
+            # Wait for steps that may still run after an error, so nothing changes the
+            # context or the timings while they are serialized below
+            executor.shutdown(wait=True)
             
             # Save timing information
-            total_time = time.time() - pipeline_start
             self.timings['total'] = total_time
             self._save_json('performance_metrics.json', self.timings)
             
-            # Add product specifications to the context
-            self._add_product_specifications()
+            # Save the index of the context files regardless of success
+            # (build_complete_context_from_index assembles the complete context from it)
+            self._save_json('index.json', self._context_files)
             
             # Generate summary report
             summary = {
@@ -197,17 +249,21 @@ class DataGenerationPipeline:
             }
             self._save_json('generation_summary.json', summary)
             
-            print(f"Pipeline completed {'successfully' if success and data_generated else 'with errors'} in {total_time:.2f} seconds")
-            print(f"Output files saved to: {self.output_dir}")
+            # Make sure every output file is on disk before returning, then stop the writer thread
+            self._wait_for_writes()
+            self._io_pool.shutdown(wait=True)
+            
+            logger.info("Pipeline completed %s in %.2f seconds", 'successfully' if success and data_generated else 'with errors', total_time)
+            logger.info("Output files saved to: %s", self.output_dir)
             
             # Return the context even if there were errors
             return self.context
             
     def _generate_phases(self, batch_size):
         """Generate process phases"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"1. Generating {batch_size} process phases...")
+        logger.info("1. Generating %s process phases...", batch_size)
         prompt = PromptBuilder.build_process_map_prompt(self.product_description)
         phases = DataGenerator.call_llm(prompt, self.api_options)
         
@@ -218,17 +274,18 @@ class DataGenerationPipeline:
         if phases:
             valid_phases = ValidationLayer.validate('process_phases', phases)
             self.context['process_phases'] = valid_phases
+            self._save_context_entry('process_phases', 'process_phases.json')
         
         # Store timing
-        self.timings['phases'] = time.time() - start_time
+        self.timings['phases'] = time.perf_counter() - start_time
         
-        print(f"   Generated {len(self.context.get('process_phases', []))} valid phases")
+        logger.info("   Generated %s valid phases", len(self.context.get('process_phases', [])))
     
     def _generate_process_definitions(self, batch_size):
         """Generate process definitions"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"2. Generating {batch_size} process definition(s)...")
+        logger.info("2. Generating %s process definition(s)...", batch_size)
         
         # Get the schema
         schema = self.schemas.get('process_definitions')
@@ -237,7 +294,7 @@ class DataGenerationPipeline:
         context_data = {'phases': self.context.get('process_phases', [])}
         prompt = PromptBuilder.build_entity_prompt('process_definitions', schema, 
                                                   context_data, batch_size)
-        process_defs = DataGenerator.call_llm(prompt, self.api_options)
+        process_defs = DataGenerator.call_llm(prompt, self._llm_options('process_definitions'))
         
         # Save raw output
         self._save_json('raw_process_definitions.json', process_defs)
@@ -245,17 +302,34 @@ class DataGenerationPipeline:
         # Validate
         valid_processes = ValidationLayer.validate('process_definitions', process_defs)
         self.context['process_definitions'] = valid_processes
+        self._save_context_entry('process_definitions', 'process_definitions.json')
         
         # Store timing
-        self.timings['process_definitions'] = time.time() - start_time
+        self.timings['process_definitions'] = time.perf_counter() - start_time
         
-        print(f"   Generated {len(self.context.get('process_definitions', []))} valid process definitions")
+        logger.info("   Generated %s valid process definitions", len(self.context.get('process_definitions', [])))
+    
+    def _llm_options(self, level):
+        """
+        Returns the API options for generating entities of one level.
+        With the 'json_mode' option the level's schema is sent along, so the
+        API enforces schema-conforming JSON instead of call_llm repairing it.
+        
+        Args:
+            level (str): Entity type, a key of self.schemas
+            
+        Returns:
+            dict: API options for DataGenerator.call_llm
+        """
+        if not self.api_options.get('json_mode') or not self.schemas.get(level):
+            return self.api_options
+        return {**self.api_options, 'json_schema': self.schemas[level]}
     
     def _generate_bpmn_elements(self, batch_size):
         """Generate BPMN elements (tasks, events, gateways)"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"3. Generating {batch_size} BPMN elements...")
+        logger.info("3. Generating %s BPMN elements...", batch_size)
         
         # Get the schema
         schema = self.schemas.get('bpmn_elements')
@@ -264,7 +338,7 @@ class DataGenerationPipeline:
         if self.context.get('process_definitions') and len(self.context['process_definitions']) > 0:
             process_def = self.context['process_definitions'][0]
             prompt = PromptBuilder.build_entity_prompt('bpmn_elements', schema, process_def, batch_size)
-            elements = DataGenerator.call_llm(prompt, self.api_options)
+            elements = DataGenerator.call_llm(prompt, self._llm_options('bpmn_elements'))
             
             # Save raw output
             self._save_json('raw_bpmn_elements.json', elements)
@@ -273,37 +347,39 @@ class DataGenerationPipeline:
             valid_elements = ValidationLayer.validate('bpmn_elements', elements, 
                                                      {'process_definitions': self.context['process_definitions']})
             self.context['bpmn_elements'] = valid_elements
-            # Also store as allElementRows for compatibility with other tools
-            self.context['allElementRows'] = valid_elements
+            # allElementRows (for compatibility with other tools) only exists in the run's index
+            self._save_context_entry('bpmn_elements', 'bpmn_elements.json', aliases=('allElementRows',))
         else:
-            print("   No process definitions available. Skipping elements generation.")
+            logger.warning("   No process definitions available. Skipping elements generation.")
         
         # Store timing
-        self.timings['bpmn_elements'] = time.time() - start_time
+        self.timings['bpmn_elements'] = time.perf_counter() - start_time
         
-        print(f"   Generated {len(self.context.get('bpmn_elements', []))} valid BPMN elements")
+        logger.info("   Generated %s valid BPMN elements", len(self.context.get('bpmn_elements', [])))
     
-    def _generate_bpmn_elements_recursive(self, batch_size, max_batches=3):
+    def _generate_bpmn_elements_recursive(self, batch_size, max_batches=3, parallel=False):
         """
         Generate BPMN elements recursively in batches, building upon previous elements
         
         Args:
             batch_size (int): Number of elements to generate per batch
             max_batches (int): Maximum number of batches to generate
+            parallel (bool): Request all batches at once instead of one after another
+                             (see _generate_bpmn_element_batches_parallel)
             
         Returns:
             list: All generated BPMN elements
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"3. Generating BPMN elements (up to {batch_size*max_batches} total in {max_batches} batches)...")
+        logger.info("3. Generating BPMN elements (up to %s total in %s batches)...", batch_size*max_batches, max_batches)
         
         # Get the schema
         schema = self.schemas.get('bpmn_elements')
         
         # If we don't have a process definition, we can't generate elements
         if not self.context.get('process_definitions') or len(self.context['process_definitions']) == 0:
-            print("   No process definitions available. Skipping elements generation.")
+            logger.warning("   No process definitions available. Skipping elements generation.")
             return []
             
         process_def = self.context['process_definitions'][0]
@@ -312,76 +388,150 @@ class DataGenerationPipeline:
         # Initialize BPMN elements in context if they don't exist
         if 'bpmn_elements' not in self.context:
             self.context['bpmn_elements'] = []
+        
+        if parallel:
+            all_elements = self._generate_bpmn_element_batches_parallel(schema, process_def, batch_size, max_batches)
+            
+            # Update the context with the merged elements
+            self.context['bpmn_elements'] = all_elements
+            self._save_context_entry('bpmn_elements', 'bpmn_elements.json', aliases=('allElementRows',))
+            
+            # Store timing
+            self.timings['bpmn_elements'] = time.perf_counter() - start_time
             
+            logger.info("   Generated a total of %s valid BPMN elements", len(all_elements))
+            return all_elements
+            
+        # The phases are the same for every batch, so serialize them only once
+        phases_json = FastJSON.dumps(self.context.get('process_phases', []))
+        
+        # IDs of the elements generated so far, kept across batches: the prompt lists
+        # them in order and validation checks new elements against them in O(1)
+        # (a dict serves as an insertion-ordered set)
+        existing_element_ids = {}
+        
         # Generate elements in batches
         for batch_num in range(1, max_batches + 1):
-            print(f"   Generating batch {batch_num}/{max_batches} of elements...")
+            logger.info("   Generating batch %s/%s of elements...", batch_num, max_batches)
             
-            # Build prompt with current context (including previously generated elements)
+            # Build prompt with current context (only the IDs of previously generated elements)
             prompt_context = {
                 **process_def,
-                'existing_elements': self.context.get('bpmn_elements', []),
-                'phases': self.context.get('process_phases', [])
+                'existing_element_ids': existing_element_ids,
+                'phases_json': phases_json
             }
             
             prompt = PromptBuilder.build_entity_prompt('bpmn_elements', schema, prompt_context, batch_size)
-            elements = DataGenerator.call_llm(prompt, self.api_options)
+            elements = DataGenerator.call_llm(prompt, self._llm_options('bpmn_elements'))
             
-            # Save raw output for this batch
-            self._save_json(f'raw_bpmn_elements_batch_{batch_num}.json', elements)
+            # Append raw output for this batch to the batch log
+            self._append_jsonl('raw_bpmn_elements.jsonl', {'batch': batch_num, 'elements': elements})
             
             # Skip further processing if no elements were generated
             if not elements:
-                print(f"   Batch {batch_num} returned no elements. Stopping element generation.")
+                logger.warning("   Batch %s returned no elements. Stopping element generation.", batch_num)
                 break
                 
-            # Validate with the current context
+            # Validate with the current context (dropping IDs earlier batches already produced)
             valid_elements = ValidationLayer.validate('bpmn_elements', elements, {
                 'process_definitions': self.context['process_definitions'],
-                'existing_elements': self.context.get('bpmn_elements', [])
+                'existing_element_ids': existing_element_ids
             })
             
             if not valid_elements:
-                print(f"   Batch {batch_num} did not produce any valid elements. Stopping element generation.")
+                logger.warning("   Batch %s did not produce any valid elements. Stopping element generation.", batch_num)
                 break
                 
             # Add the new elements to our collection
             all_elements.extend(valid_elements)
+            existing_element_ids.update(dict.fromkeys(e['element_id'] for e in valid_elements))
             
             # Update the context with the new elements
             self.context['bpmn_elements'] = all_elements
-            # Also update allElementRows for compatibility
-            self.context['allElementRows'] = all_elements
             
-            # Save the current state of all elements
-            self._save_json('bpmn_elements.json', all_elements)
-            
-            print(f"   Batch {batch_num} added {len(valid_elements)} elements (total: {len(all_elements)})")
+            logger.info("   Batch %s added %s elements (total: %s)", batch_num, len(valid_elements), len(all_elements))
             
             # Stop if we've generated enough elements or if this batch was smaller than requested
             if len(all_elements) >= batch_size * max_batches or len(valid_elements) < batch_size:
                 break
+        
+        # Save all elements once, after the last batch
+        self._save_context_entry('bpmn_elements', 'bpmn_elements.json', aliases=('allElementRows',))
                 
         # Store timing
-        self.timings['bpmn_elements'] = time.time() - start_time
+        self.timings['bpmn_elements'] = time.perf_counter() - start_time
         
-        print(f"   Generated a total of {len(all_elements)} valid BPMN elements")
+        logger.info("   Generated a total of %s valid BPMN elements", len(all_elements))
         return all_elements
     
+    def _generate_bpmn_element_batches_parallel(self, schema, process_def, batch_size, max_batches):
+        """
+        Request all element batches at once and merge them.
+        The element prompt does not depend on the elements of earlier batches,
+        so the batches can run concurrently; each one is asked for its own part
+        of the process and its own ID range instead.
+        
+        Args:
+            schema (dict): Schema for BPMN elements
+            process_def (dict): Process definition the elements belong to
+            batch_size (int): Number of elements to generate per batch
+            max_batches (int): Number of batches to generate
+            
+        Returns:
+            list: Validated elements of all batches, without duplicate element IDs
+        """
+        logger.info("   Generating %s batches of elements in parallel...", max_batches)
+        
+        # The phases are the same for every batch, so serialize them only once
+        phases_json = FastJSON.dumps(self.context.get('process_phases', []))
+        
+        prompts = [
+            PromptBuilder.build_entity_prompt('bpmn_elements', schema, {
+                **process_def,
+                'phases_json': phases_json,
+                'batch_index': batch_index,
+                'batch_count': max_batches
+            }, batch_size)
+            for batch_index in range(max_batches)
+        ]
+        batches = DataGenerator.call_llm_many(prompts, self._llm_options('bpmn_elements'))
+        
+        # Merge in batch order and drop elements whose ID an earlier batch already used
+        merged = []
+        seen_ids = set()
+        for batch_num, elements in enumerate(batches, 1):
+            # Append raw output for this batch to the batch log
+            self._append_jsonl('raw_bpmn_elements.jsonl', {'batch': batch_num, 'elements': elements})
+            if not isinstance(elements, list):
+                continue
+            
+            for element in elements:
+                element_id = element.get('element_id') if isinstance(element, dict) else None
+                if element_id:
+                    if element_id in seen_ids:
+                        continue
+                    seen_ids.add(element_id)
+                merged.append(element)
+        
+        # Validate once, so generated IDs are numbered across all batches
+        return ValidationLayer.validate('bpmn_elements', merged, {
+            'process_definitions': self.context['process_definitions']
+        })
+    
     def _generate_sequence_flows(self, batch_size):
         """Generate sequence flows between elements"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print("4. Generating sequence flows...")
+        logger.info("4. Generating sequence flows...")
         
         # Need elements to create flows between them
         if not self.context.get('bpmn_elements'):
-            print("   No BPMN elements available. Skipping flow generation.")
+            logger.warning("   No BPMN elements available. Skipping flow generation.")
             return
         
         # Build prompt with elements as context
         prompt = PromptBuilder.build_flow_prompt(self.context)
-        flows = DataGenerator.call_llm(prompt, self.api_options)
+        flows = DataGenerator.call_llm(prompt, self._llm_options('sequence_flows'))
         
         # Save raw output
         self._save_json('raw_sequence_flows.json', flows)
@@ -389,23 +539,23 @@ class DataGenerationPipeline:
         # Validate
         valid_flows = ValidationLayer.validate('sequence_flows', flows, self.context)
         self.context['sequence_flows'] = valid_flows
-        # Also store as allFlowRows for compatibility with other tools
-        self.context['allFlowRows'] = valid_flows
+        # allFlowRows (for compatibility with other tools) only exists in the run's index
+        self._save_context_entry('sequence_flows', 'sequence_flows.json', aliases=('allFlowRows',))
         
         # Store timing
-        self.timings['sequence_flows'] = time.time() - start_time
+        self.timings['sequence_flows'] = time.perf_counter() - start_time
         
-        print(f"   Generated {len(self.context.get('sequence_flows', []))} valid sequence flows")
+        logger.info("   Generated %s valid sequence flows", len(self.context.get('sequence_flows', [])))
     
     def _generate_resources(self, batch_size):
         """Generate resources for tasks"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"5. Generating {batch_size} resources...")
+        logger.info("5. Generating %s resources...", batch_size)
         
         # Need elements to assign resources to them
         if not self.context.get('bpmn_elements'):
-            print("   No BPMN elements available. Skipping resource generation.")
+            logger.warning("   No BPMN elements available. Skipping resource generation.")
             return
             
         # Get the schema
@@ -413,7 +563,7 @@ class DataGenerationPipeline:
         
         # Build prompt with elements as context
         prompt = PromptBuilder.build_resource_prompt(self.context, schema)
-        resources = DataGenerator.call_llm(prompt, self.api_options)
+        resources = DataGenerator.call_llm(prompt, self._llm_options('resources'))
         
         # Save raw output
         self._save_json('raw_resources.json', resources)
@@ -421,47 +571,46 @@ class DataGenerationPipeline:
         # Validate
         valid_resources = ValidationLayer.validate('resources', resources, self.context)
         self.context['resources'] = valid_resources
+        self._save_context_entry('resources', 'resources.json')
         
         # Store timing
-        self.timings['resources'] = time.time() - start_time
+        self.timings['resources'] = time.perf_counter() - start_time
         
-        print(f"   Generated {len(self.context.get('resources', []))} valid resources")
+        logger.info("   Generated %s valid resources", len(self.context.get('resources', [])))
     
     def _validate_integrity(self):
         """Check logical integrity of the BPMN model"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print("6. Validating logical integrity...")
+        logger.info("6. Validating logical integrity...")
         
         # Need elements and flows to validate integrity
         if not self.context.get('bpmn_elements') or not self.context.get('sequence_flows'):
-            print("   Missing elements or flows. Skipping integrity validation.")
+            logger.warning("   Missing elements or flows. Skipping integrity validation.")
             return
             
         # Perform logical integrity check
         issues = LogicalValidator.check_integrity(self.context, self.api_options)
         
-        # Save results
-        self._save_json('integrity_issues.json', issues)
-        
-        # Store in context
+        # Store in context and save results
         self.context['integrity_issues'] = issues
+        self._save_context_entry('integrity_issues', 'integrity_issues.json')
         
         # Store timing
-        self.timings['integrity_validation'] = time.time() - start_time
+        self.timings['integrity_validation'] = time.perf_counter() - start_time
         
         # Check if we got a proper list of issues
-        if isinstance(issues, list):
-            if len(issues) > 0:
-                print(f"   Found {len(issues)} integrity issues:")
-                for i, issue in enumerate(issues[:5]):  # Show at most 5 issues
-                    print(f"     - {issue.get('problem_type', 'Unknown')}: {issue.get('description', 'No description')}")
-                if len(issues) > 5:
-                    print(f"     - ... and {len(issues) - 5} more issues")
-            else:
-                print("   No integrity issues found!")
-        else:
-            print("   Integrity validation returned non-standard format")
+        if not isinstance(issues, list):
+            logger.warning("   Integrity validation returned non-standard format")
+        elif not issues:
+            logger.info("   No integrity issues found!")
+        elif logger.isEnabledFor(logging.INFO):
+            # Build the preview only if it is shown
+            logger.info("   Found %s integrity issues:", len(issues))
+            for issue in issues[:5]:  # Show at most 5 issues
+                logger.info("     - %s: %s", issue.get('problem_type', 'Unknown'), issue.get('description', 'No description'))
+            if len(issues) > 5:
+                logger.info("     - ... and %s more issues", len(issues) - 5)
     
     def _generate_pools_and_lanes(self, batch_sizes=None):
         """
@@ -477,9 +626,9 @@ class DataGenerationPipeline:
                 'lanes_per_pool': 3
             }
             
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        print(f"6. Generating {batch_sizes['pools']} pools with up to {batch_sizes['lanes_per_pool']} lanes each...")
+        logger.info("6. Generating %s pools with up to %s lanes each...", batch_sizes['pools'], batch_sizes['lanes_per_pool'])
         
         # Get the schema
         pool_schema = self.schemas.get('pools', {})
@@ -487,7 +636,7 @@ class DataGenerationPipeline:
         
         # Need elements to associate with pools and lanes
         if not self.context.get('bpmn_elements'):
-            print("   No BPMN elements available. Skipping pools and lanes generation.")
+            logger.warning("   No BPMN elements available. Skipping pools and lanes generation.")
             return
             
         # Initialize pools and lanes in context if they don't exist
@@ -498,7 +647,7 @@ class DataGenerationPipeline:
             
         # Generate pools first
         pools_prompt = PromptBuilder.build_pool_prompt(self.context, pool_schema, batch_sizes['pools'])
-        pools = DataGenerator.call_llm(pools_prompt, self.api_options)
+        pools = DataGenerator.call_llm(pools_prompt, self._llm_options('pools'))
         
         # Save raw pools output
         self._save_json('raw_pools.json', pools)
@@ -509,46 +658,133 @@ class DataGenerationPipeline:
             # Append to existing pools if any
             self.context['pools'].extend(valid_pools)
             # Save pools
-            self._save_json('pools.json', self.context['pools'])
-            
-            # For each pool, generate lanes
-            for pool in valid_pools:
-                lanes_prompt = PromptBuilder.build_lane_prompt(pool, self.context, lane_schema, batch_sizes['lanes_per_pool'])
-                lanes = DataGenerator.call_llm(lanes_prompt, self.api_options)
-                
-                # Save raw lanes output for this pool
-                self._save_json(f'raw_lanes_pool_{pool["pool_id"]}.json', lanes)
+            self._save_context_entry('pools', 'pools.json')
+            
+            # Request the lanes of all pools concurrently (each pool only needs its own data)
+            if valid_pools:
+                lanes_prompts = [
+                    PromptBuilder.build_lane_prompt(pool, self.context, lane_schema, batch_sizes['lanes_per_pool'])
+                    for pool in valid_pools
+                ]
+                lanes_per_pool = DataGenerator.call_llm_many(lanes_prompts, self._llm_options('lanes'))
                 
-                # Validate lanes
-                if lanes:
-                    valid_lanes = ValidationLayer.validate('lanes', lanes, {'pool': pool, **self.context})
-                    # Append to existing lanes
-                    self.context['lanes'].extend(valid_lanes)
+                # Append to existing lanes in pool order
+                for pool, lanes in zip(valid_pools, lanes_per_pool):
+                    self.context['lanes'].extend(self._validate_lanes_for_pool(pool, lanes))
                     
             # Save all lanes
-            self._save_json('lanes.json', self.context['lanes'])
+            self._save_context_entry('lanes', 'lanes.json')
             
         # Store timing
-        self.timings['pools_and_lanes'] = time.time() - start_time
+        self.timings['pools_and_lanes'] = time.perf_counter() - start_time
+        
+        logger.info("   Generated %s pools and %s lanes", len(self.context.get('pools', [])), len(self.context.get('lanes', [])))
+    
+    def _validate_lanes_for_pool(self, pool, lanes):
+        """
+        Save and validate the generated lanes of a single pool
+        
+        Args:
+            pool (dict): Pool the lanes were generated for
+            lanes (list): Unprocessed LLM result for the pool
+            
+        Returns:
+            list: Validated lanes of the pool
+        """
+        # Save raw lanes output for this pool
+        self._save_json(f'raw_lanes_pool_{pool["pool_id"]}.json', lanes)
+        
+        # Validate lanes
+        if not lanes:
+            return []
+        return ValidationLayer.validate('lanes', lanes, {'pool': pool, **self.context})
+    
+    def _save_context_entry(self, key, filename, aliases=()):
+        """
+        Save a context entry to its own file and list it in the run's index
         
-        print(f"   Generated {len(self.context.get('pools', []))} pools and {len(self.context.get('lanes', []))} lanes")
+        Args:
+            key (str): Context key to save
+            filename (str): File the entry is written to
+            aliases (tuple): Legacy names listed in the index for the same file
+                             (e.g., allElementRows); they are not kept in the context
+        """
+        self._save_json(filename, self.context.get(key))
+        for name in (key, *aliases):
+            self._context_files[name] = filename
+    
+    @staticmethod
+    def build_complete_context_from_index(run_dir):
+        """
+        Assemble the complete context of a finished run from its output files.
+        The pipeline writes every context entry to its own file and lists them
+        in index.json instead of dumping the whole context again at the end.
+        
+        Args:
+            run_dir (str): Output directory of the run (pipeline.output_dir)
+            
+        Returns:
+            dict: The context as it was at the end of the run
+        """
+        with open(os.path.join(run_dir, 'index.json'), 'rb') as f:
+            index = FastJSON.loads(f.read())
+        
+        # Aliases share a file, so each file is read only once
+        loaded = {}
+        context = {}
+        for key, filename in index.items():
+            if filename not in loaded:
+                with open(os.path.join(run_dir, filename), 'rb') as f:
+                    loaded[filename] = FastJSON.loads(f.read())
+            context[key] = loaded[filename]
+        return context
     
     def _save_json(self, filename, data):
-        """Save data to JSON file"""
-        filepath = os.path.join(self.output_dir, filename)
+        """
+        Save data to JSON file without waiting for the disk.
+        The data is serialized right away, so later changes to it do not end up
+        in the file; only the write itself runs on the pipeline's I/O thread.
+        """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            content = FastJSON.dumps_bytes(data, indent=self._indent_json)
         except Exception as e:
-            print(f"Error saving {filename}: {str(e)}")
+            logger.error("Error saving %s: %s", filename, e)
+            return
+        self._pending_writes.append(self._io_pool.submit(self._write_file, filename, content))
     
-    def _add_product_specifications(self):
-        """Add detailed product specifications to the context data"""
-        if not self.product_description:
+    def _append_jsonl(self, filename, record):
+        """
+        Append a record as one line to a JSON Lines file without waiting for the disk.
+        Appends go through the same single I/O thread, so lines never interleave.
+        """
+        try:
+            line = FastJSON.dumps_bytes(record) + b"\n"
+        except Exception as e:
+            logger.error("Error saving %s: %s", filename, e)
             return
-            
-        print("7. Adding product specifications...")
+        self._pending_writes.append(self._io_pool.submit(self._write_file, filename, line, 'ab'))
+    
+    def _write_file(self, filename, content, mode='wb'):
+        """Write (or append) UTF-8 encoded output to a file in the output directory"""
+        filepath = os.path.join(self.output_dir, filename)
+        try:
+            with open(filepath, mode) as f:
+                f.write(content)
+        except Exception as e:
+            logger.error("Error saving %s: %s", filename, e)
+    
+    def _wait_for_writes(self):
+        """Block until all files passed to _save_json have been written"""
+        pending, self._pending_writes = self._pending_writes, []
+        wait(pending)
+    
+    def _request_product_specifications(self):
+        """
+        Request detailed product specifications from the LLM
         
+        Returns:
+            list/dict: The unprocessed LLM result
+        """
         # Build prompt to get product specifications
         prompt = f"""
         Based on the description: "{self.product_description}", provide detailed specifications 
@@ -567,9 +803,24 @@ class DataGenerationPipeline:
         Return only the JSON object with no additional text.
         """
         
+        return DataGenerator.call_llm(prompt, self.api_options)
+    
+    def _add_product_specifications(self, specs_future=None):
+        """
+        Add detailed product specifications to the context data
+        
+        Args:
+            specs_future (Future, optional): Pending result of _request_product_specifications;
+                                             the specifications are requested now if not given
+        """
+        if not self.product_description:
+            return
+            
+        logger.info("7. Adding product specifications...")
+        
         try:
             # Get specifications from LLM
-            specs = DataGenerator.call_llm(prompt, self.api_options)
+            specs = specs_future.result() if specs_future else self._request_product_specifications()
             
             # If result isn't a dict, try the first item if it's a list
             if isinstance(specs, list) and len(specs) > 0:
@@ -577,18 +828,20 @@ class DataGenerationPipeline:
                 
             # If we got valid specs
             if isinstance(specs, dict) and "product_name" in specs:
-                # Add to context
+                # Add to context and save specifications
                 self.context['product_specifications'] = specs
-                # Save specifications
-                self._save_json('product_specifications.json', specs)
-                print(f"   Added detailed specifications for {specs.get('product_name', '')}")
+                self._save_context_entry('product_specifications', 'product_specifications.json')
+                logger.info("   Added detailed specifications for %s", specs.get('product_name', ''))
             else:
-                print("   Failed to generate valid product specifications structure")
+                logger.warning("   Failed to generate valid product specifications structure")
         except Exception as e:
-            print(f"   Failed to generate product specifications: {str(e)}")
+            logger.warning("   Failed to generate product specifications: %s", e)
 
 
 if __name__ == "__main__":
+    from ..util.console_log import ConsoleLog
+    ConsoleLog.configure()
+    
     # Example usage
     description = "An automated warehouse management system with robotic picking and sorting"
     pipeline = DataGenerationPipeline(description)
@@ -4,7 +4,18 @@ DataGenerator module provides methods to call LLM API and process the response.
 
 import json
 import re
-from .api_caller import APICaller
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from .api_caller import APICaller, APICallError
+from .response_cache import ResponseCache
+from .json_stream_parser import JsonStreamParser
+from ..util.fast_json import FastJSON
+
+logger = logging.getLogger(__name__)
+
+# First opening bracket of a JSON array or object
+_JSON_START = re.compile(r'[\[\{]')
 
 class DataGenerator:
     """
@@ -12,6 +23,116 @@ class DataGenerator:
     and convert the response to structured data.
     """
     
+    # Maximum number of LLM requests that may be in flight at the same time
+    MAX_CONCURRENT_CALLS = 8
+    
+    _executor = None
+    _executor_lock = threading.Lock()
+    
+    @classmethod
+    def _get_executor(cls):
+        """Returns the shared worker pool used for concurrent LLM calls"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=cls.MAX_CONCURRENT_CALLS,
+                        thread_name_prefix="llm"
+                    )
+        return cls._executor
+    
+    @staticmethod
+    def call_llm_async(prompt, options=None):
+        """
+        Submits a prompt to the language model without blocking the caller.
+        The request runs on a shared worker pool, so independent prompts and
+        local work (validation, output) can overlap with the API latency.
+        
+        Args:
+            prompt (str): The prompt to send to the LLM
+            options (dict, optional): Options for API call
+            
+        Returns:
+            concurrent.futures.Future: Future resolving to the result of call_llm
+        """
+        return DataGenerator._get_executor().submit(DataGenerator.call_llm, prompt, options)
+    
+    @staticmethod
+    def call_llm_many(prompts, options=None, timeout=None):
+        """
+        Sends independent prompts concurrently (e.g., the lane prompts of all
+        pools) and returns their results in the order of the prompts. At most
+        MAX_CONCURRENT_CALLS requests are in flight at the same time.
+        
+        Must not be called from a task running on the shared worker pool itself.
+        
+        Args:
+            prompts (iterable): The prompts to send to the LLM
+            options (dict, optional): Options for API call, shared by all prompts
+            timeout (float, optional): Seconds to wait for all results
+            
+        Returns:
+            list: The result of call_llm for each prompt
+            
+        Raises:
+            TimeoutError: If not all results are available within the timeout
+        """
+        futures = [DataGenerator.call_llm_async(prompt, options) for prompt in prompts]
+        _, not_done = wait(futures, timeout)
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            raise TimeoutError(f"{len(not_done)} of {len(futures)} LLM calls did not finish within {timeout} seconds")
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def call_llm_multi(prompt, keys, options=None):
+        """
+        Sends a prompt that asks for several entity types at once (see
+        PromptBuilder.build_combined_entities_prompt) and splits the single
+        JSON object of the response into one list per entity type.
+        
+        Args:
+            prompt (str): The prompt to send to the LLM
+            keys (iterable): Entity types expected as keys of the response object
+            options (dict, optional): Options for API call
+            
+        Returns:
+            dict: One list per key; a key missing from the response maps to an empty list
+        """
+        result = DataGenerator.call_llm(prompt, options)
+        if not isinstance(result, dict):
+            logger.warning("Combined response is not a JSON object.")
+            result = {}
+        
+        sections = {}
+        for key in keys:
+            rows = result.get(key)
+            sections[key] = rows if isinstance(rows, list) else []
+        return sections
+    
+    @staticmethod
+    def stream_llm(prompt, options=None):
+        """
+        Sends a prompt with streaming enabled and yields the items of the
+        returned JSON array as soon as each one is complete. The result can be
+        passed straight to ValidationLayer.validate, which then validates the
+        first items while the model is still generating the rest.
+        
+        Unlike call_llm there is no fix-it retry: a malformed item is skipped.
+        
+        Args:
+            prompt (str): The prompt to send to the LLM
+            options (dict, optional): Options for API call
+            
+        Yields:
+            dict: The items of the response array in the order they arrive
+        """
+        parser = JsonStreamParser()
+        logger.debug("--- Streaming LLM response ---")
+        for chunk in APICaller.stream_prompt(prompt, options):
+            yield from parser.feed(chunk)
+    
     @staticmethod
     def call_llm(prompt, options=None):
         """
@@ -20,7 +141,8 @@ class DataGenerator:
         
         Args:
             prompt (str): The prompt to send to the LLM
-            options (dict, optional): Options for API call
+            options (dict, optional): Options for API call; 'json_schema' (the schema
+                                      definition of one entity) requests structured output
             
         Returns:
             list/dict: The processed data from the LLM
@@ -34,37 +156,51 @@ class DataGenerator:
         rows = []  # Initialize output
         last_error = None
         text = ""
+        use_cache = ResponseCache.is_enabled(options)
+        cache_ttl = ResponseCache.get_ttl(options) if use_cache else None
+        # With a schema the API enforces valid JSON, so a fix-it round trip cannot help
+        json_mode = bool(options.get('json_schema'))
         
         while retry_count <= max_retries:
             try:
                 # Use the current prompt (original or fix-it version)
                 current_prompt = prompt
                 
-                # Make the API call
-                print(f"--- Calling LLM (Attempt {retry_count + 1}/{max_retries + 1}) ---")
-                text = APICaller.send_prompt(current_prompt, options)
+                # Replay the response from the cache if this prompt was answered before
+                cache_key = ResponseCache.make_key(current_prompt, options) if use_cache else None
+                cached_text = ResponseCache.lookup(cache_key, cache_ttl) if use_cache else None
+                
+                if cached_text is not None:
+                    logger.debug("--- Using cached LLM response ---")
+                    text = cached_text
+                else:
+                    # Make the API call
+                    logger.debug("--- Calling LLM (Attempt %d/%d) ---", retry_count + 1, max_retries + 1)
+                    text = APICaller.send_prompt(current_prompt, options)
+                raw_text = text
                 
                 # Process the response
                 if not text:
                     if retry_count < max_retries:
                         retry_count += 1
-                        print("Empty response received, retrying...")
+                        logger.warning("Empty response received, retrying...")
                         continue
                     else:
-                        print("Empty response on final attempt.")
+                        logger.error("Empty response on final attempt.")
                         return []  # Return empty list after all retries
                 
-                # Special handling for models that might return JSON as string
-                if isinstance(text, str) and text.startswith("{") and "message" in text and "Hello" not in text:
+                # Special handling for models that wrap the JSON in {"message": "..."}.
+                # text is always a str here (send_prompt and the cache return str), and
+                # only its start is checked, so other responses are not scanned or parsed twice
+                if text[:200].lstrip().startswith('{"message"'):
                     try:
-                        # Try to parse it as a dict that contains a message with JSON
-                        parsed_container = json.loads(text)
+                        parsed_container = FastJSON.loads(text)
                         if isinstance(parsed_container, dict) and "message" in parsed_container:
                             message_content = parsed_container["message"]
-                            if isinstance(message_content, str):
-                                # Try to parse the message content as JSON
+                            # Unwrap only a message that itself is JSON (not e.g. a greeting)
+                            if isinstance(message_content, str) and _JSON_START.match(message_content.lstrip()):
                                 text = message_content
-                    except:
+                    except json.JSONDecodeError:
                         pass  # Continue with regular processing if this fails
                 
                 # Clean the text - remove markdown code blocks if present
@@ -72,17 +208,28 @@ class DataGenerator:
                 
                 # Try to parse JSON
                 try:
-                    rows = json.loads(text)
+                    # A response that does not end with the bracket matching its first one
+                    # was cut off (or is no JSON at all), so parsing it would only fail
+                    if not DataGenerator._has_matching_brackets(text):
+                        raise json.JSONDecodeError("Incomplete JSON response", text, len(text))
+                    rows = FastJSON.loads(text)
+                    
+                    # Structured output wraps the entities in {"items": [...]}
+                    if json_mode and isinstance(rows, dict) and isinstance(rows.get('items'), list):
+                        rows = rows['items']
                     
                     # Validate the result based on expected format
                     if isinstance(rows, (list, dict)):
+                        # Only responses that parsed successfully are worth replaying
+                        if use_cache and cached_text is None:
+                            ResponseCache.update(cache_key, raw_text)
                         return rows
                     else:
                         raise ValueError(f"Response is not a list or dictionary: {type(rows)}")
                     
                 except json.JSONDecodeError as je:
                     last_error = je
-                    if retry_count < max_retries:
+                    if retry_count < max_retries and not json_mode:
                         # Create a fix-it prompt
                         fix_prompt = (
                             f"The following text should be valid JSON but has errors. "
@@ -90,26 +237,32 @@ class DataGenerator:
                         )
                         prompt = fix_prompt
                         retry_count += 1
-                        print(f"JSON decode error: {je}. Retrying with fix-it prompt...")
+                        logger.warning("JSON decode error: %s. Retrying with fix-it prompt...", je)
                         continue
                     else:
                         # Try to extract JSON-like content as a last resort
-                        print(f"Failed to parse JSON after retries. Attempting extraction...")
+                        logger.warning("Failed to parse JSON after retries. Attempting extraction...")
                         rows = DataGenerator._extract_json_content(text)
                         if rows:
                             return rows
                         else:
-                            print("JSON extraction failed.")
+                            logger.error("JSON extraction failed.")
                             return []  # Return empty list if JSON extraction fails
             
+            except APICallError as e:
+                # The session already retried transient HTTP errors with backoff,
+                # and the remaining errors (client errors, missing key) are permanent
+                logger.error("API error: %s", e)
+                return []
+            
             except Exception as e:
                 last_error = e
                 if retry_count < max_retries:
                     retry_count += 1
-                    print(f"Error: {e}. Retrying...")
+                    logger.warning("Error: %s. Retrying...", e)
                     continue
                 else:
-                    print(f"Error on final attempt: {e}")
+                    logger.error("Error on final attempt: %s", e)
                     return []  # Return empty list after all retries
         
         # This should only be reached if all retries failed
@@ -127,19 +280,31 @@ class DataGenerator:
             str: Cleaned text with only JSON content
         """
         # Remove code block markers
-        text = re.sub(r'```(?:json)?\s*|\s*```', '', text)
+        text = text.replace('```json', '').replace('```', '').strip()
         
-        # Find the first { or [ and the last } or ]
-        start_match = re.search(r'[\[\{]', text)
-        end_match = re.search(r'[\]\}](?=[^\]\}]*$)', text)
+        # Find the first { or [ and the last } or ] (rfind scans from the end, so
+        # this stays linear even for long responses with many closing brackets)
+        start_match = _JSON_START.search(text)
+        end = max(text.rfind(']'), text.rfind('}'))
         
-        if start_match and end_match:
-            start = start_match.start()
-            end = end_match.start() + 1
-            return text[start:end]
+        if start_match and end >= 0:
+            return text[start_match.start():end + 1]
         
         return text
     
+    @staticmethod
+    def _has_matching_brackets(text):
+        """
+        Cheap completeness check for cleaned response text (see _clean_json_text).
+        
+        Args:
+            text (str): Cleaned response text
+            
+        Returns:
+            bool: True if the text starts with [ or { and ends with the matching ] or }
+        """
+        return len(text) >= 2 and (text[0], text[-1]) in (('[', ']'), ('{', '}'))
+    
     @staticmethod
     def _extract_json_content(text):
         """
@@ -153,28 +318,22 @@ class DataGenerator:
             list/dict: Extracted data or empty list if extraction fails
         """
         try:
-            # Try to find content within square brackets or braces
-            list_match = re.search(r'\[(.*)\]', text, re.DOTALL)
-            dict_match = re.search(r'\{(.*)\}', text, re.DOTALL)
+            # Find the content within the outermost square brackets or braces
+            list_start, list_end = text.find('['), text.rfind(']')
+            dict_start, dict_end = text.find('{'), text.rfind('}')
             
-            if list_match:
-                # Try to reconstruct a list
-                items = list_match.group(1).split('},')
-                if len(items) > 1:
-                    reconstructed = '['
-                    for i, item in enumerate(items):
-                        if i < len(items) - 1:
-                            reconstructed += item + '},'
-                        else:
-                            reconstructed += item
-                    reconstructed += ']'
-                    return json.loads(reconstructed)
+            if 0 <= list_start < list_end:
+                # Try the list if it holds several objects (splitting it at '},' and
+                # joining the items again gave back the same text, so it is parsed directly)
+                list_text = text[list_start:list_end + 1]
+                if '},' in list_text:
+                    return FastJSON.loads(list_text)
             
-            if dict_match:
+            if 0 <= dict_start < dict_end:
                 # Try to reconstruct a dictionary
-                return json.loads('{' + dict_match.group(1) + '}')
+                return FastJSON.loads(text[dict_start:dict_end + 1])
                 
         except Exception as e:
-            print(f"Extraction attempt failed: {e}")
+            logger.warning("Extraction attempt failed: %s", e)
         
         return []
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+JsonStreamParser module extracts complete JSON objects from a streamed LLM response.
+"""
+
+import json
+import logging
+from ..util.fast_json import FastJSON
+
+logger = logging.getLogger(__name__)
+
+class JsonStreamParser:
+    """
+    Incremental parser for a JSON array that arrives in pieces.
+    Every object directly inside the first array of the response is parsed
+    as soon as its closing brace arrives, so callers can start working on
+    the first items while the model is still generating the rest.
+    Text around the JSON (markdown fences, explanations) is ignored.
+    """
+
+    def __init__(self):
+        self._pending = []     # Pieces of the open item received in earlier calls
+        self._depth = 0        # Current bracket/brace nesting depth
+        self._array_depth = None  # Depth inside the first array, once it is opened
+        self._in_string = False
+        self._escape = False
+        self._done = False
+
+    def feed(self, text):
+        """
+        Adds the next piece of the response and returns the items it completed.
+        Each piece is scanned once; the text of an item that spans several
+        pieces is collected in a list and joined only when the item is complete.
+
+        Args:
+            text (str): Next piece of the streamed response
+
+        Returns:
+            list: Objects that were completed by this piece, in order
+        """
+        items = []
+        if self._done or not text:
+            return items
+
+        # Offset of the open item's '{' in this piece (0 if it began in an earlier piece)
+        item_start = 0 if self._pending else None
+
+        for i, c in enumerate(text):
+            # Inside a string only the closing quote matters
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                continue
+
+            if c == '"':
+                # Quotes outside the JSON (e.g. in an explanation) are not strings
+                if self._depth > 0:
+                    self._in_string = True
+            elif c == '[' or c == '{':
+                self._depth += 1
+                if c == '[' and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif c == '{' and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    item_start = i
+            elif c == ']' or c == '}':
+                if c == '}' and item_start is not None and self._depth == self._array_depth + 1:
+                    self._pending.append(text[item_start:i + 1])
+                    item = self._parse_item("".join(self._pending))
+                    if item is not None:
+                        items.append(item)
+                    self._pending = []
+                    item_start = None
+                elif c == ']' and self._depth == self._array_depth:
+                    # The first array is closed - everything after it is ignored
+                    self._done = True
+                    self._pending = []
+                    return items
+                self._depth = max(self._depth - 1, 0)
+
+        # Keep the text of the item that is still open
+        if item_start is not None:
+            self._pending.append(text[item_start:])
+
+        return items
+
+    @staticmethod
+    def _parse_item(text):
+        """
+        Parses one complete item, skipping it if the model produced invalid JSON.
+
+        Args:
+            text (str): Text of one object from the array
+
+        Returns:
+            dict: The parsed object, or None if it is not valid JSON
+        """
+        try:
+            return FastJSON.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning("[JsonStreamParser] Skipping malformed item: %s", e)
+            return None
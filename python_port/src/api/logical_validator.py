@@ -3,41 +3,234 @@ logical_validator.py
 
 Provides a utility to perform logical/semantic checks on generated BPMN data by invoking the LLM.
 """
-import json
+import logging
+import threading
+from collections import OrderedDict
 from .data_generator import DataGenerator
 from .prompt_builder import PromptBuilder
+from .response_cache import ResponseCache
+from ..util.fast_json import FastJSON
+
+logger = logging.getLogger(__name__)
 
 class LogicalValidator:
     """
-    Uses the LLM itself to validate the logical integrity of BPMN-related JSON data.
+    Validates the logical integrity of BPMN-related JSON data.
+    Structural properties of the flow graph are checked locally; only the
+    semantic checks that need an understanding of the process go to the LLM.
     """
 
+    # Issues found in this session by signature of the checked model and request,
+    # least recently used first; only the newest INTEGRITY_CACHE_SIZE entries are kept
+    INTEGRITY_CACHE_SIZE = 128
+    _integrity_cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
     @staticmethod
     def check_integrity(context, api_options=None):
         """
-        Sends an integrity-check prompt to the LLM using the current context.
+        Checks the flow graph locally and sends an integrity-check prompt for
+        the remaining semantic checks to the LLM.
 
         Args:
-            context (dict): Generation context with tables like allElementRows, allFlowRows, etc.
+            context (dict): Generation context with tables like bpmn_elements, sequence_flows, etc.
             api_options (dict, optional): Options for the API call (model, temperature, debug, etc.)
 
         Returns:
-            list[dict] or str: Parsed list of issues (with 'problem_type' and 'description'), or raw text on failure.
+            list[dict]: Issues (with 'problem_type', 'description', 'elements' and 'severity')
+                        from the local checks followed by those reported by the LLM
         """
         if api_options is None:
             api_options = {'debug': False}
 
-        # Build integrity prompt
-        prompt = PromptBuilder.build_integrity_prompt(context)
+        # An unchanged model may already have been checked in this session
+        # (opt-in through the same 'cache' setting as the ResponseCache)
+        use_cache = ResponseCache.is_enabled(api_options)
+        signature = LogicalValidator._graph_signature(context, api_options) if use_cache else None
+        if use_cache:
+            with LogicalValidator._cache_lock:
+                cached = LogicalValidator._integrity_cache.get(signature)
+                if cached is not None:
+                    LogicalValidator._integrity_cache.move_to_end(signature)
+                    return list(cached)
+
+        # Graph properties (start/end events, dangling or disconnected elements) need no LLM
+        issues = LogicalValidator._static_checks(context)
+
+        # Build integrity prompt; the issues found locally are listed so they are not reported again
+        prompt = PromptBuilder.build_integrity_prompt(context, suspects=issues)
 
         # Call LLM to check integrity
         result = DataGenerator.call_llm(prompt, api_options)
 
-        # Attempt to parse JSON issues
-        try:
-            issues = result if isinstance(result, list) else json.loads(result)
-        except Exception:
-            # Return raw text if parsing fails
-            issues = result
+        # call_llm already returns parsed JSON (or [] on failure), so only the shape is checked
+        if not isinstance(result, list):
+            # Keep the local findings if the LLM answer is unusable
+            logger.warning("Semantic integrity check returned no list of issues")
+            return issues
+
+        issues = issues + result
+        if use_cache:
+            with LogicalValidator._cache_lock:
+                LogicalValidator._integrity_cache[signature] = list(issues)
+                if len(LogicalValidator._integrity_cache) > LogicalValidator.INTEGRITY_CACHE_SIZE:
+                    LogicalValidator._integrity_cache.popitem(last=False)
+        return issues
+
+    @staticmethod
+    def _graph_signature(context, api_options=None):
+        """
+        Computes a key for the part of the context the integrity check looks at
+        and the request that checks it. The LLM judges the meaning of the model,
+        so every field of the elements and flows counts (names, conditions, ...).
+
+        Args:
+            context (dict): Generation context with bpmn_elements and sequence_flows
+            api_options (dict, optional): API options; the request parameters
+                                          (model, temperature, ...) are part of the key
+
+        Returns:
+            str: Key over the sorted elements and flows with all their fields (see ResponseCache.make_key)
+        """
+        def fields(items):
+            return sorted(
+                sorted((str(key), str(value)) for key, value in item.items())
+                for item in items or [] if isinstance(item, dict)
+            )
+        material = FastJSON.dumps([fields(context.get('bpmn_elements')), fields(context.get('sequence_flows'))])
+        return ResponseCache.make_key(material, api_options)
+
+    @staticmethod
+    def _static_checks(context):
+        """
+        Checks the structure of the flow graph in a single pass over the
+        elements and sequence flows.
+
+        Args:
+            context (dict): Generation context with bpmn_elements and sequence_flows
+
+        Returns:
+            list[dict]: Issues in the same format as the LLM check returns them
+        """
+        elements = [e for e in context.get('bpmn_elements') or [] if isinstance(e, dict) and e.get('element_id')]
+        flows = [f for f in context.get('sequence_flows') or [] if isinstance(f, dict)]
+        if not elements:
+            return []
+
+        issues = []
+
+        # Classify the elements like ValidationLayer._ensure_element_id does
+        element_ids = [e['element_id'] for e in elements]
+        types = {}
+        for element in elements:
+            element_type = str(element.get('element_type', '')).lower()
+            subtype = str(element.get('element_subtype', '')).lower()
+            if element_type == 'event' and 'start' in subtype:
+                types[element['element_id']] = 'start'
+            elif element_type == 'event' and 'end' in subtype:
+                types[element['element_id']] = 'end'
+            elif element_type == 'gateway':
+                # Short and full subtypes name the same kind (e.g., 'parallel' and 'parallelGateway')
+                types[element['element_id']] = ('gateway', subtype.removesuffix('gateway') or 'unspecified')
+            else:
+                types[element['element_id']] = element_type
+
+        # 1. Missing start or end events
+        for kind in ('start', 'end'):
+            if kind not in types.values():
+                issues.append({
+                    'problem_type': f"Missing {kind} event",
+                    'description': f"The process has no {kind} event.",
+                    'elements': [],
+                    'severity': 'high'
+                })
+
+        # Build the adjacency (undirected, for the components) and the degrees
+        neighbours = {element_id: [] for element_id in element_ids}
+        in_degree = dict.fromkeys(element_ids, 0)
+        out_degree = dict.fromkeys(element_ids, 0)
+        for flow in flows:
+            source, target = flow.get('source_ref'), flow.get('target_ref')
+            unknown = [ref for ref in (source, target) if ref not in neighbours]
+            if unknown:
+                # 7. Flows that point to elements which do not exist
+                issues.append({
+                    'problem_type': "Invalid flow connection",
+                    'description': f"Sequence flow {flow.get('flow_id', '?')} references unknown elements: {', '.join(map(str, unknown))}.",
+                    'elements': [ref for ref in (source, target) if ref in neighbours],
+                    'severity': 'high'
+                })
+                continue
+            out_degree[source] += 1
+            in_degree[target] += 1
+            neighbours[source].append(target)
+            neighbours[target].append(source)
+
+        # 2./3. Elements without incoming or outgoing flows
+        no_incoming = [i for i in element_ids if in_degree[i] == 0 and types[i] != 'start']
+        no_outgoing = [i for i in element_ids if out_degree[i] == 0 and types[i] != 'end']
+        if no_incoming:
+            issues.append({
+                'problem_type': "Missing incoming flow",
+                'description': f"{len(no_incoming)} element(s) other than start events have no incoming sequence flow.",
+                'elements': no_incoming,
+                'severity': 'high'
+            })
+        if no_outgoing:
+            issues.append({
+                'problem_type': "Missing outgoing flow",
+                'description': f"{len(no_outgoing)} element(s) other than end events have no outgoing sequence flow.",
+                'elements': no_outgoing,
+                'severity': 'high'
+            })
+
+        # 4. Disconnected subgraphs (iterative DFS, so long chains cannot hit the recursion limit)
+        components = []
+        seen = set()
+        for element_id in element_ids:
+            if element_id in seen:
+                continue
+            seen.add(element_id)
+            component = []
+            stack = [element_id]
+            while stack:
+                node = stack.pop()
+                component.append(node)
+                for neighbour in neighbours[node]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+            components.append(component)
+        if len(components) > 1:
+            # Report everything outside the largest part of the process
+            components.sort(key=len, reverse=True)
+            issues.append({
+                'problem_type': "Disconnected subgraph",
+                'description': f"The flow graph falls apart into {len(components)} unconnected parts.",
+                'elements': [i for component in components[1:] for i in component],
+                'severity': 'medium'
+            })
+
+        # 5. Gateway splits without a join of the same kind
+        splits = {}
+        joins = {}
+        for element_id in element_ids:
+            element_type = types[element_id]
+            # Gateways are classified as ('gateway', kind), whatever their subtype is called
+            if isinstance(element_type, tuple):
+                if out_degree[element_id] > 1:
+                    splits.setdefault(element_type, []).append(element_id)
+                if in_degree[element_id] > 1:
+                    joins.setdefault(element_type, []).append(element_id)
+        for gateway_type, split_ids in splits.items():
+            join_count = len(joins.get(gateway_type, []))
+            gateway_kind = gateway_type[1]
+            if len(split_ids) > join_count:
+                issues.append({
+                    'problem_type': "Unmatched gateway split",
+                    'description': f"{len(split_ids)} {gateway_kind} gateway split(s) but only {join_count} matching join(s).",
+                    'elements': split_ids,
+                    'severity': 'medium'
+                })
 
         return issues
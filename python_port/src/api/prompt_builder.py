@@ -2,7 +2,107 @@
 PromptBuilder handles the creation of specialized prompts for the LLM.
 """
 
-import json
+import functools
+from .schema_loader import SchemaLoader
+from ..util.fast_json import FastJSON
+
+# Instruction blocks shared by all calls of a prompt type. They open the
+# prompts and the call-specific data follows them, so consecutive prompts
+# share a byte-identical prefix that providers with prompt caching can reuse.
+
+_BPMN_ELEMENT_RULES = """
+        As a BPMN expert, generate BPMN elements for the process described at the end of this prompt.
+        
+        Include the following types of elements to create a complete process flow:
+        
+        1. Start Events:
+           - Must include at least one start event
+           - Can be normal start events or with triggers (message, timer, etc.)
+           
+        2. Tasks:
+           - Include user tasks, service tasks, etc.
+           - Give descriptive names that match the process
+           
+        3. Gateways:
+           - Include exclusive gateways (XOR) for decision points
+           - Include parallel gateways (AND) for concurrent activities
+           
+        4. End Events:
+           - Must include at least one end event
+           
+        Each element should have these fields:
+        - element_id: A unique ID (e.g., "START_001", "TASK_001", "GATE_001", "END_001")
+        - element_name: Descriptive name
+        - element_type: One of "event", "task", "gateway"
+        - element_subtype: Specific type (e.g., "startEvent", "userTask", "exclusiveGateway")
+        - process_id: The ID of the process (given below)
+        - description: Brief description of the element's purpose
+        
+        Return the data as a JSON array, with elements in logical process order (start to end).
+        """
+
+_FLOW_RULES = """
+        Generate the necessary Sequence Flows to connect the BPMN elements listed at the end of this prompt into a complete BPMN process.
+        
+        Generate Sequence Flows with the following fields:
+        - flow_id: A unique ID for the flow (e.g., "FLOW_001", "FLOW_002")
+        - source_ref: The ID of the source element (where the flow comes from)
+        - target_ref: The ID of the target element (where the flow goes to)
+        - process_id: The process ID that these flows belong to
+        - condition_expr: Optional condition expression for conditional flows (especially for gateways)
+        
+        Follow these rules:
+        1. Each element (except for start and end events) should have at least one incoming and outgoing flow
+        2. Start events have only outgoing flows
+        3. End events have only incoming flows
+        4. Exclusive gateways should have conditional flows
+        5. Parallel gateways do not need conditions
+        
+        Return the data as a JSON array with well-formed sequence flows that create a logical process.
+        """
+
+_INTEGRITY_CHECKLIST = """
+        As a BPMN expert, analyze the BPMN model elements and flows listed at the end of this prompt for logical integrity issues.
+        
+        Start/end events, elements without incoming or outgoing flows, disconnected subgraphs,
+        flows to unknown elements and unmatched gateway splits have already been checked
+        automatically. Only check for the following semantic issues:
+        1. Potential deadlocks or infinite loops
+        2. Invalid flow connections (e.g., flows connecting incompatible elements)
+        3. Excessive branching or merging
+        
+        Return a list of identified issues in JSON format. Each issue should have:
+        - "problem_type": Short label describing the issue type
+        - "description": Detailed description of the issue
+        - "elements": List of element IDs involved in the issue
+        - "severity": "high", "medium", or "low"
+        
+        If no issues are found, return an empty array [].
+        """
+
+_LANE_RULES = """
+        As a BPMN expert with organizational design experience, generate lanes for the following pool (described at the end of this prompt).
+        
+        In Business Process Model and Notation (BPMN), lanes subdivide pools and represent roles, departments, or systems within 
+        an organization. Lanes are used to categorize and organize activities according to who performs them.
+        
+        For each lane, generate:
+        - lane_id: A unique identifier (format: "LANE_001", "LANE_002", etc.)
+        - lane_name: A descriptive name for the role or department
+        - pool_id: The ID of the pool this lane belongs to (Pool ID below)
+        - process_id: The ID of the process (Process ID below)
+        - description: A clear description of the lane's purpose and responsibilities
+        - role: The functional role represented by this lane
+        - element_refs: An array of element IDs that should be placed in this lane (optional)
+        
+        Create lanes that represent the hierarchical or functional divisions within the pool.
+        The lanes should provide a logical grouping of activities by role or function, as would be expected
+        in a professional BPMN diagram created for a university course on business process modeling.
+        
+        Ensure the lanes cover all aspects of the process within this pool.
+        
+        Return the data as a JSON array with appropriate lanes for this pool.
+        """
 
 class PromptBuilder:
     """
@@ -64,25 +164,18 @@ class PromptBuilder:
             elif 'product_description' in context:
                 product_desc = context['product_description']
         
+        # Special handling for BPMN elements (builds its own phases and schema parts)
+        if level == 'bpmn_elements':
+            return PromptBuilder._build_bpmn_elements_prompt(schema, context, batch_size)
+        
         # Optional phases from context
         phases_desc = ""
         if context and 'phases' in context:
-            phases_json = json.dumps(context['phases'], indent=2)
+            phases_json = PromptBuilder._format_phases(context['phases'])
             phases_desc = f"\nThe process consists of the following phases:\n{phases_json}\n"
         
         # Prepare schema fields if available
-        schema_fields = "not specified"
-        if schema:
-            fields = []
-            for field, config in schema.items():
-                field_type = config.get('type', 'string')
-                is_required = config.get('required', False)
-                fields.append(f"- {field}: {field_type}" + (" (required)" if is_required else ""))
-            schema_fields = "\n".join(fields)
-
-        # Special handling for BPMN elements
-        if level == 'bpmn_elements':
-            return PromptBuilder._build_bpmn_elements_prompt(schema, context, batch_size)
+        schema_fields = PromptBuilder._format_schema_fields(schema, level)
         
         return f"""
         Generate {batch_size} {friendly_name} entries for: "{product_desc}".
@@ -96,9 +189,185 @@ class PromptBuilder:
         Return the data as a JSON array, where each element is an object conforming to the schema definition.
         """
 
+    @staticmethod
+    def build_combined_entities_prompt(context, schemas, batch_sizes=None):
+        """
+        Builds a single prompt that generates process definitions, BPMN elements
+        and sequence flows in one LLM call instead of three separate ones.
+        
+        Args:
+            context (dict): Current generation context (description, phases)
+            schemas (dict): Schema definitions keyed by entity type
+            batch_sizes (dict, optional): Number of entities to generate per type,
+                                          e.g. {'process_definitions': 1, 'bpmn_elements': 10}
+            
+        Returns:
+            str: Formatted prompt for combined entity generation
+        """
+        batch_sizes = batch_sizes or {}
+        process_count = batch_sizes.get('process_definitions', 1)
+        element_count = batch_sizes.get('bpmn_elements', 10)
+        
+        # Extract product/process description from context
+        product_desc = ""
+        if context and isinstance(context, dict):
+            product_desc = context.get('description') or context.get('product_description', '')
+        
+        # Optional phases from context
+        phases_desc = ""
+        if context and 'phases' in context:
+            phases_json = PromptBuilder._format_phases(context['phases'])
+            phases_desc = f"\nThe process consists of the following phases:\n{phases_json}\n"
+        
+        process_fields = PromptBuilder._format_schema_fields(schemas.get('process_definitions'), 'process_definitions')
+        element_fields = PromptBuilder._format_schema_fields(schemas.get('bpmn_elements'), 'bpmn_elements')
+        flow_fields = PromptBuilder._format_schema_fields(schemas.get('sequence_flows'), 'sequence_flows')
+        
+        return f"""
+        As a BPMN expert, model a complete process for: "{product_desc}".
+        
+        {phases_desc}
+        
+        Generate all of the following in a single response:
+        
+        1. process_definitions: {process_count} process definition(s).
+           The process_id must have the format "PROC_001".
+        {process_fields}
+        
+        2. bpmn_elements: {element_count} BPMN elements that belong to the process.
+           Include at least one start event, tasks, gateways and at least one end event.
+           element_type is one of "event", "task", "gateway"; element_subtype is the
+           specific type (e.g., "startEvent", "userTask", "exclusiveGateway").
+        {element_fields}
+        
+        3. sequence_flows: Sequence Flows that connect the elements into one complete process.
+           source_ref and target_ref must be element_id values from bpmn_elements.
+        {flow_fields}
+        
+        Return a single JSON object with exactly the keys "process_definitions",
+        "bpmn_elements" and "sequence_flows", each containing a JSON array.
+        """
+
+    @staticmethod
+    def warm_schema_fields(schemas):
+        """
+        Formats the field lists of all schemas ahead of time.
+        Only this part of the entity prompts does not depend on earlier LLM
+        results, so the pipeline prepares it while its first call is in flight.
+        
+        Args:
+            schemas (dict): Schema definitions by level (see SchemaLoader.load)
+        """
+        for level, schema in schemas.items():
+            PromptBuilder._format_schema_fields(schema, level)
+    
+    @staticmethod
+    def _format_schema_fields(schema, level=None):
+        """
+        Formats a schema definition as a bullet list of fields for a prompt.
+        The schemas of SchemaLoader are static, so their lists are formatted
+        once per level; any other schema is formatted on every call.
+        
+        Args:
+            schema (dict): Schema definition for an entity
+            level (str, optional): Level the schema belongs to (e.g., resources)
+            
+        Returns:
+            str: One line per field with its type and required flag
+        """
+        if not schema:
+            return "not specified"
+        if level is not None and SchemaLoader.load().get(level) is schema:
+            return PromptBuilder._loaded_schema_fields(level)
+        return PromptBuilder._field_lines(schema)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _loaded_schema_fields(level):
+        """Formats the field list of a SchemaLoader schema (cached per level name)"""
+        return PromptBuilder._field_lines(SchemaLoader.load()[level])
+    
+    @staticmethod
+    def _field_lines(schema):
+        """Formats one line per field of a schema"""
+        fields = []
+        for field, config in schema.items():
+            field_type = config.get('type', 'string')
+            if isinstance(field_type, tuple):
+                field_type = list(field_type)  # Same text as the list it was defined as
+            is_required = config.get('required', False)
+            fields.append(f"- {field}: {field_type}" + (" (required)" if is_required else ""))
+        return "\n".join(fields)
+
+    @staticmethod
+    def _format_elements(elements):
+        """
+        Formats the BPMN elements for the flow, integrity, resource and lane prompts
+        in a single pass. The lines are built on every call, so they always reflect
+        the current elements (the pass is cheap next to the LLM call that follows).
+        
+        Args:
+            elements (list): BPMN elements from the context
+            
+        Returns:
+            dict: 'elements' (all elements as text), 'tasks' (tasks as text, for
+                  resources) and 'lane_tasks' (list of task lines, for lanes)
+        """
+        element_lines = []
+        task_lines = []
+        lane_task_lines = []
+        for elem in elements:
+            if not isinstance(elem, dict):
+                continue
+            element_id = elem.get('element_id', 'Unknown')
+            element_name = elem.get('element_name', 'Unnamed')
+            element_type = elem.get('element_type', 'Unknown')
+            element_subtype = elem.get('element_subtype', 'Unknown')
+            element_lines.append(f"- ID: {element_id}, Name: {element_name}, Type: {element_type}/{element_subtype}")
+            if str(element_type).lower() == 'task':
+                task_lines.append(f"- ID: {element_id}, Name: {element_name}")
+                lane_task_lines.append(f"- {element_id}: {element_name} ({elem.get('element_subtype', 'task')})")
+        
+        return {
+            'elements': "\n".join(element_lines),
+            'tasks': "\n".join(task_lines),
+            'lane_tasks': lane_task_lines
+        }
+    
+    @staticmethod
+    def _format_phases(phases):
+        """
+        Serializes the process phases for a prompt.
+        The phases are fixed once generated and are included in every entity
+        prompt, so the JSON text is cached by their content (see _phases_text).
+        
+        Args:
+            phases (list): Process phases from the context
+            
+        Returns:
+            str: Compact JSON text of the phases (indentation would only add tokens)
+        """
+        try:
+            key = tuple(tuple(phase.items()) for phase in phases)
+            return PromptBuilder._phases_text(key)
+        except (AttributeError, TypeError):
+            # Phases that are not flat dicts of hashable values are serialized directly
+            return FastJSON.dumps(phases)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _phases_text(key):
+        """Serializes phases given as a tuple of their (field, value) pairs"""
+        return FastJSON.dumps([dict(items) for items in key])
+
     @staticmethod
     def _build_bpmn_elements_prompt(schema, context, batch_size):
-        """Special prompt builder for BPMN elements with more structure"""
+        """
+        Special prompt builder for BPMN elements with more structure.
+        The context may carry the phases already serialized ('phases_json') and
+        the IDs of earlier batches ('existing_element_ids') instead of the full
+        element objects, so repeated batches do not re-serialize a growing context.
+        """
         # Extract process info
         process_id = ""
         process_name = ""
@@ -112,51 +381,51 @@ class PromptBuilder:
         
         # If we have phases, include them
         phases_json = ""
-        if context and isinstance(context, dict) and 'phases' in context:
-            phases_json = json.dumps(context['phases'], indent=2)
-        
-        return f"""
+        if context and isinstance(context, dict):
+            if 'phases_json' in context:
+                phases_json = context['phases_json']
+            elif 'phases' in context:
+                phases_json = PromptBuilder._format_phases(context['phases'])
+        
+        # Earlier batches are listed by ID only, so the new batch continues instead of repeating them
+        existing_hint = ""
+        if isinstance(context, dict) and context.get('existing_element_ids'):
+            existing_hint = (
+                "The following element IDs already exist; do not repeat them and continue the process from there: "
+                + ", ".join(context['existing_element_ids'])
+            )
+        
+        # Batches generated in parallel get their own ID range and part of the process
+        batch_hint = ""
+        if isinstance(context, dict) and 'batch_index' in context:
+            batch_number = context['batch_index'] + 1
+            first_id = context['batch_index'] * batch_size + 1
+            batch_hint = (
+                f"This is batch {batch_number} of {context.get('batch_count', batch_number)} generated independently. "
+                f"Focus on part {batch_number} of the process and number the element IDs starting at {first_id:03d} "
+                f"(e.g., \"TASK_{first_id:03d}\") so they do not collide with the other batches."
+            )
+        
+        return f"""{_BPMN_ELEMENT_RULES}
         Generate a complete set of {batch_size} BPMN elements for process: "{process_name or process_desc}".
         
         Process ID: {process_id}
         
         {"Process phases:\n" + phases_json if phases_json else ""}
         
-        Include the following types of elements to create a complete process flow:
+        {batch_hint}
         
-        1. Start Events:
-           - Must include at least one start event
-           - Can be normal start events or with triggers (message, timer, etc.)
-           
-        2. Tasks:
-           - Include user tasks, service tasks, etc.
-           - Give descriptive names that match the process
-           
-        3. Gateways:
-           - Include exclusive gateways (XOR) for decision points
-           - Include parallel gateways (AND) for concurrent activities
-           
-        4. End Events:
-           - Must include at least one end event
-           
-        Each element should have these fields:
-        - element_id: A unique ID (e.g., "START_001", "TASK_001", "GATE_001", "END_001")
-        - element_name: Descriptive name
-        - element_type: One of "event", "task", "gateway"
-        - element_subtype: Specific type (e.g., "startEvent", "userTask", "exclusiveGateway")
-        - process_id: The ID of the process ({process_id})
-        - description: Brief description of the element's purpose
-        
-        Return the data as a JSON array, with elements in logical process order (start to end).
+        {existing_hint}
         """
 
     @staticmethod 
-    def build_integrity_prompt(context):
+    def build_integrity_prompt(context, suspects=None):
         """
         Builds a prompt to check the logical integrity of the generated BPMN model.
         
         Args:
             context (dict): Current generation context with all data
+            suspects (list, optional): Issues already found by LogicalValidator's local checks
             
         Returns:
             str: Formatted prompt for integrity checking
@@ -164,11 +433,8 @@ class PromptBuilder:
         # Extract elements info
         elements_info = "No elements available"
         if context and 'bpmn_elements' in context and context['bpmn_elements']:
-            elements = []
-            for elem in context['bpmn_elements']:
-                if isinstance(elem, dict):
-                    elements.append(f"- ID: {elem.get('element_id', 'Unknown')}, Name: {elem.get('element_name', 'Unnamed')}, Type: {elem.get('element_type', 'Unknown')}/{elem.get('element_subtype', 'Unknown')}")
-            elements_info = "BPMN Elements:\n" + "\n".join(elements)
+            lines = PromptBuilder._format_elements(context['bpmn_elements'])
+            elements_info = "BPMN Elements:\n" + lines['elements']
         
         # Extract flows info
         flows_info = "No sequence flows available"
@@ -179,30 +445,19 @@ class PromptBuilder:
                     flows.append(f"- ID: {flow.get('flow_id', 'Unknown')}, Source: {flow.get('source_ref', 'Unknown')} → Target: {flow.get('target_ref', 'Unknown')}")
             flows_info = "Sequence Flows:\n" + "\n".join(flows)
         
-        return f"""
-        As a BPMN expert, analyze the following BPMN model elements and flows for logical integrity issues.
+        # Issues found locally are named so the LLM does not repeat them
+        suspects_info = ""
+        if suspects:
+            suspects_info = "Already reported (do not repeat):\n" + "\n".join(
+                f"- {issue['problem_type']}: {', '.join(map(str, issue.get('elements', [])))}" for issue in suspects
+            )
         
+        return f"""{_INTEGRITY_CHECKLIST}
         {elements_info}
         
         {flows_info}
         
-        Check for the following types of issues:
-        1. Missing start or end events
-        2. Elements without incoming flows (except start events)
-        3. Elements without outgoing flows (except end events)
-        4. Disconnected elements or subgraphs
-        5. Inconsistencies in gateway pairs (splits without joins)
-        6. Potential deadlocks or infinite loops
-        7. Invalid flow connections (e.g., flows connecting incompatible elements)
-        8. Excessive branching or merging
-        
-        Return a list of identified issues in JSON format. Each issue should have:
-        - "problem_type": Short label describing the issue type
-        - "description": Detailed description of the issue
-        - "elements": List of element IDs involved in the issue
-        - "severity": "high", "medium", or "low"
-        
-        If no issues are found, return an empty array [].
+        {suspects_info}
         """
     
     @staticmethod
@@ -219,8 +474,8 @@ class PromptBuilder:
         Returns:
             str: Formatted prompt for phase entity generation
         """
-        # Parent IDs in JSON format
-        parent_json = json.dumps(parent_ids, indent=2)
+        # Parent IDs in compact JSON format
+        parent_json = FastJSON.dumps(parent_ids)
         
         # Clean name for description
         friendly_level = level.replace('_', ' ').title()
@@ -257,32 +512,11 @@ class PromptBuilder:
         # Extract elements from context
         element_desc = "Available elements:"
         if context and 'bpmn_elements' in context and context['bpmn_elements']:
-            elements = []
-            for elem in context['bpmn_elements']:
-                if isinstance(elem, dict) and 'element_id' in elem and 'element_name' in elem:
-                    elements.append(f"- ID: {elem['element_id']}, Name: {elem['element_name']}, Type: {elem.get('element_type', 'Unknown')}/{elem.get('element_subtype', 'Unknown')}")
-            element_desc = "Available elements:\n" + "\n".join(elements)
-        
-        return f"""
-        Based on the following BPMN elements, generate the necessary Sequence Flows to connect them into a complete BPMN process.
+            lines = PromptBuilder._format_elements(context['bpmn_elements'])
+            element_desc = "Available elements:\n" + lines['elements']
         
+        return f"""{_FLOW_RULES}
         {element_desc}
-        
-        Generate Sequence Flows with the following fields:
-        - flow_id: A unique ID for the flow (e.g., "FLOW_001", "FLOW_002")
-        - source_ref: The ID of the source element (where the flow comes from)
-        - target_ref: The ID of the target element (where the flow goes to)
-        - process_id: The process ID that these flows belong to
-        - condition_expr: Optional condition expression for conditional flows (especially for gateways)
-        
-        Follow these rules:
-        1. Each element (except for start and end events) should have at least one incoming and outgoing flow
-        2. Start events have only outgoing flows
-        3. End events have only incoming flows
-        4. Exclusive gateways should have conditional flows
-        5. Parallel gateways do not need conditions
-        
-        Return the data as a JSON array with well-formed sequence flows that create a logical process.
         """
     
     @staticmethod
@@ -298,25 +532,16 @@ class PromptBuilder:
             str: Formatted prompt for resource generation
         """
         # Prepare schema fields
-        schema_fields = "not specified"
-        if resource_schema:
-            fields = []
-            for field, config in resource_schema.items():
-                field_type = config.get('type', 'string')
-                is_required = config.get('required', False)
-                fields.append(f"- {field}: {field_type}" + (" (required)" if is_required else ""))
-            schema_fields = "\n".join(fields)
+        schema_fields = PromptBuilder._format_schema_fields(resource_schema, 'resources')
         
         # Extract elements with task type from context
-        tasks = []
-        if context and 'bpmn_elements' in context:
-            for elem in context['bpmn_elements']:
-                if isinstance(elem, dict) and elem.get('element_type', '').lower() == 'task':
-                    tasks.append(f"- ID: {elem.get('element_id', 'Unknown')}, Name: {elem.get('element_name', 'Unnamed')}")
+        tasks = ""
+        if context and context.get('bpmn_elements'):
+            tasks = PromptBuilder._format_elements(context['bpmn_elements'])['tasks']
         
         tasks_desc = "No tasks found."
         if tasks:
-            tasks_desc = "Available tasks for resource assignment:\n" + "\n".join(tasks)
+            tasks_desc = "Available tasks for resource assignment:\n" + tasks
         
         # Extract process ID if available
         process_id = ""
@@ -438,10 +663,8 @@ class PromptBuilder:
         
         # Extract task information from context
         task_info = []
-        if context and 'bpmn_elements' in context:
-            for elem in context['bpmn_elements']:
-                if isinstance(elem, dict) and elem.get('element_type') == 'task':
-                    task_info.append(f"- {elem.get('element_id', '')}: {elem.get('element_name', '')} ({elem.get('element_subtype', 'task')})")
+        if context and context.get('bpmn_elements'):
+            task_info = PromptBuilder._format_elements(context['bpmn_elements'])['lane_tasks']
         
         tasks_summary = ""
         if task_info:
@@ -449,8 +672,8 @@ class PromptBuilder:
             if len(task_info) > 10:
                 tasks_summary += f"\n(and {len(task_info) - 10} more tasks...)"
         
-        return f"""
-        As a BPMN expert with organizational design experience, generate up to {batch_size} lanes for the following pool:
+        return f"""{_LANE_RULES}
+        Generate up to {batch_size} lanes for this pool:
         
         Pool ID: {pool_id}
         Pool Name: {pool_name}
@@ -458,24 +681,4 @@ class PromptBuilder:
         Process ID: {process_id}
         
         {tasks_summary}
-        
-        In Business Process Model and Notation (BPMN), lanes subdivide pools and represent roles, departments, or systems within 
-        an organization. Lanes are used to categorize and organize activities according to who performs them.
-        
-        For each lane, generate:
-        - lane_id: A unique identifier (format: "LANE_001", "LANE_002", etc.)
-        - lane_name: A descriptive name for the role or department
-        - pool_id: The ID of the pool this lane belongs to ({pool_id})
-        - process_id: The ID of the process ({process_id})
-        - description: A clear description of the lane's purpose and responsibilities
-        - role: The functional role represented by this lane
-        - element_refs: An array of element IDs that should be placed in this lane (optional)
-        
-        Create lanes that represent the hierarchical or functional divisions within the {pool_name}.
-        The lanes should provide a logical grouping of activities by role or function, as would be expected
-        in a professional BPMN diagram created for a university course on business process modeling.
-        
-        Ensure the lanes cover all aspects of the process within this pool.
-        
-        Return the data as a JSON array with appropriate lanes for this pool.
         """
\ No newline at end of file
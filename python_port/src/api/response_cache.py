@@ -0,0 +1,177 @@
+"""
+ResponseCache module provides a persistent cache for raw LLM responses,
+so that identical prompts can be replayed from disk instead of calling the API again.
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from .api_caller import APICaller
+from ..util.config import Config
+from ..util.fast_hash import FastHash
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressed cache mapping a prompt (plus the options that
+    influence the answer) to the raw response text of the language model.
+    Entries are kept in a SQLite database in Config.LLM_CACHE_DIR and, for
+    the lifetime of the process, in memory; both expire after a TTL.
+    """
+
+    # Name of the database file inside the cache directory
+    DB_FILENAME = "responses.sqlite3"
+
+    # Entries read or written in this process: key -> (text, timestamp)
+    _memory = {}
+
+    # Connection to the database of the current cache directory
+    _connection = None
+    _connection_path = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def is_enabled(options=None):
+        """
+        Checks whether the cache should be used for a call
+
+        Args:
+            options (dict, optional): API options; 'cache' overrides the global setting
+
+        Returns:
+            bool: True if responses should be read from and written to the cache
+        """
+        if options and 'cache' in options:
+            return bool(options['cache'])
+        return Config.LLM_CACHE
+
+    @staticmethod
+    def get_ttl(options=None):
+        """
+        Returns how long cached responses stay valid for a call
+
+        Args:
+            options (dict, optional): API options; 'cache_ttl_s' overrides the global setting
+
+        Returns:
+            int: Maximum age of a cache entry in seconds
+        """
+        if options and 'cache_ttl_s' in options:
+            return int(options['cache_ttl_s'])
+        return Config.LLM_CACHE_TTL
+
+    @staticmethod
+    def make_key(prompt, options=None):
+        """
+        Computes the cache key for a prompt
+
+        Args:
+            prompt (str): The prompt text
+            options (dict, optional): API options; the ones sent with the request
+                                      (model, temperature, max_tokens, ...) are part of the key
+
+        Returns:
+            str: Hex digest identifying the request (see FastHash)
+        """
+        options = options or {}
+        # Only request parameters change the answer (debug or cache settings do not)
+        parameters = {
+            key: options[key]
+            for key in ('model', 'temperature', 'max_tokens', 'json_schema', *APICaller.OPTIONAL_PARAMETERS)
+            if key in options
+        }
+        material = json.dumps(parameters, sort_keys=True, default=str) + "\0" + prompt
+        return FastHash.hexdigest(material)
+
+    @classmethod
+    def _get_connection(cls):
+        """
+        Returns the database connection, opening it on first use or when the
+        cache directory has changed. Callers must hold cls._lock.
+
+        Returns:
+            sqlite3.Connection: Connection with the responses table created
+        """
+        path = os.path.join(Config.LLM_CACHE_DIR, cls.DB_FILENAME)
+        if cls._connection is None or cls._connection_path != path:
+            if cls._connection is not None:
+                cls._connection.close()
+            Config.ensure_dir(Config.LLM_CACHE_DIR)
+            # The connection is shared by the LLM worker threads, guarded by cls._lock
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT, ts INTEGER)"
+            )
+            cls._connection = connection
+            cls._connection_path = path
+        return cls._connection
+
+    @classmethod
+    def close(cls):
+        """Closes the database connection and forgets the in-memory entries"""
+        with cls._lock:
+            if cls._connection is not None:
+                cls._connection.close()
+            cls._connection = None
+            cls._connection_path = None
+            cls._memory.clear()
+
+    @classmethod
+    def lookup(cls, key, ttl=None):
+        """
+        Returns the cached response for a key
+
+        Args:
+            key (str): Cache key from make_key
+            ttl (int, optional): Maximum age in seconds (defaults to Config.LLM_CACHE_TTL)
+
+        Returns:
+            str: The cached response text, or None on a cache miss or expired entry
+        """
+        if ttl is None:
+            ttl = Config.LLM_CACHE_TTL
+        oldest = time.time() - ttl
+
+        # Check the in-memory entries first
+        entry = cls._memory.get(key)
+        if entry is not None and entry[1] >= oldest:
+            return entry[0]
+
+        try:
+            with cls._lock:
+                row = cls._get_connection().execute(
+                    "SELECT text, ts FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+
+        if row is None or row[1] < oldest:
+            return None
+        cls._memory[key] = (row[0], row[1])
+        return row[0]
+
+    @classmethod
+    def update(cls, key, text):
+        """
+        Stores a response for a key
+
+        Args:
+            key (str): Cache key from make_key
+            text (str): Raw response text of the language model
+        """
+        timestamp = int(time.time())
+        cls._memory[key] = (text, timestamp)
+        try:
+            with cls._lock:
+                connection = cls._get_connection()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses (key, text, ts) VALUES (?, ?, ?)",
+                        (key, text, timestamp)
+                    )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Could not write LLM cache entry: %s", e)
@@ -3,6 +3,9 @@ Schema-Loader module provides access to database schema definitions
 for BPMN elements and other data structures.
 """
 
+import functools
+from types import MappingProxyType
+
 class SchemaLoader:
     """
     Loads and provides schema definitions for data validation
@@ -10,12 +13,18 @@ class SchemaLoader:
     """
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def load():
         """
-        Loads all schema definitions
+        Loads all schema definitions. The definitions are static, so they are
+        built once and the same mapping is returned on every later call.
+        The schemas are frozen down to the field configs (mappings become
+        read-only views, lists of types become tuples), so a caller cannot
+        change the schemas other callers (and the caches built from them,
+        e.g. in PromptBuilder and ValidationLayer) rely on.
         
         Returns:
-            dict: Dictionary containing schema definitions for all entity types
+            MappingProxyType: Read-only mapping with the schema definitions for all entity types
         """
         schemas = {
             'process_definitions': SchemaLoader._get_process_definitions_schema(),
@@ -28,7 +37,41 @@ class SchemaLoader:
             'parts': SchemaLoader._get_parts_schema(),
             'subparts': SchemaLoader._get_subparts_schema()
         }
-        return schemas
+        return SchemaLoader._freeze(schemas)
+    
+    @staticmethod
+    def _freeze(value):
+        """Returns a read-only copy of a schema definition (mappings and lists at every depth)"""
+        if isinstance(value, dict):
+            return MappingProxyType({key: SchemaLoader._freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(SchemaLoader._freeze(item) for item in value)
+        return value
+    
+    @staticmethod
+    def to_json_schema(schema):
+        """
+        Converts a schema definition into a JSON Schema for a single entity,
+        e.g. for the structured output mode of the API.
+        
+        Args:
+            schema (dict): Schema definition as returned by load() for one entity type
+            
+        Returns:
+            dict: JSON Schema of an object with the schema's fields
+        """
+        properties = {}
+        required = []
+        for field, config in schema.items():
+            # Types (also lists of types) and formats use the JSON Schema names already
+            field_type = config.get('type', 'string')
+            prop = {'type': list(field_type) if isinstance(field_type, tuple) else field_type}
+            if 'format' in config:
+                prop['format'] = config['format']
+            properties[field] = prop
+            if config.get('required', False):
+                required.append(field)
+        return {'type': 'object', 'properties': properties, 'required': required}
     
     @staticmethod
     def _get_process_definitions_schema():
@@ -3,13 +3,34 @@ validation_layer.py
 
 Provides validation for all generated data structures according to schemas.
 """
-import os
-from jsonschema import validate as js_validate, ValidationError
+import logging
+from types import MappingProxyType
 from .schema_loader import SchemaLoader
+from ..util.config import Config
+
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is optional
+    fastjsonschema = None
+
+logger = logging.getLogger(__name__)
+
+# Marks a field that is missing from an item (None is a valid value)
+_MISSING = object()
+
+# Schema for process phases, which are not part of SchemaLoader's table schemas
+_PROCESS_PHASES_SCHEMA = MappingProxyType({
+    'phase_id': {'type': 'string', 'required': True},
+    'phase_name': {'type': 'string', 'required': True},
+    'description': {'type': 'string', 'required': True},
+    'order': {'type': 'integer', 'required': False}
+})
 
 class ValidationLayer:
     """
-    Provides schema-based validation for generated data tables using JSON Schema.
+    Provides schema-based validation for generated data tables.
+    Each level's schema is compiled once into a field plan (see _get_compiled);
+    values of the wrong type are converted where possible instead of rejected.
     """
     
     @staticmethod
@@ -19,7 +40,8 @@ class ValidationLayer:
         
         Args:
             level (str): Level of the data (e.g., process_definitions)
-            data (list): Data to validate
+            data (list or iterable): Data to validate; an iterator such as
+                DataGenerator.stream_llm is validated item by item as it arrives
             context (dict, optional): Context data for validation
             
         Returns:
@@ -28,223 +50,465 @@ class ValidationLayer:
         if not data:
             return []
         
-        schema = ValidationLayer._get_schema(level)
-        if not schema:
-            print(f"[ValidationLayer] No schema found for '{level}', skipping validation.")
+        # Known-good pipelines can turn validation off entirely (BPMN_SKIP_VALIDATION)
+        if Config.SKIP_VALIDATION:
+            return data if isinstance(data, list) else list(data)
+        
+        if not ValidationLayer._get_compiled(level):
+            logger.warning("[ValidationLayer] No schema found for '%s', skipping validation.", level)
+            return data if isinstance(data, list) else list(data)
+        
+        # Well-formed data without context values to adopt is returned as it is
+        if context is None and isinstance(data, list) and ValidationLayer._is_clean(level, data):
             return data
         
-        # For sequence_flows, adapt process_id from context if needed
-        if level == 'sequence_flows' and context and 'process_definitions' in context:
-            process_id = None
-            
-            # Extract process_id from process definitions
-            if isinstance(context['process_definitions'], list) and len(context['process_definitions']) > 0:
-                process_id = context['process_definitions'][0].get('process_id')
-            elif isinstance(context['process_definitions'], dict) and 'process_id' in context['process_definitions']:
-                process_id = context['process_definitions']['process_id']
-                
-            # Apply process_id to flows that are missing it
-            if process_id:
-                for flow in data:
-                    if isinstance(flow, dict) and ('process_id' not in flow or not flow['process_id']):
-                        flow['process_id'] = process_id
+        return list(ValidationLayer.iter_validate(level, data, context))
+    
+    @staticmethod
+    def iter_validate(level, data, context=None):
+        """
+        Validates and enriches items one at a time, yielding each valid item
+        as soon as it has been checked. Every step only looks at the item
+        itself and its position, so no item has to wait for later ones.
         
-        # For elements, adapt process_id from context if needed
-        if level == 'bpmn_elements' and context and 'process_definitions' in context:
-            process_id = None
-            
-            # Extract process_id from process definitions
-            if isinstance(context['process_definitions'], list) and len(context['process_definitions']) > 0:
-                process_id = context['process_definitions'][0].get('process_id')
-            elif isinstance(context['process_definitions'], dict) and 'process_id' in context['process_definitions']:
-                process_id = context['process_definitions']['process_id']
-                
-            # Apply process_id to elements that are missing it
-            if process_id:
-                for element in data:
-                    if isinstance(element, dict) and ('process_id' not in element or not element['process_id']):
-                        element['process_id'] = process_id
-                        
-        # For pools, adapt process_id from context if needed
-        if level == 'pools' and context and 'process_definitions' in context:
-            process_id = None
-            
-            # Extract process_id from process definitions
-            if isinstance(context['process_definitions'], list) and len(context['process_definitions']) > 0:
-                process_id = context['process_definitions'][0].get('process_id')
-                
-            # Apply process_id to pools that are missing it
-            if process_id:
-                for pool in data:
-                    if isinstance(pool, dict) and ('process_id' not in pool or not pool['process_id']):
-                        pool['process_id'] = process_id
-                        
-        # For lanes, adapt pool_id and process_id if provided in context
-        if level == 'lanes' and context:
-            pool_id = None
-            process_id = None
+        Args:
+            level (str): Level of the data (e.g., process_definitions)
+            data (iterable): Items to validate
+            context (dict, optional): Context data for validation; for bpmn_elements,
+                'existing_element_ids' (set or dict) lists IDs that must not be repeated
             
-            # Extract pool_id from context if present
-            if 'pool' in context and isinstance(context['pool'], dict):
-                pool_id = context['pool'].get('pool_id')
-                
-            # Extract process_id from context if present
-            if 'process_definitions' in context and isinstance(context['process_definitions'], list) and len(context['process_definitions']) > 0:
-                process_id = context['process_definitions'][0].get('process_id')
-                
-            # Apply pool_id and process_id to lanes that are missing them
-            for lane in data:
-                if isinstance(lane, dict):
-                    if pool_id and ('pool_id' not in lane or not lane['pool_id']):
-                        lane['pool_id'] = pool_id
-                    if process_id and ('process_id' not in lane or not lane['process_id']):
-                        lane['process_id'] = process_id
+        Yields:
+            dict: Validated and enriched items
+        """
+        compiled = ValidationLayer._get_compiled(level)
+        if not compiled:
+            logger.warning("[ValidationLayer] No schema found for '%s', skipping validation.", level)
+            yield from data
+            return
         
-        # Ensure all data has required IDs (generate if missing)
-        if level == 'sequence_flows':
-            ValidationLayer._ensure_flow_ids(data)
-        elif level == 'bpmn_elements':
-            ValidationLayer._ensure_element_ids(data)
-        elif level == 'pools':
-            ValidationLayer._ensure_pool_ids(data)
-        elif level == 'lanes':
-            # Get pool_id from context if available
-            pool_id = None
-            if context and 'pool' in context and isinstance(context['pool'], dict):
-                pool_id = context['pool'].get('pool_id')
-            ValidationLayer._ensure_lane_ids(data, pool_id)
-            
-        # Validate each item against the schema
-        result = []
+        typed_fields, defaults, required_fields, fast_check = compiled
+        
+        # Resolve the values to adopt from the context once, before the first item
+        fill_values = ValidationLayer._get_context_values(level, context)
+        
+        # IDs that already exist for this level (bpmn_elements generated in earlier batches)
+        existing_ids = context.get('existing_element_ids') if context and level == 'bpmn_elements' else None
+        
+        # Pick the ID check for this level
+        id_rule = ValidationLayer._ID_RULES.get(level)
+        if level == 'bpmn_elements':
+            ensure_id = ValidationLayer._ensure_element_id
+        elif id_rule:
+            id_field, id_prefix = id_rule
+            ensure_id = lambda item, index: ValidationLayer._ensure_id(item, index, id_field, id_prefix)
+        else:
+            ensure_id = None
+        
+        # Validate each item against the schema (the only pass over the data,
+        # so an iterator is validated while it is still being produced)
+        skipped = 0
         for idx, item in enumerate(data):
             if not isinstance(item, dict):
-                print(f"[ValidationLayer] Item {idx} is not a dictionary. Skipping.")
+                skipped += 1
                 continue
+            
+            # Adopt missing IDs from the context (e.g., process_id of the process)
+            for field, value in fill_values:
+                if not item.get(field):
+                    item[field] = value
+            
+            # Ensure the item has its required ID (generate if missing)
+            if existing_ids:
+                element_id = item.get('element_id')
+                if element_id and isinstance(element_id, str):
+                    # Skip items whose given ID repeats an element of an earlier batch
+                    if element_id in existing_ids:
+                        logger.warning("[ValidationLayer] Skipping %s[%s]: ID %s already exists", level, idx, element_id)
+                        continue
+                else:
+                    # Generated IDs are numbered after the existing ones, up to the next free one
+                    index = idx + len(existing_ids)
+                    ensure_id(item, index)
+                    while item['element_id'] in existing_ids:
+                        index += 1
+                        del item['element_id']
+                        ensure_id(item, index)
+            elif ensure_id:
+                ensure_id(item, idx)
                 
-            # Check required fields and add defaults
-            valid_item = item.copy()
+            # The item is completed in place: the steps above already modify it,
+            # so a copy would not keep the caller's data unchanged anyway
             is_valid = True
             
-            for field, field_schema in schema.items():
-                # Check if field exists
-                if field not in valid_item:
-                    # Add default value if available
-                    if 'default' in field_schema:
-                        valid_item[field] = field_schema['default']
-                    # For required fields with no default, report error
-                    elif field_schema.get('required', False):
-                        print(f"[ValidationLayer] Validation error for {level}[{idx}]: '{field}' is a required property")
+            # An item that passes the generated validator only needs its defaults
+            conforms = fast_check is not None and ValidationLayer._conforms(fast_check, item)
+            
+            # Validate types of the fields that are present (values already of the right type pass as they are)
+            if not conforms:
+                for field, accepted_types, coerce in typed_fields:
+                    value = item.get(field, _MISSING)
+                    if value is not _MISSING and not (accepted_types and isinstance(value, accepted_types)):
+                        item[field] = coerce(value, field)
+            
+            # Add default values for missing fields
+            for field, default in defaults:
+                item.setdefault(field, default)
+            
+            # For required fields with no default, report error
+            if not conforms:
+                for field in required_fields:
+                    if field not in item:
+                        logger.warning("[ValidationLayer] Validation error for %s[%s]: '%s' is a required property", level, idx, field)
                         is_valid = False
-                
-                # Field exists - validate type
-                elif field in valid_item:
-                    if 'type' in field_schema:
-                        valid_item[field] = ValidationLayer._validate_type(
-                            valid_item[field], 
-                            field_schema['type'],
-                            field_schema.get('format', None),
-                            field
-                        )
             
             # Apply special validation for specific fields/levels
-            if level == 'process_definitions' and 'process_id' in valid_item:
-                if not valid_item['process_id'].startswith('PROC_'):
-                    print(f"[ValidationLayer] Correcting process_id format: {valid_item['process_id']} -> PROC_{valid_item['process_id'][-3:]}")
-                    valid_item['process_id'] = f"PROC_{valid_item['process_id'][-3:]}"
+            if level == 'process_definitions' and 'process_id' in item:
+                process_id = item['process_id']
+                if not process_id.startswith('PROC_'):
+                    corrected = 'PROC_' + process_id[-3:]
+                    logger.debug("[ValidationLayer] Correcting process_id format: %s -> %s", process_id, corrected)
+                    item['process_id'] = corrected
             
-            # Add to result if valid
+            # Yield if valid
             if is_valid:
-                result.append(valid_item)
+                yield item
+        
+        # Report the skipped entries once instead of per item
+        if skipped:
+            logger.warning("[ValidationLayer] Skipped %s %s item(s) that are not dictionaries", skipped, level)
+    
+    @staticmethod
+    def _is_clean(level, data):
+        """
+        Checks in a single pass whether validate would return every item unchanged:
+        valid IDs, all required and defaulted fields present and every value
+        already of an accepted type.
         
-        return result
+        Args:
+            level (str): Level of the data (e.g., process_definitions)
+            data (list): Items to check
+            
+        Returns:
+            bool: True if the items need no completion or conversion
+        """
+        typed_fields, defaults, required_fields, _ = ValidationLayer._get_compiled(level)
+        id_rule = ValidationLayer._ID_RULES.get(level)
+        for item in data:
+            if not isinstance(item, dict):
+                return False
+            
+            # IDs that would be generated or corrected
+            if id_rule:
+                value = item.get(id_rule[0])
+                if not (isinstance(value, str) and value.startswith(id_rule[1])):
+                    return False
+            elif level == 'bpmn_elements':
+                value = item.get('element_id')
+                if not (value and isinstance(value, str)):
+                    return False
+            elif level == 'process_definitions' and 'process_id' in item:
+                value = item['process_id']
+                if not (isinstance(value, str) and value.startswith('PROC_')):
+                    return False
+            
+            # Fields that would be filled in or reported
+            for field, _ in defaults:
+                if field not in item:
+                    return False
+            for field in required_fields:
+                if field not in item:
+                    return False
+            
+            # Values that would be passed to a coercer
+            for field, accepted_types, _ in typed_fields:
+                value = item.get(field, _MISSING)
+                if value is not _MISSING and not (accepted_types and isinstance(value, accepted_types)):
+                    return False
+        return True
+    
+    # Fields that items of a level adopt from the context when missing, in order
+    _CONTEXT_FIELDS = {
+        'sequence_flows': ('process_id',),
+        'bpmn_elements': ('process_id',),
+        'pools': ('process_id',),
+        # Lanes also belong to the pool given in the context
+        'lanes': ('pool_id', 'process_id'),
+    }
     
     @staticmethod
-    def _ensure_flow_ids(flows):
+    def _get_context_values(level, context):
         """
-        Ensure all flows have valid flow_id format
+        Collects the IDs that items of a level adopt from the context when missing.
         
         Args:
-            flows (list): List of flow dictionaries
+            level (str): Level of the data (e.g., bpmn_elements)
+            context (dict, optional): Context data for validation
+            
+        Returns:
+            list: (field, value) pairs to set on items that lack the field
         """
-        for i, flow in enumerate(flows):
-            if isinstance(flow, dict):
-                # Generate ID if missing or invalid format
-                if 'flow_id' not in flow or not flow['flow_id'] or not isinstance(flow['flow_id'], str):
-                    flow['flow_id'] = f"FLOW_{(i+1):03d}"
-                # Correct format if needed    
-                elif not flow['flow_id'].startswith('FLOW_'):
-                    flow['flow_id'] = f"FLOW_{flow['flow_id'][-3:]}"
+        fields = ValidationLayer._CONTEXT_FIELDS.get(level)
+        if not context or not fields:
+            return []
+        
+        fill_values = []
+        for field in fields:
+            value = ValidationLayer._get_context_value(field, level, context)
+            if value:
+                fill_values.append((field, value))
+        return fill_values
     
     @staticmethod
-    def _ensure_element_ids(elements):
+    def _get_context_value(field, level, context):
         """
-        Ensure all elements have valid element_id format
+        Looks up one ID in the context.
         
         Args:
-            elements (list): List of element dictionaries
+            field (str): 'process_id' (from the process definitions) or 'pool_id' (from the pool)
+            level (str): Level of the data (e.g., bpmn_elements)
+            context (dict): Context data for validation
+            
+        Returns:
+            The ID, or None if the context does not provide it
         """
-        for i, element in enumerate(elements):
-            if isinstance(element, dict):
-                # Get element type to determine ID prefix
-                element_type = element.get('element_type', '').lower()
-                prefix = 'ELEM_'
-                
-                if element_type == 'event':
-                    subtype = element.get('element_subtype', '').lower()
-                    if 'start' in subtype:
-                        prefix = 'START_'
-                    elif 'end' in subtype:
-                        prefix = 'END_'
-                    else:
-                        prefix = 'EVEN_'
-                elif element_type == 'task':
-                    prefix = 'TASK_'
-                elif element_type == 'gateway':
-                    prefix = 'GATE_'
-                    
-                # Generate ID if missing or invalid format
-                if 'element_id' not in element or not element['element_id'] or not isinstance(element['element_id'], str):
-                    element['element_id'] = f"{prefix}{(i+1):03d}"
+        if field == 'pool_id':
+            pool = context.get('pool')
+            return pool.get('pool_id') if isinstance(pool, dict) else None
+        
+        # Extract process_id from process definitions
+        process_defs = context.get('process_definitions')
+        if isinstance(process_defs, list) and len(process_defs) > 0:
+            return process_defs[0].get('process_id')
+        if isinstance(process_defs, dict) and level in ('sequence_flows', 'bpmn_elements'):
+            return process_defs.get('process_id')
+        return None
+    
+    # Compiled field plans per level, built on first use by _get_compiled
+    _compiled = {}
+    
+    # Python types that the coercers return unchanged for a schema type
+    # (bool counts as number, as in _to_number)
+    _ACCEPTED_TYPES = {
+        'string': str,
+        'number': (int, float),
+        'integer': int,
+        'boolean': bool,
+    }
     
     @staticmethod
-    def _ensure_pool_ids(pools):
+    def _get_compiled(level):
         """
-        Ensure all pools have valid pool_id format
+        Returns the compiled field plan for a level, building it on first use.
+        The plan resolves every schema lookup once and splits the fields by
+        what has to be done with them, so the per-item loop in validate runs
+        three short loops instead of walking the schema definition again.
+        It also records which Python types already satisfy a field, so
+        the coercer only runs for values that may need a conversion.
         
         Args:
-            pools (list): List of pool dictionaries
+            level (str): Level to get the plan for (e.g., process_definitions)
+            
+        Returns:
+            tuple: (typed_fields, defaults, required_fields, fast_check) with one
+                   (field, accepted_types, coerce) entry per typed field,
+                   one (field, default) entry per field with a default, the
+                   names of required fields without a default and the
+                   fastjsonschema validator (None without fastjsonschema);
+                   None if no schema exists for the level
         """
-        for i, pool in enumerate(pools):
-            if isinstance(pool, dict):
-                # Generate ID if missing or invalid format
-                if 'pool_id' not in pool or not pool['pool_id'] or not isinstance(pool['pool_id'], str):
-                    pool['pool_id'] = f"POOL_{(i+1):03d}"
-                # Correct format if needed    
-                elif not pool['pool_id'].startswith('POOL_'):
-                    pool['pool_id'] = f"POOL_{pool['pool_id'][-3:]}"
-
+        compiled = ValidationLayer._compiled.get(level)
+        if compiled is None:
+            schema = ValidationLayer._get_schema(level)
+            if not schema:
+                return None
+            typed_fields = tuple(
+                (
+                    field,
+                    ValidationLayer._get_accepted_types(field_schema),
+                    ValidationLayer._get_coercer(field_schema['type'], field_schema.get('format'))
+                )
+                for field, field_schema in schema.items() if field_schema.get('type') is not None
+            )
+            defaults = tuple(
+                (field, field_schema['default'])
+                for field, field_schema in schema.items() if 'default' in field_schema
+            )
+            required_fields = tuple(
+                field for field, field_schema in schema.items()
+                if field_schema.get('required', False) and 'default' not in field_schema
+            )
+            compiled = (typed_fields, defaults, required_fields,
+                        ValidationLayer._compile_fast_check(schema, required_fields))
+            ValidationLayer._compiled[level] = compiled
+        return compiled
+    
     @staticmethod
-    def _ensure_lane_ids(lanes, pool_id=None):
+    def _compile_fast_check(schema, required_fields):
         """
-        Ensure all lanes have valid lane_id format
+        Generates a validator function for a level with fastjsonschema, if installed.
+        Items it accepts have the right types and all required fields, so the
+        per-field checks can be skipped for them; other items take the
+        regular path, which converts values instead of rejecting them.
         
         Args:
-            lanes (list): List of lane dictionaries
-            pool_id (str, optional): Pool ID to assign to lanes missing it
+            schema (dict): Schema definition of the level
+            required_fields (tuple): Required fields without a default
+            
+        Returns:
+            function: Validator raising fastjsonschema.JsonSchemaException, or None
         """
-        for i, lane in enumerate(lanes):
-            if isinstance(lane, dict):
-                # Generate ID if missing or invalid format
-                if 'lane_id' not in lane or not lane['lane_id'] or not isinstance(lane['lane_id'], str):
-                    lane['lane_id'] = f"LANE_{(i+1):03d}"
-                # Correct format if needed    
-                elif not lane['lane_id'].startswith('LANE_'):
-                    lane['lane_id'] = f"LANE_{lane['lane_id'][-3:]}"
-                
-                # Ensure pool_id is set if provided
-                if pool_id and ('pool_id' not in lane or not lane['pool_id']):
-                    lane['pool_id'] = pool_id
-
+        if fastjsonschema is None:
+            return None
+        # Fields with a default may be missing; they are filled in afterwards
+        json_schema = dict(SchemaLoader.to_json_schema(schema), required=list(required_fields))
+        try:
+            return fastjsonschema.compile(json_schema)
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            logger.warning("[ValidationLayer] Could not compile fast validator: %s", e)
+            return None
+    
+    @staticmethod
+    def _conforms(fast_check, item):
+        """Returns True if an item passes the generated validator unchanged"""
+        try:
+            fast_check(item)
+            return True
+        except fastjsonschema.JsonSchemaException:
+            return False
+    
+    @staticmethod
+    def _get_accepted_types(field_schema):
+        """
+        Returns the Python types a field's value can have to pass unchanged.
+        
+        Args:
+            field_schema (dict): Schema definition of a single field
+            
+        Returns:
+            type/tuple: Types for isinstance, or None if every value has to be
+                        checked by the coercer (type lists, formats)
+        """
+        expected_type = field_schema.get('type')
+        # Formats are checked on the string value, so such fields are always checked
+        if not isinstance(expected_type, str) or field_schema.get('format'):
+            return None
+        return ValidationLayer._ACCEPTED_TYPES.get(expected_type)
+    
+    # ID field and prefix per level (bpmn_elements derive the prefix from the element type)
+    _ID_RULES = {
+        'sequence_flows': ('flow_id', 'FLOW_'),
+        'pools': ('pool_id', 'POOL_'),
+        'lanes': ('lane_id', 'LANE_'),
+    }
+    
+    # ID prefix per element type; events are told apart by their subtype
+    _ELEMENT_ID_PREFIXES = {
+        'task': 'TASK_',
+        'gateway': 'GATE_',
+    }
+    
+    # Numeric parts of generated IDs ("001" to "999"), formatted once
+    _ID_SUFFIXES = tuple(f"{i:03d}" for i in range(1, 1000))
+    
+    @staticmethod
+    def _id_suffix(index):
+        """Returns the numeric part of the ID generated for the item at a position"""
+        if index < len(ValidationLayer._ID_SUFFIXES):
+            return ValidationLayer._ID_SUFFIXES[index]
+        return f"{(index+1):03d}"
+    
+    @staticmethod
+    def _ensure_id(item, index, field, prefix):
+        """
+        Ensure an item has a valid ID with the given prefix
+        
+        Args:
+            item (dict): Item dictionary (flow, pool or lane)
+            index (int): Position of the item, used for generated IDs
+            field (str): Name of the ID field (e.g., flow_id)
+            prefix (str): Expected ID prefix (e.g., FLOW_)
+        """
+        value = item.get(field)
+        # Valid IDs are kept without building a new string
+        if isinstance(value, str) and value.startswith(prefix):
+            return
+        # Generate ID if missing or invalid format
+        if not value or not isinstance(value, str):
+            item[field] = prefix + ValidationLayer._id_suffix(index)
+        # Correct format if needed
+        else:
+            item[field] = prefix + value[-3:]
+    
+    @staticmethod
+    def _ensure_element_id(element, index):
+        """
+        Ensure an element has a valid element_id format
+        
+        Args:
+            element (dict): Element dictionary
+            index (int): Position of the element, used for generated IDs
+        """
+        # Existing IDs are kept as they are, whatever their prefix
+        element_id = element.get('element_id')
+        if element_id and isinstance(element_id, str):
+            return
+        
+        # Get element type to determine ID prefix
+        element_type = element.get('element_type', '').lower()
+        if element_type == 'event':
+            subtype = element.get('element_subtype', '').lower()
+            if 'start' in subtype:
+                prefix = 'START_'
+            elif 'end' in subtype:
+                prefix = 'END_'
+            else:
+                prefix = 'EVEN_'
+        else:
+            prefix = ValidationLayer._ELEMENT_ID_PREFIXES.get(element_type, 'ELEM_')
+            
+        # Generate ID
+        element['element_id'] = prefix + ValidationLayer._id_suffix(index)
+    
+    # Coercer per schema type (names, so they are looked up when a plan is compiled)
+    _COERCERS = {
+        'string': '_to_string',
+        'number': '_to_number',
+        'integer': '_to_integer',
+        'boolean': '_to_boolean',
+        'null': '_to_null',
+    }
+    
+    @staticmethod
+    def _get_coercer(expected_type, format_type=None):
+        """
+        Resolves the conversion for a field once, so validating a value is a
+        single call instead of a walk through all types.
+        
+        Args:
+            expected_type: Expected type(s) from schema
+            format_type: Optional format specifier (e.g., date-time)
+            
+        Returns:
+            function: coerce(value, field_name) returning the converted value
+        """
+        # Handle array of types (a tuple in the frozen SchemaLoader schemas)
+        if isinstance(expected_type, (list, tuple)):
+            # Values other than None are converted to the first type that is not null
+            options = [t for t in expected_type if t != 'null']
+            first = ValidationLayer._get_coercer(options[0]) if options else ValidationLayer._keep
+            if 'null' in expected_type:
+                coerce = lambda value, field_name: None if value is None else first(value, field_name)
+            else:
+                coerce = first
+        else:
+            name = ValidationLayer._COERCERS.get(expected_type)
+            coerce = getattr(ValidationLayer, name) if name else ValidationLayer._keep
+        
+        # Handle special formats on the converted value
+        if format_type == 'date-time':
+            return lambda value, field_name: ValidationLayer._check_date_time(coerce(value, field_name))
+        return coerce
+    
     @staticmethod
     def _validate_type(value, expected_type, format_type=None, field_name=None):
         """
@@ -259,58 +523,66 @@ class ValidationLayer:
         Returns:
             The validated value, potentially converted to correct type
         """
-        # Handle array of types
-        if isinstance(expected_type, list):
-            # Try each type in the list
-            for type_option in expected_type:
-                # Skip null if the value is not None
-                if type_option == 'null' and value is not None:
-                    continue
-                    
-                try:
-                    return ValidationLayer._validate_type(value, type_option, format_type, field_name)
-                except ValueError:
-                    continue
-                    
-            # If we get here, none of the types worked
+        return ValidationLayer._get_coercer(expected_type, format_type)(value, field_name)
+    
+    @staticmethod
+    def _keep(value, field_name=None):
+        """Returns values of unknown types unchanged"""
+        return value
+    
+    @staticmethod
+    def _to_string(value, field_name=None):
+        """Converts a value to a string"""
+        if isinstance(value, str):
             return value
-            
-        # Handle specific types
-        if expected_type == 'string':
-            if not isinstance(value, str):
-                if field_name:
-                    print(f"[ValidationLayer] Converting {field_name} to string: {value}")
-                return str(value)
-        elif expected_type == 'number':
-            if not isinstance(value, (int, float)):
-                try:
-                    return float(value)
-                except (ValueError, TypeError):
-                    if field_name:
-                        print(f"[ValidationLayer] Invalid number format in {field_name}: {value}")
-                    return 0
-        elif expected_type == 'integer':
-            if not isinstance(value, int):
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    if field_name:
-                        print(f"[ValidationLayer] Invalid integer format in {field_name}: {value}")
-                    return 0
-        elif expected_type == 'boolean':
-            if not isinstance(value, bool):
-                if isinstance(value, str):
-                    return value.lower() in ('true', 'yes', '1')
-                return bool(value)
-        elif expected_type == 'null':
-            return None
-            
-        # Handle special formats
-        if format_type == 'date-time' and isinstance(value, str):
-            # Simple validation check, could be enhanced
-            if not ('T' in value and ':' in value):
-                return "2025-04-26T12:00:00Z"  # Default date-time
-        
+        if field_name:
+            logger.debug("[ValidationLayer] Converting %s to string: %s", field_name, value)
+        return str(value)
+    
+    @staticmethod
+    def _to_number(value, field_name=None):
+        """Converts a value to a number (0 if it cannot be read as one)"""
+        if isinstance(value, (int, float)):
+            return value
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            if field_name:
+                logger.warning("[ValidationLayer] Invalid number format in %s: %s", field_name, value)
+            return 0
+    
+    @staticmethod
+    def _to_integer(value, field_name=None):
+        """Converts a value to an integer (0 if it cannot be read as one)"""
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            if field_name:
+                logger.warning("[ValidationLayer] Invalid integer format in %s: %s", field_name, value)
+            return 0
+    
+    @staticmethod
+    def _to_boolean(value, field_name=None):
+        """Converts a value to a boolean ('true', 'yes' and '1' count as true)"""
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            return value.lower() in ('true', 'yes', '1')
+        return bool(value)
+    
+    @staticmethod
+    def _to_null(value, field_name=None):
+        """Returns None for fields that can only be null"""
+        return None
+    
+    @staticmethod
+    def _check_date_time(value):
+        """Replaces strings that do not look like a date-time with a default"""
+        # Simple validation check, could be enhanced
+        if isinstance(value, str) and not ('T' in value and ':' in value):
+            return "2025-04-26T12:00:00Z"  # Default date-time
         return value
     
     @staticmethod
@@ -324,17 +596,9 @@ class ValidationLayer:
         Returns:
             dict: Schema definition or None if not found
         """
-        # Get all schemas
-        schemas = SchemaLoader.load()
-        
         # Special handling for process phases which aren't in standard schemas
         if level == 'process_phases':
-            return {
-                'phase_id': {'type': 'string', 'required': True},
-                'phase_name': {'type': 'string', 'required': True},
-                'description': {'type': 'string', 'required': True},
-                'order': {'type': 'integer', 'required': False}
-            }
+            return _PROCESS_PHASES_SCHEMA
             
-        # Return the requested schema if available
-        return schemas.get(level, None)
\ No newline at end of file
+        # Return the requested schema if available (SchemaLoader.load builds them only once)
+        return SchemaLoader.load().get(level, None)
\ No newline at end of file
@@ -5,8 +5,21 @@ Converts the generated data structure into standard BPMN 2.0 XML format.
 """
 
 import os
-import xml.dom.minidom
 import uuid
+import itertools
+from ..util.config import Config
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:  # lxml is optional, the stdlib ElementTree has the same element API
+    from xml.etree import ElementTree
+
+# lxml keeps the namespace prefixes on the elements, the stdlib module in a global registry
+_LXML = hasattr(ElementTree, 'LXML_VERSION')
+
+def _qualified_tags(namespace, names):
+    """Returns the Clark notation tag ({namespace}name) of each name"""
+    return {name: f"{{{namespace}}}{name}" for name in names}
 
 class BPMNGenerator:
     """
@@ -19,20 +32,68 @@ class BPMNGenerator:
     DC_NS = "http://www.omg.org/spec/DD/20100524/DC"
     DI_NS = "http://www.omg.org/spec/DD/20100524/DI"
     
-    def __init__(self, output_path=None):
+    # Prefixes of the diagram namespaces (the BPMN namespace is the default namespace)
+    NSMAP = {None: BPMN_NS, "bpmndi": BPMNDI_NS, "dc": DC_NS, "di": DI_NS}
+    
+    # BPMN 2.0 task type per task subtype (other subtypes become a plain task)
+    TASK_TYPES = {
+        "userTask": "userTask", "user": "userTask",
+        "serviceTask": "serviceTask", "service": "serviceTask",
+        "scriptTask": "scriptTask", "script": "scriptTask",
+        "businessRuleTask": "businessRuleTask", "business-rule": "businessRuleTask",
+        "manualTask": "manualTask", "manual": "manualTask",
+        "receiveTask": "receiveTask", "receive": "receiveTask",
+        "sendTask": "sendTask", "send": "sendTask",
+    }
+    
+    # BPMN 2.0 gateway type per gateway subtype (other subtypes become an exclusive gateway)
+    GATEWAY_TYPES = {
+        "parallelGateway": "parallelGateway", "parallel": "parallelGateway",
+        "inclusiveGateway": "inclusiveGateway", "inclusive": "inclusiveGateway",
+        "eventBasedGateway": "eventBasedGateway", "event-based": "eventBasedGateway",
+        "complexGateway": "complexGateway", "complex": "complexGateway",
+    }
+    
+    # Event definition per keyword in an intermediate event's subtype, checked in order
+    EVENT_DEFINITIONS = (
+        ("Message", "messageEventDefinition", "MessageEventDefinition_"),
+        ("Timer", "timerEventDefinition", "TimerEventDefinition_"),
+        ("Error", "errorEventDefinition", "ErrorEventDefinition_"),
+    )
+    
+    # Qualified tags of the process nodes, built once instead of for every node
+    BPMN_TAGS = _qualified_tags(BPMN_NS, (
+        "definitions", "process", "sequenceFlow", "conditionExpression",
+        "startEvent", "endEvent", "intermediateThrowEvent", "intermediateCatchEvent",
+        "task", *TASK_TYPES.values(), "exclusiveGateway", *GATEWAY_TYPES.values(),
+        *(definition_type for _, definition_type, _ in EVENT_DEFINITIONS),
+    ))
+    
+    # Qualified tags of the diagram nodes
+    DIAGRAM_TAG = f"{{{BPMNDI_NS}}}BPMNDiagram"
+    PLANE_TAG = f"{{{BPMNDI_NS}}}BPMNPlane"
+    SHAPE_TAG = f"{{{BPMNDI_NS}}}BPMNShape"
+    EDGE_TAG = f"{{{BPMNDI_NS}}}BPMNEdge"
+    BOUNDS_TAG = f"{{{DC_NS}}}Bounds"
+    WAYPOINT_TAG = f"{{{DI_NS}}}waypoint"
+    
+    def __init__(self, output_path=None, pretty=False):
         """
         Initialize a new BPMN generator
         
         Args:
             output_path (str): Path to save the BPMN XML file, if None a default path will be used
+            pretty (bool, optional): Indent the XML for reading; BPMN tools do not need
+                                     the whitespace, so the file is written compact by default
         """
         self.output_path = output_path
-        self.dom = None
+        self.pretty = pretty
         self.process_node = None
         self.diagram_node = None
         self.plane_node = None
         self.definitions_node = None
         self.elements = {}  # Map from element_id to element node
+        self._id_counter = itertools.count(1)  # Numbers of generated element and flow IDs
         
     def generate_from_context(self, context):
         """
@@ -61,26 +122,21 @@ class BPMNGenerator:
     
     def _initialize_document(self):
         """Initialize the XML document with BPMN structure"""
-        # Create document with properly defined namespace
-        impl = xml.dom.minidom.getDOMImplementation()
-        # Use a simple document creation to avoid namespace issues
-        self.dom = impl.createDocument(None, "definitions", None)
+        attrib = {"id": f"Definitions_{uuid.uuid4().hex[:8]}", "targetNamespace": self.BPMN_NS}
         
-        # Get the root element
-        self.definitions_node = self.dom.documentElement
-        
-        # Set namespaces
-        self.definitions_node.setAttribute("xmlns", self.BPMN_NS)
-        self.definitions_node.setAttribute("xmlns:bpmndi", self.BPMNDI_NS)
-        self.definitions_node.setAttribute("xmlns:dc", self.DC_NS)
-        self.definitions_node.setAttribute("xmlns:di", self.DI_NS)
-        self.definitions_node.setAttribute("id", f"Definitions_{uuid.uuid4().hex[:8]}")
-        self.definitions_node.setAttribute("targetNamespace", self.BPMN_NS)
+        # Create the root element with the namespace declarations
+        if _LXML:
+            self.definitions_node = ElementTree.Element(self.BPMN_TAGS["definitions"], attrib, nsmap=self.NSMAP)
+        else:
+            # The empty prefix writes elements of the BPMN namespace without a prefix
+            for prefix, uri in self.NSMAP.items():
+                ElementTree.register_namespace(prefix or "", uri)
+            self.definitions_node = ElementTree.Element(self.BPMN_TAGS["definitions"], attrib)
         
         # Create diagram root
-        self.diagram_node = self.dom.createElement("bpmndi:BPMNDiagram")
-        self.diagram_node.setAttribute("id", "BPMNDiagram_1")
-        self.definitions_node.appendChild(self.diagram_node)
+        self.diagram_node = ElementTree.SubElement(
+            self.definitions_node, self.DIAGRAM_TAG, {"id": "BPMNDiagram_1"}
+        )
         
     def _create_process(self, context):
         """Create the process element"""
@@ -96,17 +152,16 @@ class BPMNGenerator:
                 if 'process_name' in process_def:
                     process_name = process_def['process_name']
         
-        # Create process node without prefix
-        self.process_node = self.dom.createElement("process")
-        self.process_node.setAttribute("id", process_id)
-        self.process_node.setAttribute("name", process_name)
-        self.definitions_node.appendChild(self.process_node)
+        # Create process node in the default namespace
+        self.process_node = ElementTree.SubElement(
+            self.definitions_node, self.BPMN_TAGS["process"], {"id": process_id, "name": process_name}
+        )
         
         # Create diagram plane
-        self.plane_node = self.dom.createElement("bpmndi:BPMNPlane")
-        self.plane_node.setAttribute("id", f"BPMNPlane_{process_id}")
-        self.plane_node.setAttribute("bpmnElement", process_id)
-        self.diagram_node.appendChild(self.plane_node)
+        self.plane_node = ElementTree.SubElement(
+            self.diagram_node, self.PLANE_TAG,
+            {"id": f"BPMNPlane_{process_id}", "bpmnElement": process_id}
+        )
     
     def _create_elements(self, context):
         """Create all BPMN elements in the process"""
@@ -114,8 +169,19 @@ class BPMNGenerator:
         if 'bpmn_elements' not in context or not context['bpmn_elements']:
             return
         
+        # Bind the map and the node builders once for the loop
+        elements = self.elements
+        create_start_event = self._create_start_event
+        create_end_event = self._create_end_event
+        create_intermediate_event = self._create_intermediate_event
+        create_task = self._create_task
+        create_gateway = self._create_gateway
+        create_shape = self._create_shape
+        
         for element in context['bpmn_elements']:
-            element_id = element.get('element_id', f"Element_{uuid.uuid4().hex[:8]}")
+            element_id = element.get('element_id')
+            if element_id is None:
+                element_id = self._generate_id("Element")
             element_name = element.get('element_name', "")
             element_type = element.get('element_type', "")
             element_subtype = element.get('element_subtype', "")
@@ -125,82 +191,101 @@ class BPMNGenerator:
             
             if element_type == "event":
                 if element_subtype == "startEvent":
-                    bpmn_node = self._create_start_event(element_id, element_name)
+                    bpmn_node = create_start_event(element_id, element_name)
                 elif element_subtype == "endEvent":
-                    bpmn_node = self._create_end_event(element_id, element_name)
+                    bpmn_node = create_end_event(element_id, element_name)
                 else:  # Generic event
-                    bpmn_node = self._create_intermediate_event(element_id, element_name, element_subtype)
+                    bpmn_node = create_intermediate_event(element_id, element_name, element_subtype)
             
             elif element_type == "task":
-                bpmn_node = self._create_task(element_id, element_name, element_subtype)
+                bpmn_node = create_task(element_id, element_name, element_subtype)
             
             elif element_type == "gateway":
-                bpmn_node = self._create_gateway(element_id, element_name, element_subtype)
+                bpmn_node = create_gateway(element_id, element_name, element_subtype)
             
             # Create diagram elements
-            if bpmn_node:
+            if bpmn_node is not None:
                 # Store for reference
-                self.elements[element_id] = bpmn_node
+                elements[element_id] = bpmn_node
                 
-                # Create shape
-                x = element.get('position_x', (len(self.elements) * 150) % 800)
-                y = element.get('position_y', 100 + ((len(self.elements) * 150) // 800) * 150)
+                # Create shape (the default grid position is only computed if a position is missing)
+                x = element.get('position_x')
+                y = element.get('position_y')
+                if x is None or y is None:
+                    row, column = divmod(len(elements) * 150, 800)
+                    if x is None:
+                        x = column
+                    if y is None:
+                        y = 100 + row * 150
                 width = element.get('width', 100)
                 height = element.get('height', 80)
                 
-                self._create_shape(element_id, x, y, width, height)
+                create_shape(element_id, x, y, width, height)
     
     def _create_flows(self, context):
         """Create all sequence flows in the process"""
         # Skip if no flows
         if 'sequence_flows' not in context or not context['sequence_flows']:
             return
-            
+        
+        # Bind the lookups used for every flow once for the loop
+        elements = self.elements
+        process_node = self.process_node
+        sub_element = ElementTree.SubElement
+        create_edge = self._create_edge
+        flow_tag = self.BPMN_TAGS["sequenceFlow"]
+        condition_tag = self.BPMN_TAGS["conditionExpression"]
+        
         for flow in context['sequence_flows']:
-            flow_id = flow.get('flow_id', f"Flow_{uuid.uuid4().hex[:8]}")
+            flow_id = flow.get('flow_id')
+            if flow_id is None:
+                flow_id = self._generate_id("Flow")
             source_ref = flow.get('source_ref', "")
             target_ref = flow.get('target_ref', "")
             condition = flow.get('condition_expr', None)
             
             # Skip invalid flows
-            if not source_ref or not target_ref or source_ref not in self.elements or target_ref not in self.elements:
+            if not source_ref or not target_ref or source_ref not in elements or target_ref not in elements:
                 continue
             
-            # Create sequence flow
-            flow_node = self.dom.createElement("sequenceFlow")
-            flow_node.setAttribute("id", flow_id)
-            flow_node.setAttribute("sourceRef", source_ref)
-            flow_node.setAttribute("targetRef", target_ref)
+            # Create sequence flow in the process
+            flow_node = sub_element(
+                process_node, flow_tag, {"id": flow_id, "sourceRef": source_ref, "targetRef": target_ref}
+            )
             
             # Add condition if specified
             if condition:
-                cond_node = self.dom.createElement("conditionExpression")
-                cond_text = self.dom.createTextNode(condition)
-                cond_node.appendChild(cond_text)
-                flow_node.appendChild(cond_node)
-                
-            # Add to process
-            self.process_node.appendChild(flow_node)
+                cond_node = sub_element(flow_node, condition_tag)
+                cond_node.text = condition
             
             # Create edge for diagram
-            self._create_edge(flow_id, source_ref, target_ref)
+            create_edge(flow_id, source_ref, target_ref)
+    
+    def _generate_id(self, prefix):
+        """
+        Generate an ID for an element or flow that has none
+        
+        Args:
+            prefix (str): Prefix of the ID (e.g., Element)
+            
+        Returns:
+            str: ID that is unique within the document
+        """
+        # A counter is enough within one document and needs no random bytes per ID
+        return f"{prefix}_{next(self._id_counter):08x}"
     
     def _create_start_event(self, element_id, name):
         """Create a start event"""
-        event_node = self.dom.createElement("startEvent")
-        event_node.setAttribute("id", element_id)
+        event_node = ElementTree.SubElement(self.process_node, self.BPMN_TAGS["startEvent"], {"id": element_id})
         if name:
-            event_node.setAttribute("name", name)
-        self.process_node.appendChild(event_node)
+            event_node.set("name", name)
         return event_node
     
     def _create_end_event(self, element_id, name):
         """Create an end event"""
-        event_node = self.dom.createElement("endEvent")
-        event_node.setAttribute("id", element_id)
+        event_node = ElementTree.SubElement(self.process_node, self.BPMN_TAGS["endEvent"], {"id": element_id})
         if name:
-            event_node.setAttribute("name", name)
-        self.process_node.appendChild(event_node)
+            event_node.set("name", name)
         return event_node
     
     def _create_intermediate_event(self, element_id, name, subtype):
@@ -211,93 +296,51 @@ class BPMNGenerator:
         if "Catch" in subtype:
             event_type = "intermediateCatchEvent"
         
-        event_node = self.dom.createElement(event_type)
-        event_node.setAttribute("id", element_id)
+        event_node = ElementTree.SubElement(self.process_node, self.BPMN_TAGS[event_type], {"id": element_id})
         if name:
-            event_node.setAttribute("name", name)
+            event_node.set("name", name)
         
-        # Add event definitions for specific types
-        if "Message" in subtype:
-            def_node = self.dom.createElement("messageEventDefinition")
-            def_node.setAttribute("id", f"MessageEventDefinition_{element_id}")
-            event_node.appendChild(def_node)
-        elif "Timer" in subtype:
-            def_node = self.dom.createElement("timerEventDefinition")
-            def_node.setAttribute("id", f"TimerEventDefinition_{element_id}")
-            event_node.appendChild(def_node)
-        elif "Error" in subtype:
-            def_node = self.dom.createElement("errorEventDefinition")
-            def_node.setAttribute("id", f"ErrorEventDefinition_{element_id}")
-            event_node.appendChild(def_node)
-            
-        self.process_node.appendChild(event_node)
+        # Add the event definition of the first keyword found in the subtype
+        for keyword, definition_type, id_prefix in self.EVENT_DEFINITIONS:
+            if keyword in subtype:
+                ElementTree.SubElement(
+                    event_node, self.BPMN_TAGS[definition_type], {"id": id_prefix + element_id}
+                )
+                break
         return event_node
     
     def _create_task(self, element_id, name, subtype):
         """Create a task with proper subtype"""
-        task_type = "task"
-        
         # Map subtype to BPMN 2.0 task types
-        if subtype == "userTask" or subtype == "user":
-            task_type = "userTask"
-        elif subtype == "serviceTask" or subtype == "service":
-            task_type = "serviceTask"
-        elif subtype == "scriptTask" or subtype == "script":
-            task_type = "scriptTask"
-        elif subtype == "businessRuleTask" or subtype == "business-rule":
-            task_type = "businessRuleTask"
-        elif subtype == "manualTask" or subtype == "manual":
-            task_type = "manualTask"
-        elif subtype == "receiveTask" or subtype == "receive":
-            task_type = "receiveTask"
-        elif subtype == "sendTask" or subtype == "send":
-            task_type = "sendTask"
-            
-        task_node = self.dom.createElement(task_type)
-        task_node.setAttribute("id", element_id)
+        task_type = self.TASK_TYPES.get(subtype, "task")
+        
+        task_node = ElementTree.SubElement(self.process_node, self.BPMN_TAGS[task_type], {"id": element_id})
         if name:
-            task_node.setAttribute("name", name)
-            
-        self.process_node.appendChild(task_node)
+            task_node.set("name", name)
         return task_node
     
     def _create_gateway(self, element_id, name, subtype):
         """Create a gateway with proper subtype"""
-        gateway_type = "exclusiveGateway"  # Default
-        
         # Map subtype to BPMN 2.0 gateway types
-        if subtype == "parallelGateway" or subtype == "parallel":
-            gateway_type = "parallelGateway"
-        elif subtype == "inclusiveGateway" or subtype == "inclusive":
-            gateway_type = "inclusiveGateway"
-        elif subtype == "eventBasedGateway" or subtype == "event-based":
-            gateway_type = "eventBasedGateway"
-        elif subtype == "complexGateway" or subtype == "complex":
-            gateway_type = "complexGateway"
-            
-        gateway_node = self.dom.createElement(gateway_type)
-        gateway_node.setAttribute("id", element_id)
+        gateway_type = self.GATEWAY_TYPES.get(subtype, "exclusiveGateway")
+        
+        gateway_node = ElementTree.SubElement(self.process_node, self.BPMN_TAGS[gateway_type], {"id": element_id})
         if name:
-            gateway_node.setAttribute("name", name)
-            
-        self.process_node.appendChild(gateway_node)
+            gateway_node.set("name", name)
         return gateway_node
     
     def _create_shape(self, element_id, x, y, width, height):
         """Create a BPMNShape for diagram visualization"""
-        shape = self.dom.createElement("bpmndi:BPMNShape")
-        shape.setAttribute("id", f"BPMNShape_{element_id}")
-        shape.setAttribute("bpmnElement", element_id)
+        shape = ElementTree.SubElement(
+            self.plane_node, self.SHAPE_TAG,
+            {"id": f"BPMNShape_{element_id}", "bpmnElement": element_id}
+        )
         
         # Create bounds
-        bounds = self.dom.createElement("dc:Bounds")
-        bounds.setAttribute("x", str(x))
-        bounds.setAttribute("y", str(y))
-        bounds.setAttribute("width", str(width))
-        bounds.setAttribute("height", str(height))
-        shape.appendChild(bounds)
-        
-        self.plane_node.appendChild(shape)
+        ElementTree.SubElement(
+            shape, self.BOUNDS_TAG,
+            {"x": str(x), "y": str(y), "width": str(width), "height": str(height)}
+        )
         return shape
     
     def _create_edge(self, flow_id, source_ref, target_ref):
@@ -305,24 +348,16 @@ class BPMNGenerator:
         # Calculate waypoints based on source and target positions
         # For simplicity, we'll just create direct lines between elements
         
-        edge = self.dom.createElement("bpmndi:BPMNEdge")
-        edge.setAttribute("id", f"BPMNEdge_{flow_id}")
-        edge.setAttribute("bpmnElement", flow_id)
+        edge = ElementTree.SubElement(
+            self.plane_node, self.EDGE_TAG,
+            {"id": f"BPMNEdge_{flow_id}", "bpmnElement": flow_id}
+        )
         
         # Simplified waypoint calculation
         # In a real implementation, we'd use the element positions to calculate better waypoints
-        wp1 = self.dom.createElement("di:waypoint")
-        wp1.setAttribute("x", "0")  # These would be calculated based on element positions
-        wp1.setAttribute("y", "0")
-        
-        wp2 = self.dom.createElement("di:waypoint")
-        wp2.setAttribute("x", "100")  # These would be calculated based on element positions
-        wp2.setAttribute("y", "100")
-        
-        edge.appendChild(wp1)
-        edge.appendChild(wp2)
-        
-        self.plane_node.appendChild(edge)
+        # (these would be calculated based on element positions)
+        ElementTree.SubElement(edge, self.WAYPOINT_TAG, {"x": "0", "y": "0"})
+        ElementTree.SubElement(edge, self.WAYPOINT_TAG, {"x": "100", "y": "100"})
         return edge
     
     def _save_to_file(self):
@@ -330,14 +365,19 @@ class BPMNGenerator:
         # Create output path if not specified
         if not self.output_path:
             output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output'))
-            os.makedirs(output_dir, exist_ok=True)
+            Config.ensure_dir(output_dir)
             self.output_path = os.path.join(output_dir, "generated_bpmn.bpmn")
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        Config.ensure_dir(os.path.dirname(os.path.abspath(self.output_path)))
         
-        # Write to file with pretty formatting
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            f.write(self.dom.toprettyxml(indent="  "))
+        # Write to file, with pretty formatting if requested
+        tree = ElementTree.ElementTree(self.definitions_node)
+        if _LXML:
+            tree.write(self.output_path, pretty_print=self.pretty, xml_declaration=True, encoding="utf-8")
+        else:
+            if self.pretty:
+                ElementTree.indent(tree, space="  ")
+            tree.write(self.output_path, xml_declaration=True, encoding="utf-8")
             
         return self.output_path
\ No newline at end of file
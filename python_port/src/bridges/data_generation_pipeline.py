@@ -1,10 +1,11 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor, wait
 from src.api.data_generator import DataGenerator
 from src.api.prompt_builder import PromptBuilder
 from src.api.schema_loader import SchemaLoader
 from src.api.validation_layer import ValidationLayer
 from src.api.logical_validator import LogicalValidator
+from src.util.fast_json import FastJSON
 
 class DataGenerationPipeline:
     """
@@ -17,55 +18,78 @@ class DataGenerationPipeline:
         os.makedirs(self.output_dir, exist_ok=True)
         # load standard schemas
         self.schemas = SchemaLoader.load()
+        # output files are written on a background thread while the next LLM call runs
+        # (run() stops the thread when it ends)
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-io")
+        self._pending_writes = []
 
     def run(self):
         context = {}
 
-        # 1. Generate process phases
-        phases_prompt = PromptBuilder.build_process_map_prompt(self.api_options.get('product_description', 'Sample product'))
-        phases = DataGenerator.call_llm(phases_prompt, self.api_options)
-        # Save raw phases JSON
-        self._save_json('process_phases.json', phases)
-        # Validate structure
-        phases_valid = ValidationLayer.validate('process_phases', phases)
-        context['process_phases'] = phases_valid
+        try:
+            # 1. Generate process phases
+            phases_prompt = PromptBuilder.build_process_map_prompt(self.api_options.get('product_description', 'Sample product'))
+            phases = DataGenerator.call_llm(phases_prompt, self.api_options)
+            # Save raw phases JSON
+            self._save_json('process_phases.json', phases)
+            # Validate structure
+            phases_valid = ValidationLayer.validate('process_phases', phases)
+            context['process_phases'] = phases_valid
 
-        # 2. Generate process definitions
-        pd_schema = self.schemas.get('process_definitions')
-        pd_prompt = PromptBuilder.build_entity_prompt('process_definitions', pd_schema, {'phases': phases_valid}, batch_size=1)
-        proc_defs = DataGenerator.call_llm(pd_prompt, self.api_options)
-        self._save_json('process_definitions.json', proc_defs)
-        proc_defs_valid = ValidationLayer.validate('process_definitions', proc_defs)
-        context['process_definitions'] = proc_defs_valid
+            # 2. Generate process definitions
+            pd_schema = self.schemas.get('process_definitions')
+            pd_prompt = PromptBuilder.build_entity_prompt('process_definitions', pd_schema, {'phases': phases_valid}, batch_size=1)
+            proc_defs = DataGenerator.call_llm(pd_prompt, self.api_options)
+            self._save_json('process_definitions.json', proc_defs)
+            proc_defs_valid = ValidationLayer.validate('process_definitions', proc_defs)
+            context['process_definitions'] = proc_defs_valid
 
-        # 3. Generate BPMN elements
-        elem_schema = self.schemas.get('bpmn_elements')
-        elem_prompt = PromptBuilder.build_entity_prompt('bpmn_elements', elem_schema, context['process_definitions'][0], batch_size=10)
-        elements = DataGenerator.call_llm(elem_prompt, self.api_options)
-        self._save_json('bpmn_elements.json', elements)
-        elems_valid = ValidationLayer.validate('bpmn_elements', elements, context=context)
-        context['allElementRows'] = elems_valid
+            # 3. Generate BPMN elements
+            elem_schema = self.schemas.get('bpmn_elements')
+            elem_prompt = PromptBuilder.build_entity_prompt('bpmn_elements', elem_schema, context['process_definitions'][0], batch_size=10)
+            elements = DataGenerator.call_llm(elem_prompt, self.api_options)
+            self._save_json('bpmn_elements.json', elements)
+            elems_valid = ValidationLayer.validate('bpmn_elements', elements, context=context)
+            context['bpmn_elements'] = elems_valid
 
-        # 4. Generate sequence flows
-        flow_prompt = PromptBuilder.build_flow_prompt(context)
-        flows = DataGenerator.call_llm(flow_prompt, self.api_options)
-        self._save_json('sequence_flows.json', flows)
-        flows_valid = ValidationLayer.validate('sequence_flows', flows, context=context)
-        context['allFlowRows'] = flows_valid
+            # 4. Generate sequence flows
+            flow_prompt = PromptBuilder.build_flow_prompt(context)
+            flows = DataGenerator.call_llm(flow_prompt, self.api_options)
+            self._save_json('sequence_flows.json', flows)
+            flows_valid = ValidationLayer.validate('sequence_flows', flows, context=context)
+            context['sequence_flows'] = flows_valid
 
-        # 5. Perform logical integrity check
-        issues = LogicalValidator.check_integrity(context, self.api_options)
-        self._save_json('integrity_issues.json', issues)
+            # 5. Perform logical integrity check
+            issues = LogicalValidator.check_integrity(context, self.api_options)
+            self._save_json('integrity_issues.json', issues)
+        finally:
+            # make sure every output file is on disk (also after an error), then stop the writer thread
+            try:
+                self._wait_for_writes()
+            finally:
+                self._io_pool.shutdown(wait=True)
 
         print(f"Generation pipeline completed. Output files saved to {self.output_dir}")
         print("Integrity issues:", issues)
         return context
 
     def _save_json(self, filename, data):
+        # serialize right away (validation completes the items in place), write in the background
+        content = FastJSON.dumps_bytes(data, indent=bool(self.api_options.get('debug')))
+        count = len(data) if hasattr(data, '__len__') else 'N/A'
+        self._pending_writes.append(self._io_pool.submit(self._write_file, filename, content, count))
+
+    def _write_file(self, filename, content, count):
         out_path = os.path.join(self.output_dir, filename)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Saved {filename} ({len(data) if hasattr(data, '__len__') else 'N/A'} items)")
+        with open(out_path, 'wb') as f:
+            f.write(content)
+        print(f"Saved {filename} ({count} items)")
+
+    def _wait_for_writes(self):
+        pending, self._pending_writes = self._pending_writes, []
+        # re-raise the first write error, as the synchronous writes did
+        for future in wait(pending).done:
+            future.result()
 
 if __name__ == '__main__':
     # Example usage
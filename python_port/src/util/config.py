@@ -4,10 +4,31 @@ Handles loading environment variables and providing default configurations.
 """
 
 import os
-from dotenv import load_dotenv
+from types import MappingProxyType
 
-# Load environment variables from .env file
-load_dotenv()
+def _find_env_file():
+    """
+    Searches this module's directory and its parents for a .env file,
+    in the same order as dotenv's find_dotenv
+    
+    Returns:
+        str: Path of the nearest .env file, or None if there is none
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+# Load environment variables from .env file (dotenv is only imported if there is one)
+_env_file = _find_env_file()
+if _env_file:
+    from dotenv import load_dotenv
+    load_dotenv(_env_file)
 
 class Config:
     """Configuration class that manages application settings and API credentials."""
@@ -28,10 +49,29 @@ class Config:
     DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
     TEMP_DIR = os.getenv('TEMP_DIR', '/tmp/bpmn_temp')
     
+    # LLM response cache (replays identical prompts from disk when enabled)
+    LLM_CACHE = os.getenv('BPMN_LLM_CACHE', 'off').lower() in ('on', 'true', '1')
+    LLM_CACHE_DIR = os.getenv('BPMN_LLM_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'bpmn_port', 'llm'))
+    LLM_CACHE_TTL = int(os.getenv('BPMN_LLM_CACHE_TTL', '86400'))  # Seconds until a cached response expires
+    
+    # Return generated data without schema validation (only for known-good pipelines)
+    SKIP_VALIDATION = os.getenv('BPMN_SKIP_VALIDATION', 'false').lower() in ('on', 'true', '1')
+    
     # Default API Options - Updated to use the confirmed free model
     DEFAULT_MODEL = 'microsoft/mai-ds-r1:free'  # Free model as specified
     DEFAULT_TEMPERATURE = 0.7
     
+    # Default API options, built once from the settings above (read-only)
+    DEFAULT_API_OPTIONS = MappingProxyType({
+        'model': DEFAULT_MODEL,
+        'temperature': DEFAULT_TEMPERATURE,
+        'debug': DEBUG_MODE,
+        'fallback_on_error': True,
+        'max_tokens': 1024,
+        'http_referer': 'https://github.com/bpmn-python-port',
+        'x_title': 'BPMN-MATLAB Python Port'
+    })
+    
     @classmethod
     def get_api_options(cls, custom_options=None):
         """
@@ -43,15 +83,7 @@ class Config:
         Returns:
             dict: Combined API options
         """
-        options = {
-            'model': cls.DEFAULT_MODEL,
-            'temperature': cls.DEFAULT_TEMPERATURE,
-            'debug': cls.DEBUG_MODE,
-            'fallback_on_error': True,
-            'max_tokens': 1024,
-            'http_referer': 'https://github.com/bpmn-python-port',
-            'x_title': 'BPMN-MATLAB Python Port'
-        }
+        options = dict(cls.DEFAULT_API_OPTIONS)
         
         if custom_options:
             options.update(custom_options)
@@ -75,7 +107,22 @@ class Config:
             'password': cls.DB_PASSWORD
         }
 
+    # Directories already created by ensure_dir in this process
+    _ensured_dirs = set()
+    
+    @staticmethod
+    def ensure_dir(path):
+        """
+        Ensures that a directory exists, creating it only on the first call per path.
+        
+        Args:
+            path (str): Directory to create
+        """
+        if path not in Config._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            Config._ensured_dirs.add(path)
+
     @staticmethod
     def ensure_temp_dir():
         """Ensures that the temporary directory exists"""
-        os.makedirs(Config.TEMP_DIR, exist_ok=True)
\ No newline at end of file
+        Config.ensure_dir(Config.TEMP_DIR)
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Console output for the progress messages the pipeline logs.
+"""
+
+import sys
+import atexit
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+# Top-level package of the generator modules (their loggers are named after the modules)
+_PACKAGE = __name__.split('.')[0]
+
+class ConsoleLog:
+    """
+    Sets up logging for command-line entry points.
+    Records are only put on a queue by the logging thread (e.g., a pipeline
+    step running concurrently with others); formatting and writing to stdout
+    happen on a single listener thread, so the steps never wait for the console.
+    """
+
+    _listener = None
+
+    @staticmethod
+    def configure(level=logging.INFO, debug=False):
+        """
+        Prints log records to stdout as plain messages, like the former print output.
+        Calling it again only changes the levels.
+
+        Args:
+            level (int, optional): Lowest level to print
+            debug (bool, optional): Also print this package's debug messages (e.g., every
+                                    LLM call), without the debug output of libraries
+        """
+        root = logging.getLogger()
+        root.setLevel(level)
+        logging.getLogger(_PACKAGE).setLevel(logging.DEBUG if debug else logging.NOTSET)
+        if ConsoleLog._listener is not None:
+            return
+
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(QueueHandler(log_queue))
+
+        # Flush the remaining records when the process exits
+        ConsoleLog._listener = QueueListener(log_queue, handler)
+        ConsoleLog._listener.start()
+        atexit.register(ConsoleLog._listener.stop)
@@ -0,0 +1,37 @@
+"""
+Hash helper that uses blake3 when it is installed and falls back to hashlib's blake2b.
+"""
+
+import hashlib
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 is optional
+    blake3 = None
+
+class FastHash:
+    """
+    Short content hashes for cache keys and signatures.
+    The digest depends on the backend, so keys are only stable within one
+    installation; a switch of backend only causes cache misses.
+    """
+
+    # Digest length in bytes (the hex digest is twice as long)
+    DIGEST_SIZE = 16
+
+    @staticmethod
+    def hexdigest(data):
+        """
+        Hashes a string or byte string.
+
+        Args:
+            data (str/bytes): Content to hash; strings are encoded as UTF-8
+
+        Returns:
+            str: Hex digest of FastHash.DIGEST_SIZE bytes
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if blake3 is not None:
+            return blake3(data).hexdigest(length=FastHash.DIGEST_SIZE)
+        return hashlib.blake2b(data, digest_size=FastHash.DIGEST_SIZE).hexdigest()
@@ -0,0 +1,126 @@
+"""
+JSON helpers that use orjson when it is installed and fall back to the stdlib json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+class FastJSON:
+    """
+    Thin wrapper around orjson with a stdlib fallback.
+    Both backends raise json.JSONDecodeError (or a subclass) on invalid input,
+    so callers can keep catching the stdlib exception.
+    """
+
+    @staticmethod
+    def loads(data):
+        """
+        Parses a JSON document.
+
+        Args:
+            data (str/bytes): JSON text
+
+        Returns:
+            The parsed Python object
+        """
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj, indent=False):
+        """
+        Serializes an object to a JSON string without escaping non-ASCII characters.
+
+        Args:
+            obj: Object to serialize
+            indent (bool, optional): Pretty-print with an indentation of two spaces
+                                     (compact otherwise)
+
+        Returns:
+            str: JSON text
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, option=option).decode('utf-8')
+            except TypeError:
+                # orjson rejects some values json accepts (e.g., integers above 64 bit)
+                pass
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def dumps_bytes(obj, indent=False):
+        """
+        Serializes an object to UTF-8 encoded JSON, e.g. for a request body or a
+        file opened in binary mode. orjson produces bytes directly, so no
+        str round trip is needed.
+
+        Args:
+            obj: Object to serialize
+            indent (bool, optional): Pretty-print with an indentation of two spaces
+                                     (compact otherwise)
+
+        Returns:
+            bytes: UTF-8 encoded JSON text
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, option=option)
+            except TypeError:
+                # orjson rejects some values json accepts (e.g., integers above 64 bit)
+                pass
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def dump(obj, f, indent=False):
+        """
+        Writes an object as JSON to a text file.
+        A dict is written one top-level value at a time, so the encoded
+        document is never held in memory as a whole.
+
+        Args:
+            obj: Object to serialize
+            f: Text file opened for writing
+            indent (bool, optional): Pretty-print with an indentation of two spaces
+        """
+        if not isinstance(obj, dict) or not obj:
+            f.write(FastJSON.dumps(obj, indent))
+            return
+
+        if orjson is None:
+            # json.dump already writes the encoder's chunks as they are produced
+            if indent:
+                json.dump(obj, f, indent=2, ensure_ascii=False)
+            else:
+                json.dump(obj, f, ensure_ascii=False, separators=(',', ':'))
+            return
+
+        f.write('{')
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                f.write(',')
+            if indent:
+                f.write('\n  ')
+            f.write(FastJSON.dumps(str(key)))
+            f.write(': ' if indent else ':')
+
+            text = FastJSON.dumps(value, indent)
+            if indent:
+                # Shift the nested lines one level in (JSON strings never contain raw newlines)
+                text = text.replace('\n', '\n  ')
+            f.write(text)
+        f.write('\n}' if indent else '}')
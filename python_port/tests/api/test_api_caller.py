@@ -0,0 +1,150 @@
+"""
+Tests für den APICaller.
+
+Diese Tests prüfen die HTTP-Kommunikation des APICaller-Moduls,
+ohne tatsächlich API-Aufrufe zu machen (Mock-Tests).
+"""
+
+import os
+import sys
+import json
+import unittest
+import requests
+from unittest.mock import patch, MagicMock
+
+# Füge das Quellverzeichnis dem Modulpfad hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.api.api_caller import APICaller, APICallError
+
+class TestAPICaller(unittest.TestCase):
+    """Test-Suite für APICaller-Klasse"""
+
+    def setUp(self):
+        # Jede Testmethode startet mit einer neuen Session
+        APICaller._session = None
+
+    def tearDown(self):
+        APICaller._session = None
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_session_is_reused(self):
+        """Test für die Wiederverwendung der HTTP-Session über mehrere Aufrufe"""
+        session = APICaller._get_session()
+        
+        # Überprüfe, ob dieselbe Session zurückgegeben wird
+        self.assertIs(APICaller._get_session(), session)
+        self.assertEqual(session.headers["Authorization"], "Bearer test-key")
+        
+        # Der Verbindungspool reicht für alle parallelen Aufrufe der Pipeline
+        adapter = session.get_adapter(APICaller.OPENROUTER_API_BASE)
+        self.assertEqual(adapter._pool_maxsize, APICaller.POOL_MAXSIZE)
+
+    def test_session_retry_policy(self):
+        """Test für die Wiederholungsstrategie des HTTP-Adapters"""
+        retry = APICaller._get_session().get_adapter(APICaller.OPENROUTER_API_BASE).max_retries
+        
+        # Überprüfe, ob POST-Anfragen bei 429 mit Jitter und Retry-After wiederholt werden
+        self.assertEqual(retry.total, APICaller.MAX_RETRIES)
+        self.assertIn(429, retry.status_forcelist)
+        self.assertIn('POST', retry.allowed_methods)
+        self.assertTrue(retry.respect_retry_after_header)
+        self.assertGreater(retry.backoff_jitter, 0)
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_send_prompt_uses_session(self):
+        """Test für einen erfolgreichen API-Aufruf über die gemeinsame Session"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"choices": [{"message": {"content": "[]"}}]}'
+        session = APICaller._get_session()
+        
+        with patch.object(session, 'post', return_value=mock_response) as mock_post:
+            result = APICaller.send_prompt("Test prompt", {"model": "test-model"})
+        
+        # Überprüfe Ergebnisse
+        self.assertEqual(result, "[]")
+        mock_post.assert_called_once()
+
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_stream_prompt_yields_deltas(self):
+        """Test für das Auslesen einer gestreamten Antwort (Server-Sent Events)"""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_lines.return_value = [
+            ': OPENROUTER PROCESSING',
+            'data: {"choices": [{"delta": {"content": "[{\\"a\\": "}}]}',
+            '',
+            'data: {"choices": [{"delta": {"content": "1}]"}}]}',
+            'data: [DONE]',
+        ]
+        session = APICaller._get_session()
+        
+        with patch.object(session, 'post', return_value=mock_response) as mock_post:
+            chunks = list(APICaller.stream_prompt("Test prompt", {"model": "test-model"}))
+        
+        # Überprüfe, ob die Teile in Reihenfolge geliefert und Streaming angefordert wurde
+        self.assertEqual("".join(chunks), '[{"a": 1}]')
+        self.assertTrue(json.loads(mock_post.call_args.kwargs['data'])['stream'])
+        self.assertTrue(mock_post.call_args.kwargs['stream'])
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_send_prompt_reports_status_code(self):
+        """Test für die Fehlermeldung mit HTTP-Status bei endgültig fehlgeschlagenen Aufrufen"""
+        mock_response = MagicMock()
+        mock_response.status_code = 401
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("401 Unauthorized", response=mock_response)
+        session = APICaller._get_session()
+        
+        with patch.object(session, 'post', return_value=mock_response) as mock_post:
+            with self.assertRaises(APICallError) as raised:
+                APICaller.send_prompt("Test prompt", {"model": "test-model", "timeout": 60})
+        
+        # Überprüfe Statuscode und die übergebenen Zeitlimits
+        self.assertEqual(raised.exception.status_code, 401)
+        self.assertEqual(mock_post.call_args.kwargs['timeout'], (APICaller.CONNECT_TIMEOUT, 60))
+        # Ein 401 wird nicht wiederholt, die Meldung nennt daher keine Versuche
+        self.assertIn("status 401 (not retried)", str(raised.exception))
+        self.assertNotIn("attempts", str(raised.exception))
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_send_prompt_reports_attempts_for_retried_errors(self):
+        """Test für die Fehlermeldung nach wiederholten Versuchen bei vorübergehenden Fehlern"""
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("503 Service Unavailable", response=mock_response)
+        session = APICaller._get_session()
+        attempts = f"after {APICaller.MAX_RETRIES + 1} attempts"
+        
+        with patch.object(session, 'post', return_value=mock_response):
+            with self.assertRaises(APICallError) as unavailable:
+                APICaller.send_prompt("Test prompt", {"model": "test-model"})
+        with patch.object(session, 'post', side_effect=requests.exceptions.ConnectionError("refused")):
+            with self.assertRaises(APICallError) as refused:
+                APICaller.send_prompt("Test prompt", {"model": "test-model"})
+        
+        # Überprüfe, ob beide Meldungen die Anzahl der Versuche nennen
+        self.assertIn(attempts, str(unavailable.exception))
+        self.assertEqual(unavailable.exception.status_code, 503)
+        self.assertIn(attempts, str(refused.exception))
+        self.assertIsNone(refused.exception.status_code)
+
+    @patch('src.api.api_caller.Config.OPENROUTER_API_KEY', 'test-key')
+    def test_build_request_with_json_schema(self):
+        """Test für die Anforderung strukturierter Ausgabe anhand eines Schemas"""
+        schema = {'flow_id': {'type': 'string', 'required': True},
+                  'condition_expr': {'type': ['string', 'null'], 'required': False}}
+        
+        data, _ = APICaller._build_request("Test prompt", {'json_schema': schema})
+        plain, _ = APICaller._build_request("Test prompt", {})
+        
+        # Die Elemente werden als Array im Feld "items" eines Objekts verlangt
+        items = data['response_format']['json_schema']['schema']['properties']['items']
+        self.assertEqual(data['response_format']['type'], 'json_schema')
+        self.assertEqual(items['items']['required'], ['flow_id'])
+        self.assertEqual(items['items']['properties']['condition_expr'], {'type': ['string', 'null']})
+        self.assertNotIn('response_format', plain)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests für die DataGenerationPipeline.
+
+Diese Tests prüfen den Ablauf der Pipeline mit simulierten LLM-Antworten,
+ohne tatsächlich API-Aufrufe zu machen (Mock-Tests).
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Füge das Quellverzeichnis dem Modulpfad hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.api.data_generation_pipeline import DataGenerationPipeline
+
+def fake_llm(prompt, options=None):
+    """Liefert eine passende Antwort je nach Art des Prompts"""
+    if "logical integrity" in prompt:
+        return []
+    if "define the main phases" in prompt:
+        return [{'phase_id': 'PH_001', 'phase_name': 'Design', 'description': 'Design phase'}]
+    if "Process Definitions entries" in prompt:
+        return [{'process_id': 'PROC_001', 'process_name': 'Assembly', 'description': 'Assembly process'}]
+    if "Generate a complete set of" in prompt:
+        return [
+            {'element_id': 'START_001', 'element_name': 'Start', 'element_type': 'event', 'element_subtype': 'start'},
+            {'element_id': 'TASK_001', 'element_name': 'Assemble', 'element_type': 'task'},
+        ]
+    if "pools for this BPMN diagram" in prompt:
+        return [
+            {'pool_id': 'POOL_001', 'pool_name': 'Factory', 'description': 'Factory'},
+            {'pool_id': 'POOL_002', 'pool_name': 'Supplier', 'description': 'Supplier'},
+        ]
+    if "lanes for the following pool" in prompt:
+        pool_id = 'POOL_001' if 'POOL_001' in prompt else 'POOL_002'
+        return [{'lane_id': f'LANE_{pool_id[-3:]}', 'lane_name': 'Workers', 'description': 'Workers'}]
+    if "Sequence Flows" in prompt:
+        return [{'flow_id': 'FLOW_001', 'source_ref': 'START_001', 'target_ref': 'TASK_001'}]
+    if "Generate resources" in prompt:
+        return [{'resource_id': 'RES_001', 'resource_name': 'Worker', 'resource_type': 'person', 'element_id': 'TASK_001', 'process_id': 'PROC_001'}]
+    if "detailed specifications" in prompt:
+        return {'product_name': 'Widget'}
+    return []
+
+class TestDataGenerationPipeline(unittest.TestCase):
+    """Test-Suite für die DataGenerationPipeline-Klasse"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    @patch('src.api.data_generation_pipeline.DataGenerator.call_llm', side_effect=fake_llm)
+    @patch('src.api.logical_validator.DataGenerator.call_llm', side_effect=fake_llm)
+    def test_run_generates_all_entities(self, mock_validator_llm, mock_pipeline_llm):
+        """Test für einen vollständigen Pipeline-Durchlauf mit parallelen Schritten"""
+        pipeline = DataGenerationPipeline("A widget", api_options={}, output_dir=self.output_dir)
+        context = pipeline.run({'phases': 1, 'processes': 1, 'elements': 5, 'max_element_batches': 1,
+                                'flows': 1, 'resources': 1, 'pools': 2, 'lanes_per_pool': 1})
+
+        # Überprüfe, ob alle Schritte ihre Ergebnisse im Kontext abgelegt haben
+        self.assertEqual(len(context['bpmn_elements']), 2)
+        self.assertEqual(len(context['sequence_flows']), 1)
+        self.assertEqual(len(context['resources']), 1)
+        self.assertEqual(len(context['pools']), 2)
+        self.assertEqual(sorted(lane['pool_id'] for lane in context['lanes']), ['POOL_001', 'POOL_002'])
+        self.assertEqual(context['product_specifications']['product_name'], 'Widget')
+        
+        # Alle Ausgabedateien sind nach dem Durchlauf geschrieben und der Schreib-Thread ist beendet
+        self.assertTrue(os.path.exists(os.path.join(pipeline.output_dir, 'generation_summary.json')))
+        with self.assertRaises(RuntimeError):
+            pipeline._io_pool.submit(print)
+        
+        # Die Kompatibilitätsnamen stehen nur im Index, nicht im Kontext
+        self.assertNotIn('allElementRows', context)
+        self.assertNotIn('allFlowRows', context)
+        
+        # Der vollständige Kontext lässt sich aus dem Index wieder zusammensetzen
+        restored = DataGenerationPipeline.build_complete_context_from_index(pipeline.output_dir)
+        self.assertEqual(restored.pop('allElementRows'), context['bpmn_elements'])
+        self.assertEqual(restored.pop('allFlowRows'), context['sequence_flows'])
+        self.assertEqual(restored, context)
+
+
+    def test_init_shares_schemas_and_copies_options(self):
+        """Test für die gemeinsame Nutzung der Schemas und das Kopieren der API-Optionen"""
+        api_options = {'model': 'test-model'}
+        first = DataGenerationPipeline("A widget", api_options=api_options, output_dir=self.output_dir)
+        second = DataGenerationPipeline("A widget", api_options=api_options, output_dir=self.output_dir)
+        
+        # Die Schemas werden nur einmal geladen, die Optionen des Aufrufers bleiben unverändert
+        self.assertIs(first.schemas, second.schemas)
+        self.assertEqual(first.api_options['product_description'], "A widget")
+        self.assertNotIn('product_description', api_options)
+
+    @patch('src.api.data_generation_pipeline.DataGenerator.call_llm', side_effect=fake_llm)
+    def test_parallel_element_batches_are_deduplicated(self, mock_llm):
+        """Test für parallel erzeugte Element-Batches mit doppelten IDs"""
+        pipeline = DataGenerationPipeline("A widget", api_options={}, output_dir=self.output_dir)
+        pipeline.context['process_definitions'] = [
+            {'process_id': 'PROC_001', 'process_name': 'Assembly', 'description': 'Assembly process'}
+        ]
+        
+        elements = pipeline._generate_bpmn_elements_recursive(5, 3, parallel=True)
+        pipeline._wait_for_writes()
+        
+        # Jeder Batch wird angefragt, doppelte IDs bleiben nur einmal erhalten
+        self.assertEqual(mock_llm.call_count, 3)
+        self.assertEqual([e['element_id'] for e in elements], ['START_001', 'TASK_001'])
+        prompts = [call.args[0] for call in mock_llm.call_args_list]
+        self.assertTrue(any("batch 3 of 3" in prompt for prompt in prompts))
+        
+        # Die Rohdaten aller Batches stehen zeilenweise in einer Logdatei
+        with open(os.path.join(pipeline.output_dir, 'raw_bpmn_elements.jsonl'), encoding='utf-8') as f:
+            batches = sorted(json.loads(line)['batch'] for line in f)
+        self.assertEqual(batches, [1, 2, 3])
+
+    @patch('src.api.data_generation_pipeline.DataGenerator.call_llm', side_effect=fake_llm)
+    def test_sequential_element_batches_list_existing_ids(self, mock_llm):
+        """Test für die kompakte Übergabe bereits erzeugter Elemente an den nächsten Batch"""
+        pipeline = DataGenerationPipeline("A widget", api_options={}, output_dir=self.output_dir)
+        pipeline.context['process_definitions'] = [
+            {'process_id': 'PROC_001', 'process_name': 'Assembly', 'description': 'Assembly process'}
+        ]
+        
+        elements = pipeline._generate_bpmn_elements_recursive(2, 2)
+        pipeline._wait_for_writes()
+        
+        # Der zweite Batch wiederholt nur bekannte IDs und fügt daher nichts hinzu
+        self.assertEqual([e['element_id'] for e in elements], ['START_001', 'TASK_001'])
+        
+        # Der zweite Prompt nennt nur die IDs des ersten Batches, nicht die ganzen Elemente
+        first_prompt, second_prompt = [call.args[0] for call in mock_llm.call_args_list]
+        self.assertNotIn("already exist", first_prompt)
+        self.assertIn("START_001, TASK_001", second_prompt)
+        self.assertNotIn("Assemble", second_prompt)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,8 +5,11 @@ Diese Tests prüfen die grundlegende Funktionalität des DataGenerator-Moduls,
 ohne tatsächlich API-Aufrufe zu machen (Mock-Tests).
 """
 
+import io
 import os
 import sys
+import time
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 import json
@@ -15,6 +18,9 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from src.api.data_generator import DataGenerator
+from src.api.response_cache import ResponseCache
+from src.api.api_caller import APICallError
+from src.util.fast_json import FastJSON
 from src.api.api_config import APIConfig
 from src.api.prompt_builder import PromptBuilder
 
@@ -94,7 +100,202 @@ class TestDataGenerator(unittest.TestCase):
         
         # Überprüfe, ob leere Liste zurückgegeben wird
         self.assertEqual(result, [])
+    
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_async(self, mock_api_caller):
+        """Test für den nicht-blockierenden LLM-Aufruf über den Worker-Pool"""
+        mock_api_caller.send_prompt.return_value = '{"phase_id": "PH_001"}'
+        
+        # Rufe die zu testende Methode auf und warte auf das Ergebnis
+        future = DataGenerator.call_llm_async("Test prompt")
+        result = future.result(timeout=5)
+        
+        # Überprüfe Ergebnisse
+        self.assertEqual(result, {"phase_id": "PH_001"})
+        mock_api_caller.send_prompt.assert_called_once()
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_response_cache(self, mock_api_caller):
+        """Test für das Wiederverwenden zwischengespeicherter LLM-Antworten"""
+        mock_api_caller.send_prompt.return_value = '[{"id": "PROC_001"}]'
+        
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch('src.api.response_cache.Config.LLM_CACHE_DIR', cache_dir):
+            # Zweimal derselbe Prompt mit aktiviertem Cache
+            first = DataGenerator.call_llm("Cached prompt", {"model": "test-model", "cache": True})
+            second = DataGenerator.call_llm("Cached prompt", {"model": "test-model", "cache": True})
+            ResponseCache.close()
+        
+        # Überprüfe, ob die API nur einmal aufgerufen wurde
+        self.assertEqual(first, second)
+        mock_api_caller.send_prompt.assert_called_once()
+
+    def test_response_cache_ttl_and_persistence(self):
+        """Test für das Ablaufen und das dauerhafte Speichern von Cache-Einträgen"""
+        key = ResponseCache.make_key("TTL prompt", {"model": "test-model", "debug": True})
+        
+        # Nur Anfrageparameter gehen in den Schlüssel ein
+        self.assertEqual(key, ResponseCache.make_key("TTL prompt", {"model": "test-model"}))
+        self.assertNotEqual(key, ResponseCache.make_key("TTL prompt", {"model": "other-model"}))
+        
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch('src.api.response_cache.Config.LLM_CACHE_DIR', cache_dir):
+            ResponseCache.update(key, '[1]')
+            ResponseCache.close()
+            
+            # Der Eintrag wird aus der Datenbank gelesen, solange er nicht abgelaufen ist
+            self.assertEqual(ResponseCache.lookup(key, ttl=60), '[1]')
+            with patch('src.api.response_cache.time.time', return_value=time.time() + 120):
+                self.assertIsNone(ResponseCache.lookup(key, ttl=60))
+            ResponseCache.close()
 
 
+    @patch('src.api.data_generator.DataGenerator.call_llm', side_effect=lambda prompt, options=None: [prompt])
+    def test_call_llm_many_keeps_prompt_order(self, mock_call_llm):
+        """Test für parallele LLM-Aufrufe, deren Ergebnisse in Prompt-Reihenfolge zurückkommen"""
+        results = DataGenerator.call_llm_many(["Pool 1", "Pool 2", "Pool 3"], timeout=5)
+        
+        # Überprüfe, ob jeder Prompt genau einmal gesendet wurde
+        self.assertEqual(results, [["Pool 1"], ["Pool 2"], ["Pool 3"]])
+        self.assertEqual(mock_call_llm.call_count, 3)
+
+    @patch('src.api.data_generator.FastJSON.loads', wraps=FastJSON.loads)
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_skips_parsing_truncated_response(self, mock_api_caller, mock_loads):
+        """Test für abgeschnittene Antworten, die ohne Parse-Versuch neu angefragt werden"""
+        mock_api_caller.send_prompt.side_effect = [
+            '[{"id": 1}, {"id": 2', 
+            '[{"id": 1}, {"id": 2}]'
+        ]
+        
+        result = DataGenerator.call_llm("Test prompt")
+        
+        # Nur die vollständige zweite Antwort wird geparst
+        self.assertEqual(result, [{"id": 1}, {"id": 2}])
+        self.assertIn("should be valid JSON", mock_api_caller.send_prompt.call_args_list[1].args[0])
+        mock_loads.assert_called_once_with('[{"id": 1}, {"id": 2}]')
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_logs_attempts_at_debug_level(self, mock_api_caller):
+        """Test für die Ausgabe der Aufrufe über das Logging statt print"""
+        mock_api_caller.send_prompt.return_value = '[]'
+        
+        with self.assertLogs('src.api.data_generator', level='DEBUG') as logs:
+            DataGenerator.call_llm("Test prompt", {'cache': False})
+        
+        # Überprüfe, ob der Aufruf nur als Debug-Meldung protokolliert wird
+        self.assertEqual(logs.output, ['DEBUG:src.api.data_generator:--- Calling LLM (Attempt 1/2) ---'])
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_json_mode(self, mock_api_caller):
+        """Test für strukturierte Ausgabe ohne Fix-it-Wiederholung"""
+        options = {'cache': False, 'json_schema': {'id': {'type': 'integer', 'required': True}}}
+        mock_api_caller.send_prompt.side_effect = ['{"items": [{"id": 1}]}', '{"items": [{"id": 1}']
+        
+        # Die Elemente werden aus dem Feld "items" ausgepackt
+        self.assertEqual(DataGenerator.call_llm("Test prompt", options), [{"id": 1}])
+        
+        # Eine ungültige Antwort führt nicht zu einem zweiten Aufruf
+        self.assertEqual(DataGenerator.call_llm("Test prompt", options), [])
+        self.assertEqual(mock_api_caller.send_prompt.call_count, 2)
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_unwraps_message_container(self, mock_api_caller):
+        """Test für Antworten, deren JSON in einem "message"-Feld steckt"""
+        mock_api_caller.send_prompt.side_effect = [
+            '{"message": "[{\\"id\\": 1}]"}',
+            '{"message": "Hello"}'
+        ]
+        
+        # Nur eine Nachricht, die selbst JSON ist, wird ausgepackt
+        self.assertEqual(DataGenerator.call_llm("Test prompt", {'cache': False}), [{"id": 1}])
+        self.assertEqual(DataGenerator.call_llm("Test prompt", {'cache': False}), {"message": "Hello"})
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_fails_fast_on_api_error(self, mock_api_caller):
+        """Test für den sofortigen Abbruch bei endgültigen API-Fehlern"""
+        mock_api_caller.send_prompt.side_effect = APICallError("401 Unauthorized", 401)
+        
+        result = DataGenerator.call_llm("Test prompt")
+        
+        # Überprüfe, ob kein zweiter Versuch unternommen wurde
+        self.assertEqual(result, [])
+        mock_api_caller.send_prompt.assert_called_once()
+
+    @patch('src.api.data_generator.APICaller')
+    def test_call_llm_multi_splits_sections(self, mock_api_caller):
+        """Test für das Aufteilen einer kombinierten Antwort auf mehrere Entitätstypen"""
+        mock_api_caller.send_prompt.return_value = '{"bpmn_elements": [{"element_id": "TASK_001"}], "sequence_flows": "kaputt"}'
+        
+        sections = DataGenerator.call_llm_multi("Combined prompt", ('bpmn_elements', 'sequence_flows', 'pools'))
+        
+        # Überprüfe, ob jeder Typ eine Liste erhält, auch wenn er fehlt oder ungültig ist
+        self.assertEqual(sections['bpmn_elements'], [{"element_id": "TASK_001"}])
+        self.assertEqual(sections['sequence_flows'], [])
+        self.assertEqual(sections['pools'], [])
+        mock_api_caller.send_prompt.assert_called_once()
+
+    def test_prompts_share_static_prefix(self):
+        """Test für den gleichbleibenden Anfang von Prompts desselben Typs"""
+        first = PromptBuilder.build_lane_prompt({'pool_id': 'POOL_001', 'pool_name': 'Factory'}, {}, None, 3)
+        second = PromptBuilder.build_lane_prompt({'pool_id': 'POOL_002', 'pool_name': 'Supplier'}, {}, None, 2)
+        
+        # Die variablen Angaben stehen erst nach dem gemeinsamen Regelblock
+        prefix = os.path.commonprefix([first, second])
+        self.assertIn("Return the data as a JSON array", prefix)
+        self.assertNotIn("POOL_001", prefix)
+
+    def test_compact_json_without_orjson(self):
+        """Test für kompaktes JSON über den Fallback auf das json-Modul"""
+        data = {'phases': [{'phase_id': 'PH_001', 'phase_name': 'Entwurf für Ü'}]}
+        
+        with patch('src.util.fast_json.orjson', None):
+            text = FastJSON.dumps(data)
+            stream = io.StringIO()
+            FastJSON.dump(data, stream)
+            indented = FastJSON.dumps(data, indent=True)
+        
+        # Überprüfe, ob ohne Einrückung keine Leerzeichen zwischen den Token stehen
+        self.assertEqual(text, '{"phases":[{"phase_id":"PH_001","phase_name":"Entwurf für Ü"}]}')
+        self.assertEqual(stream.getvalue(), text)
+        self.assertIn('\n  "phases": [', indented)
+
+    def test_phases_are_serialized_once(self):
+        """Test für die einmalige Serialisierung der Phasen über mehrere Prompts"""
+        context = {'description': 'A widget', 'phases': [{'phase_id': 'PH_001', 'phase_name': 'Design'}]}
+        PromptBuilder._phases_text.cache_clear()
+        with patch('src.api.prompt_builder.FastJSON.dumps', return_value='[PHASES]') as mock_dumps:
+            first = PromptBuilder.build_entity_prompt('process_definitions', None, context, 1)
+            second = PromptBuilder.build_entity_prompt('resources', None, context, 2)
+        
+            # Eine inhaltsgleiche Kopie der Phasen nutzt denselben Eintrag
+            third = PromptBuilder.build_entity_prompt('lanes', None, dict(context, phases=[dict(context['phases'][0])]), 1)
+        
+        # Überprüfe, ob alle Prompts die Phasen enthalten, aber nur einmal serialisiert wurde
+        self.assertIn('[PHASES]', first)
+        self.assertIn('[PHASES]', second)
+        self.assertIn('[PHASES]', third)
+        self.assertEqual(mock_dumps.call_count, 1)
+
+    def test_element_lines_are_shared_between_prompts(self):
+        """Test für die gemeinsame Formatierung der Elemente in Flow-, Ressourcen- und Lane-Prompts"""
+        elements = [{'element_id': 'TASK_001', 'element_name': 'Assemble', 'element_type': 'task'}]
+        context = {'bpmn_elements': elements}
+        
+        flow_prompt = PromptBuilder.build_flow_prompt(context)
+        resource_prompt = PromptBuilder.build_resource_prompt(context, None)
+        lane_prompt = PromptBuilder.build_lane_prompt({'pool_id': 'POOL_001'}, context, None, 2)
+        self.assertIn("- ID: TASK_001, Name: Assemble, Type: task/Unknown", flow_prompt)
+        self.assertIn("- ID: TASK_001, Name: Assemble", resource_prompt)
+        self.assertIn("- TASK_001: Assemble (task)", lane_prompt)
+        
+        # Eine gewachsene Elementliste wird neu formatiert
+        elements.append({'element_id': 'END_001', 'element_name': 'Done', 'element_type': 'event'})
+        self.assertIn("END_001", PromptBuilder.build_integrity_prompt(context))
+        
+        # Auch Änderungen, die die Länge der Liste nicht ändern, erscheinen im nächsten Prompt
+        elements[0]['element_name'] = 'Pack'
+        self.assertIn("- ID: TASK_001, Name: Pack", PromptBuilder.build_flow_prompt(context))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Tests für den JsonStreamParser.
+
+Diese Tests prüfen das schrittweise Auslesen von JSON-Arrays aus
+einer in Teilen eintreffenden LLM-Antwort.
+"""
+
+import os
+import sys
+import unittest
+
+# Füge das Quellverzeichnis dem Modulpfad hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.api.json_stream_parser import JsonStreamParser
+
+class TestJsonStreamParser(unittest.TestCase):
+    """Test-Suite für die JsonStreamParser-Klasse"""
+
+    def test_items_are_emitted_when_complete(self):
+        """Test für die Ausgabe jedes Elements, sobald es vollständig ist"""
+        parser = JsonStreamParser()
+        
+        # Das erste Element endet erst im zweiten Teil
+        self.assertEqual(parser.feed('```json\n[{"id": "A", "name": "x ] }'), [])
+        self.assertEqual(parser.feed(' {\\"y\\""}, {"id": "B", "nested": {"k": [1, 2]}}'),
+                         [{'id': 'A', 'name': 'x ] } {"y"'}, {'id': 'B', 'nested': {'k': [1, 2]}}])
+        
+        # Nach dem Ende des Arrays wird nichts mehr ausgegeben
+        self.assertEqual(parser.feed(']\n```\n[{"id": "C"}]'), [])
+
+    def test_array_inside_object(self):
+        """Test für ein Array, das in ein Objekt eingebettet ist"""
+        parser = JsonStreamParser()
+        items = []
+        for chunk in ['{"bpmn_elements": [{"id"', ': 1}, {"id": 2}', ']}']:
+            items.extend(parser.feed(chunk))
+        
+        # Überprüfe Ergebnisse
+        self.assertEqual(items, [{'id': 1}, {'id': 2}])
+
+    def test_single_characters(self):
+        """Test für eine Antwort, die Zeichen für Zeichen eintrifft"""
+        text = 'Here: [{"id": "A", "text": "a \\"quoted\\" }"}, {"id": "B"}] done'
+        parser = JsonStreamParser()
+        items = []
+        for c in text:
+            items.extend(parser.feed(c))
+        
+        # Überprüfe, ob die über viele Teile verteilten Elemente vollständig sind
+        self.assertEqual(items, [{'id': 'A', 'text': 'a "quoted" }'}, {'id': 'B'}])
+
+    def test_malformed_item_is_logged(self):
+        """Test für ein ungültiges Element, das übersprungen und als Warnung geloggt wird"""
+        parser = JsonStreamParser()
+        
+        with self.assertLogs('src.api.json_stream_parser', level='WARNING'):
+            items = parser.feed('[{"id": A}, {"id": "B"}]')
+        
+        # Überprüfe, ob nur das gültige Element ausgegeben wird
+        self.assertEqual(items, [{'id': 'B'}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests für den BPMNGenerator.
+
+Diese Tests prüfen die erzeugte BPMN 2.0 XML-Datei für einen kleinen Kontext.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from xml.etree import ElementTree
+
+# Füge das Quellverzeichnis dem Modulpfad hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.bridges.bpmn_generator import BPMNGenerator
+
+BPMN = '{' + BPMNGenerator.BPMN_NS + '}'
+BPMNDI = '{' + BPMNGenerator.BPMNDI_NS + '}'
+
+CONTEXT = {
+    'process_definitions': [{'process_id': 'PROC_001', 'process_name': 'Montage & Test'}],
+    'bpmn_elements': [
+        {'element_id': 'START_001', 'element_name': 'Start', 'element_type': 'event', 'element_subtype': 'startEvent'},
+        {'element_id': 'TASK_001', 'element_name': 'Montieren', 'element_type': 'task', 'element_subtype': 'user'},
+        {'element_id': 'EVEN_001', 'element_type': 'event', 'element_subtype': 'TimerCatch'},
+        {'element_id': 'GATE_001', 'element_type': 'gateway', 'element_subtype': 'parallel'},
+        {'element_id': 'END_001', 'element_type': 'event', 'element_subtype': 'endEvent'},
+    ],
+    'sequence_flows': [
+        {'flow_id': 'FLOW_001', 'source_ref': 'START_001', 'target_ref': 'TASK_001', 'condition_expr': 'x < 1'},
+        {'flow_id': 'FLOW_002', 'source_ref': 'TASK_001', 'target_ref': 'UNKNOWN'},
+    ],
+}
+
+class TestBPMNGenerator(unittest.TestCase):
+    """Test-Suite für die BPMNGenerator-Klasse"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_generate_from_context(self):
+        """Test für die Erzeugung von Prozess, Elementen, Flüssen und Diagramm"""
+        path = BPMNGenerator(os.path.join(self.output_dir, 'test.bpmn')).generate_from_context(CONTEXT)
+        root = ElementTree.parse(path).getroot()
+        
+        # Überprüfe, ob alle Knoten im BPMN-Namensraum liegen
+        self.assertEqual(root.tag, BPMN + 'definitions')
+        process = root.find(BPMN + 'process')
+        self.assertEqual(process.get('name'), 'Montage & Test')
+        self.assertEqual(
+            [child.tag[len(BPMN):] for child in process],
+            ['startEvent', 'userTask', 'intermediateCatchEvent', 'parallelGateway', 'endEvent', 'sequenceFlow']
+        )
+        self.assertIsNotNone(process.find(BPMN + 'intermediateCatchEvent/' + BPMN + 'timerEventDefinition'))
+        
+        # Nur der Fluss mit bekannten Elementen wird übernommen, samt Bedingung
+        flow = process.find(BPMN + 'sequenceFlow')
+        self.assertEqual(flow.get('id'), 'FLOW_001')
+        self.assertEqual(flow.find(BPMN + 'conditionExpression').text, 'x < 1')
+        
+        # Jedes Element hat eine Form, jeder Fluss eine Kante im Diagramm
+        plane = root.find(BPMNDI + 'BPMNDiagram/' + BPMNDI + 'BPMNPlane')
+        self.assertEqual(len(plane.findall(BPMNDI + 'BPMNShape')), 5)
+        bounds = plane.find(BPMNDI + 'BPMNShape/{' + BPMNGenerator.DC_NS + '}Bounds')
+        self.assertEqual((bounds.get('x'), bounds.get('y')), ('150', '100'))
+        self.assertEqual([edge.get('bpmnElement') for edge in plane.findall(BPMNDI + 'BPMNEdge')], ['FLOW_001'])
+
+    def test_missing_ids_are_numbered(self):
+        """Test für die Vergabe fortlaufender IDs an Elemente und Flüsse ohne ID"""
+        context = {
+            'bpmn_elements': [
+                {'element_type': 'task'},
+                {'element_type': 'task'},
+            ],
+        }
+        path = BPMNGenerator(os.path.join(self.output_dir, 'ids.bpmn')).generate_from_context(context)
+        
+        # Überprüfe, ob die IDs innerhalb des Dokuments eindeutig sind
+        process = ElementTree.parse(path).getroot().find(BPMN + 'process')
+        self.assertEqual([task.get('id') for task in process], ['Element_00000001', 'Element_00000002'])
+
+    def test_pretty_output(self):
+        """Test für die kompakte und die eingerückte Ausgabe"""
+        compact = BPMNGenerator(os.path.join(self.output_dir, 'compact.bpmn')).generate_from_context(CONTEXT)
+        pretty = BPMNGenerator(os.path.join(self.output_dir, 'pretty.bpmn'), pretty=True).generate_from_context(CONTEXT)
+        
+        # Überprüfe, ob nur die eingerückte Datei Zeilenumbrüche zwischen den Knoten enthält
+        with open(compact, encoding='utf-8') as f:
+            self.assertNotIn('>\n  <', f.read())
+        with open(pretty, encoding='utf-8') as f:
+            self.assertIn('>\n  <', f.read())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Tests für die DataGenerationPipeline der Bridges.
+
+Diese Tests prüfen das Schreiben der Ausgabedateien mit simulierten LLM-Antworten.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Füge das Quellverzeichnis dem Modulpfad hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.bridges.data_generation_pipeline import DataGenerationPipeline
+
+class TestBridgeDataGenerationPipeline(unittest.TestCase):
+    """Test-Suite für die DataGenerationPipeline der Bridges"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    @patch('src.bridges.data_generation_pipeline.DataGenerator.call_llm',
+           side_effect=[[{'phase_id': 'PH_001', 'phase_name': 'Design'}], RuntimeError("API down")])
+    def test_error_still_writes_files(self, mock_llm):
+        """Test für einen Fehler in einem Schritt nach bereits gespeicherten Ergebnissen"""
+        pipeline = DataGenerationPipeline({}, output_dir=self.output_dir)
+        
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+        
+        # Überprüfe, ob die Datei des ersten Schritts geschrieben und der Schreib-Thread beendet ist
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'process_phases.json')))
+        with self.assertRaises(RuntimeError):
+            pipeline._io_pool.submit(print)
+
+if __name__ == "__main__":
+    unittest.main()
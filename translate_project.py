@@ -7,16 +7,45 @@ Google Translate (googletrans library), and overwrite files in place.
 """
 import os
 import re
+import filecmp
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from googletrans import Translator
 
+# Extensions of the files to translate
+TARGET_SUFFIXES = ('.m', '.md')
+
 def is_target_file(filename):
-    return filename.endswith('.m') or filename.endswith('.md')
+    return filename.endswith(TARGET_SUFFIXES)
 
 # Directories to skip
 SKIP_DIRS = {'output', 'coverage', 'release', 'matlab_codecov_js-ui'}
 
+# Files translated at the same time (each one mostly waits for Google Translate)
+MAX_WORKERS = 8
+
+# Buffer size for reading and writing the files (fewer read/write calls for large files)
+IO_BUFFER_SIZE = 64 * 1024
+
+# One Translator per worker thread (Translator is not documented as thread-safe)
+_local = threading.local()
+
+# Patterns for MATLAB comments (%) and string literals
+COMMENT_PATTERN = re.compile(r'^(?P<indent>\s*%+\s?)(?P<text>.*)$')
+STRING_PATTERN = re.compile(r"(?P<prefix>['\"])(?P<text>[^'\"]+)(?P<suffix>['\"])")
+
+# Texts worth translating contain a word of at least three letters and are not just a
+# path, file name or identifier (e.g. 'data/output.json', 'BPMN_Export')
+NEEDS_TRANSLATION_PATTERN = re.compile(r'[A-Za-zÄÖÜäöüß]{3,}')
+PATHLIKE_PATTERN = re.compile(r'^[\w./-]*[\w-][./_][\w-][\w./-]*$')
+
+def needs_translation(text):
+    """Checks whether a text may contain words to translate"""
+    return NEEDS_TRANSLATION_PATTERN.search(text) is not None and not PATHLIKE_PATTERN.match(text)
+
+
 def translate_text(text, translator):
-    if not text.strip():
+    if not needs_translation(text):
         return text
     try:
         translated = translator.translate(text, src='de', dest='en')
@@ -26,50 +55,65 @@ def translate_text(text, translator):
         return text
 
 
-def process_file(path, translator):
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.readlines()
-
-    output_lines = []
-    # Patterns for MATLAB comments (%) and string literals
-    comment_pattern = re.compile(r'^(?P<indent>\s*%+\s?)(?P<text>.*)$')
-    string_pattern = re.compile(r"(?P<prefix>['"])(?P<text>[^'"]+)(?P<suffix>['"])" )
+def translate_lines(lines, translator):
+    # Transform string literals
+    def repl(match):
+        prefix = match.group('prefix')
+        text = match.group('text')
+        suffix = match.group('suffix')
+        en = translate_text(text, translator)
+        return prefix + en + suffix
 
-    for line in content:
+    for line in lines:
         # Translate comment lines
-        m = comment_pattern.match(line)
+        m = COMMENT_PATTERN.match(line)
         if m:
             prefix = m.group('indent')
             text = m.group('text')
             en = translate_text(text, translator)
-            output_lines.append(prefix + en + '\n')
+            yield prefix + en + '\n'
             continue
 
-        # Transform string literals
-        def repl(match):
-            prefix = match.group('prefix')
-            text = match.group('text')
-            suffix = match.group('suffix')
-            en = translate_text(text, translator)
-            return prefix + en + suffix
+        yield STRING_PATTERN.sub(repl, line)
 
-        new_line = string_pattern.sub(repl, line)
-        output_lines.append(new_line)
 
-    with open(path, 'w', encoding='utf-8') as f:
-        f.writelines(output_lines)
+def process_file(path, translator):
+    # Stream the translated lines into a temporary file, then replace the original
+    tmp_path = path + '.tmp'
+    with open(path, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as src, \
+            open(tmp_path, 'w', encoding='utf-8', buffering=IO_BUFFER_SIZE) as dst:
+        dst.writelines(translate_lines(src, translator))
+    # leave files without changes untouched (keeps their mtime and avoids empty diffs)
+    if filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        print(f"Unchanged: {path}")
+        return
+    os.replace(tmp_path, path)
     print(f"Translated: {path}")
 
 
+def process_file_in_thread(path):
+    if not hasattr(_local, 'translator'):
+        _local.translator = Translator()
+    process_file(path, _local.translator)
+
+
+def iter_targets(root):
+    # scandir entries already know whether they are directories, so no extra stat per name
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # skip unwanted directories
+                if entry.name not in SKIP_DIRS:
+                    yield from iter_targets(entry.path)
+            elif is_target_file(entry.name) and entry.is_file():
+                yield entry.path
+
+
 def main():
-    translator = Translator()
-    for root, dirs, files in os.walk('.'):
-        # skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        for fname in files:
-            if is_target_file(fname):
-                file_path = os.path.join(root, fname)
-                process_file(file_path, translator)
+    # translate several files at once
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(process_file_in_thread, iter_targets('.')))
 
 if __name__ == '__main__':
     main()
@@ -6,14 +6,32 @@ Improved version of the translation script that:
 2. Preserves technical BPMN terms and naming conventions
 3. Fixes formatting issues like newline characters
 4. Ensures consistent capitalization of technical terms
+5. Skips texts that are already English if langdetect is installed (pip install langdetect)
 
 Usage: python translate_project_fixed.py
 """
 import os
 import re
+import mmap
+import filecmp
 import time
-import requests
+import random
 import json
+import hashlib
+import sqlite3
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from langdetect import DetectorFactory, LangDetectException, detect_langs
+    from langdetect.detector_factory import init_factory
+    # Same result for the same text in every run
+    DetectorFactory.seed = 0
+except ImportError:  # langdetect is optional
+    detect_langs = None
 
 # Technical terms dictionary to preserve during translation
 TECHNICAL_TERMS = {
@@ -60,17 +78,104 @@ TECHNICAL_TERMS = {
     'collaboration': 'collaboration',
 }
 
+# All technical terms in one pattern (longest first, so a term never cuts a longer one short),
+# mapped back to their correct form by lowercase match
+TECHNICAL_TERMS_PATTERN = re.compile(
+    '|'.join(re.escape(term) for term in sorted(TECHNICAL_TERMS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+TECHNICAL_TERMS_LOWER = {term.lower(): form for term, form in TECHNICAL_TERMS.items()}
+
+# Extensions of the files to translate
+TARGET_SUFFIXES = ('.m', '.md')
+
 def is_target_file(filename):
     """Checks if a file should be processed for translation."""
-    return filename.endswith('.m') or filename.endswith('.md')
+    return filename.endswith(TARGET_SUFFIXES)
 
 # Directories to skip
 SKIP_DIRS = {'output', 'coverage', 'release', 'matlab_codecov_js-ui', '.git', '.github'}
 
+# Texts per request when a file's texts cannot be translated in one request
+FALLBACK_BATCH_SIZE = 10
+
+# Files translated at the same time (each one mostly waits for the translation API)
+MAX_WORKERS = 8
+
+# Buffer size for reading and writing the files (fewer read/write calls for large files)
+IO_BUFFER_SIZE = 64 * 1024
+
+# HTTP session shared by all requests, so connections (and their TLS handshakes) are reused;
+# the pool holds one connection per worker, and failed connections are retried
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS, max_retries=Retry(total=3, backoff_factor=0.5)))
+
+# Responses that mean the API is rate limiting us, and how often a request is repeated after them
+RATE_LIMIT_STATUS = {429, 503}
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Translations of earlier runs, keyed by the SHA-256 of the source text
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'bpmn_port', 'translations.sqlite3')
+
+# Cached translations loaded into memory for this run, and the database they are stored in
+# (shared by the worker threads, guarded by _cache_lock)
+_cache = {}
+_cache_db = None
+_cache_lock = threading.Lock()
+
+# Patterns for MATLAB comments (%) and function declarations with a comment
+COMMENT_PATTERN = re.compile(r'^(?P<indent>\s*%+\s?)(?P<text>.*)$')
+FUNCTION_DOC_PATTERN = re.compile(r'^(function\s+.*?)\s*(?P<comment>%.*)$')
+
+# German umlauts or ß in UTF-8 (ÄÖÜßäöü), or common German words; files without any
+# of them have nothing to translate
+GERMAN_PATTERN = re.compile(rb'\xc3[\x84\x96\x9c\x9f\xa4\xb6\xbc]|\b(?:der|die|das|und|nicht|ist|mit|Fehler|Prozess)\b')
+
+# Texts worth translating contain a word of at least three letters and are not just a
+# path, file name or identifier (e.g. 'data/output.json', 'BPMN_Export')
+NEEDS_TRANSLATION_PATTERN = re.compile(r'[A-Za-zÄÖÜäöüß]{3,}')
+PATHLIKE_PATTERN = re.compile(r'^[\w./-]*[\w-][./_][\w-][\w./-]*$')
+
+# Texts with fewer words are too short to detect their language reliably and are always translated
+MIN_DETECT_WORDS = 4
+
+# Translatable fragments of other lines (error messages, fprintf messages, string literals),
+# found in one pass; each alternative names its groups <kind>, <kind>_text and <kind>_end
+FRAGMENT_PATTERN = re.compile(
+    r"(?P<error>error\(['\"])(?P<error_text>.*?)(?P<error_end>['\"])"
+    r"|(?P<fprintf>fprintf\([^,]*,['\"])(?P<fprintf_text>.*?)(?P<fprintf_end>['\"])"
+    r"|(?P<string>['\"])(?P<string_text>[^'\"]+)(?P<string_end>['\"])"
+)
+
+def post_with_backoff(url, data, headers):
+    """
+    Send a POST request, waiting and repeating it while the API is rate limiting.
+    Waits as long as the Retry-After header asks, or otherwise exponentially
+    longer with each attempt (with some jitter so the workers do not retry together).
+    
+    Args:
+        url: URL of the request
+        data: Request body
+        headers: Request headers
+        
+    Returns:
+        The last response
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        response = SESSION.post(url, data=data, headers=headers)
+        if response.status_code not in RATE_LIMIT_STATUS or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+        
+        retry_after = response.headers.get('Retry-After', '')
+        delay = int(retry_after) if retry_after.isdigit() else 2 ** attempt + random.random()
+        print(f"Translation API rate limit ({response.status_code}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
 def translate_text_batch(texts, source_lang='de', target_lang='en'):
     """
     Translate text using a free machine translation API.
     Uses LibreTranslate which is more reliable for this purpose.
+    All texts are sent in one request (LibreTranslate accepts a list of texts).
     
     Args:
         texts: List of texts to translate
@@ -78,7 +183,8 @@ def translate_text_batch(texts, source_lang='de', target_lang='en'):
         target_lang: Target language code
         
     Returns:
-        List of translated texts
+        List of translated texts, or None if the request failed or did not
+        return one translation per text
     """
     if not texts:
         return []
@@ -101,32 +207,109 @@ def translate_text_batch(texts, source_lang='de', target_lang='en'):
     headers = {"Content-Type": "application/json"}
     
     try:
-        # Add delay to avoid rate limiting
-        time.sleep(1)
-        response = requests.post(url, data=json.dumps(payload), headers=headers)
+        response = post_with_backoff(url, json.dumps(payload), headers)
         
         if response.status_code == 200:
-            translations = response.json().get('translatedText', non_empty_texts)
+            translations = response.json().get('translatedText')
+            if not isinstance(translations, list) or len(translations) != len(non_empty_texts):
+                print(f"Translation API returned an unexpected result for {len(non_empty_texts)} texts")
+                return None
             # Map results back to original text list positions
-            result = []
-            empty_idx = 0
-            for t in texts:
-                if not t.strip():
-                    result.append('')
-                else:
-                    if empty_idx < len(translations):
-                        result.append(translations[empty_idx])
-                        empty_idx += 1
-                    else:
-                        result.append(t)
-            return result
+            translations = iter(translations)
+            return [next(translations) if t.strip() else '' for t in texts]
         else:
             print(f"Translation API error: {response.status_code} - {response.text}")
-            return non_empty_texts
+            return None
             
     except Exception as e:
         print(f"Translation error: {str(e)}")
-        return non_empty_texts
+        return None
+
+def cache_key(text):
+    """Returns the key of a source text in the translation cache"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def load_cache():
+    """Open the translation cache and load its entries into memory (once per run)"""
+    global _cache_db
+    with _cache_lock:
+        if _cache_db is not None:
+            return
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            _cache_db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+            _cache_db.execute("CREATE TABLE IF NOT EXISTS translations (hash TEXT PRIMARY KEY, translation TEXT)")
+            _cache.update(_cache_db.execute("SELECT hash, translation FROM translations"))
+            print(f"Loaded {len(_cache)} cached translations from {CACHE_PATH}")
+        except (OSError, sqlite3.Error) as e:
+            print(f"Translation cache not available, continuing without it: {str(e)}")
+            _cache_db = False
+
+def save_cache(texts, translations):
+    """Store new translations in memory and in the cache database"""
+    entries = [(cache_key(t), tr) for t, tr in zip(texts, translations)]
+    with _cache_lock:
+        _cache.update(entries)
+        if not _cache_db:
+            return
+        try:
+            with _cache_db:
+                _cache_db.executemany("INSERT OR REPLACE INTO translations (hash, translation) VALUES (?, ?)", entries)
+        except sqlite3.Error as e:
+            print(f"Could not write translation cache: {str(e)}")
+
+def translate_texts(texts):
+    """
+    Translate all texts of a file, with a single request if possible.
+    Texts translated before (in this or an earlier run) are taken from the cache,
+    and texts occurring several times are only translated once.
+    
+    Args:
+        texts: List of texts to translate
+        
+    Returns:
+        List of translated texts; texts of a failed batch are kept unchanged
+    """
+    load_cache()
+    # Cache key of each distinct text, in order of first occurrence
+    keys = {t: cache_key(t) for t in dict.fromkeys(texts)}
+    missing = [t for t, key in keys.items() if key not in _cache]
+    
+    if missing:
+        translated = translate_text_batch(missing)
+        if translated is not None:
+            save_cache(missing, translated)
+        else:
+            # Retry in smaller batches (e.g., if the whole file was too large for one request)
+            print(f"Retrying in batches of {FALLBACK_BATCH_SIZE} texts")
+            for i in range(0, len(missing), FALLBACK_BATCH_SIZE):
+                batch = missing[i:i+FALLBACK_BATCH_SIZE]
+                translated = translate_text_batch(batch)
+                if translated is not None:
+                    save_cache(batch, translated)
+    
+    return [_cache.get(keys[t], t) for t in texts]
+
+def needs_translation(text):
+    """Checks whether a text may contain words to translate"""
+    return NEEDS_TRANSLATION_PATTERN.search(text) is not None and not PATHLIKE_PATTERN.match(text)
+
+def is_german(text):
+    """
+    Checks with langdetect (if installed) whether a text may be German
+    
+    Args:
+        text: Text to check
+        
+    Returns:
+        False only if the text is long enough and German is not among its likely languages
+    """
+    if detect_langs is None or len(text.split()) < MIN_DETECT_WORDS:
+        return True
+    try:
+        return any(language.lang == 'de' for language in detect_langs(text))
+    except LangDetectException:
+        return True
 
 def fix_newlines(text):
     """Fix incorrectly formatted newline characters"""
@@ -134,141 +317,167 @@ def fix_newlines(text):
 
 def preserve_technical_terms(text):
     """Replace technical terms with placeholders before translation"""
-    for term, placeholder in TECHNICAL_TERMS.items():
-        # Match term with various capitalizations and replace with correct form
-        pattern = re.compile(re.escape(term), re.IGNORECASE)
-        text = pattern.sub(placeholder, text)
-    return text
+    # Match terms with various capitalizations and replace them with the correct form
+    return TECHNICAL_TERMS_PATTERN.sub(lambda m: TECHNICAL_TERMS_LOWER[m.group(0).lower()], text)
+
+def has_german_text(path):
+    """
+    Quickly check whether a file may contain German text
+    
+    Args:
+        path: Path of the file
+        
+    Returns:
+        True if the file contains an umlaut or a common German word
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        # Scan the mapped file without decoding it or splitting it into lines
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return GERMAN_PATTERN.search(data) is not None
 
 def process_file(path):
     """Process a single file for translation"""
+    if not has_german_text(path):
+        print(f"Skipping (no German text): {path}")
+        return True
+    
     print(f"Processing: {path}")
     
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.readlines()
+    # Collect the distinct texts for batch translation, in order of first occurrence
+    texts_to_translate = {}
+    line_types = []  # Store type of each line for processing (the lines are read again when writing)
 
-    # Collect texts for batch translation
-    texts_to_translate = []
-    line_types = []  # Store type of each line for processing
+    with open(path, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+        for line in f:
+            # Check for comment lines
+            m = COMMENT_PATTERN.match(line)
+            if m:
+                text = m.group('text')
+                texts_to_translate[text] = None
+                line_types.append(('comment', m.group('indent'), text))
+                continue
 
-    # Patterns for MATLAB comments (%) and string literals
-    comment_pattern = re.compile(r'^(?P<indent>\s*%+\s?)(?P<text>.*)$')
-    string_pattern = re.compile(r"(?P<prefix>['\"])(?P<text>[^'\"]+)(?P<suffix>['\"])")
-    
-    # Additional patterns for MATLAB-specific elements
-    error_pattern = re.compile(r'(error\([\'"])(?P<text>.*?)([\'"])')
-    fprintf_pattern = re.compile(r'(fprintf\([^,]*,[\'"])(?P<text>.*?)([\'"])')
-    function_doc_pattern = re.compile(r'^(function\s+.*?)\s*(?P<comment>%.*)$')
-
-    for line in content:
-        # Check for comment lines
-        m = comment_pattern.match(line)
-        if m:
-            texts_to_translate.append(m.group('text'))
-            line_types.append(('comment', m.group('indent')))
-            continue
-
-        # Check for function declaration with comment
-        m = function_doc_pattern.match(line)
-        if m:
-            texts_to_translate.append(m.group('comment')[1:].strip())
-            line_types.append(('function_doc', m.group(1)))
-            continue
-            
-        # For other lines, collect all translatable parts
-        line_texts = []
-        
-        # Extract error messages
-        for m in error_pattern.finditer(line):
-            line_texts.append(('error', m.group(1), m.group('text'), m.group(3)))
+            # Check for function declaration with comment
+            m = FUNCTION_DOC_PATTERN.match(line)
+            if m:
+                text = m.group('comment')[1:].strip()
+                texts_to_translate[text] = None
+                line_types.append(('function_doc', m.group(1), text))
+                continue
             
-        # Extract fprintf messages
-        for m in fprintf_pattern.finditer(line):
-            line_texts.append(('fprintf', m.group(1), m.group('text'), m.group(3)))
+            # For other lines, collect all translatable parts
+            # (start, end) of each fragment's text within the line
+            line_texts = []
+            for m in FRAGMENT_PATTERN.finditer(line):
+                # The closing quote is the last group of the matched alternative
+                kind = m.lastgroup[:-len('_end')]
+                line_texts.append(m.span(kind + '_text'))
             
-        # Extract string literals
-        for m in string_pattern.finditer(line):
-            line_texts.append(('string', m.group('prefix'), m.group('text'), m.group('suffix')))
-            
-        if line_texts:
-            texts_to_translate.extend([t[2] for t in line_texts])
-            line_types.append(('mixed', line, line_texts))
-        else:
-            line_types.append(('unchanged', line))
-            
-    # Process texts in batches to optimize API usage
-    batch_size = 10
-    all_translated = []
+            if line_texts:
+                texts_to_translate.update((line[start:end], None) for start, end in line_texts)
+                line_types.append(('mixed', line_texts))
+            else:
+                line_types.append(('unchanged',))
+
+    # Translate all texts of the file at once to minimize API round trips
+    # (texts without words, such as numbers or paths, and texts detected as another language are kept)
+    candidates = [t for t in texts_to_translate if needs_translation(t) and is_german(t)]
+    translated = translate_texts([preserve_technical_terms(t) for t in candidates])
+    translations = {t: fix_newlines(tr) for t, tr in zip(candidates, translated)}
+    
+    # Write the translated content to a temporary file, then replace the original
+    tmp_path = path + '.tmp'
+    with open(path, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as src, \
+            open(tmp_path, 'w', encoding='utf-8', buffering=IO_BUFFER_SIZE) as dst:
+        dst.writelines(reconstruct_lines(src, line_types, translations))
     
-    for i in range(0, len(texts_to_translate), batch_size):
-        batch = texts_to_translate[i:i+batch_size]
-        batch = [preserve_technical_terms(t) for t in batch]
-        translated_batch = translate_text_batch(batch)
-        translated_batch = [fix_newlines(t) for t in translated_batch]
-        all_translated.extend(translated_batch)
+    # Leave files without changes untouched (keeps their mtime and avoids empty diffs)
+    if filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        print(f"Unchanged: {path}")
+        return True
+    os.replace(tmp_path, path)
     
-    # Reconstruct the file with translations
-    output_lines = []
-    translated_idx = 0
+    print(f"Successfully translated: {path}")
+    return True
+
+def reconstruct_lines(lines, line_types, translations):
+    """
+    Rebuild the lines of a file with the translated texts
     
-    for line_type in line_types:
+    Args:
+        lines: The original lines of the file
+        line_types: Line types recorded by process_file, one per line
+        translations: Translation of each source text; texts without one are kept
+        
+    Yields:
+        The lines of the translated file
+    """
+    for original_line, line_type in zip(lines, line_types):
         if line_type[0] == 'comment':
-            output_lines.append(f"{line_type[1]}{all_translated[translated_idx]}\n")
-            translated_idx += 1
+            yield f"{line_type[1]}{translations.get(line_type[2], line_type[2])}\n"
             
         elif line_type[0] == 'function_doc':
-            output_lines.append(f"{line_type[1]} % {all_translated[translated_idx]}\n")
-            translated_idx += 1
+            yield f"{line_type[1]} % {translations.get(line_type[2], line_type[2])}\n"
             
         elif line_type[0] == 'mixed':
-            original_line = line_type[1]
-            fragments = line_type[2]
+            # Put each translation in place of its fragment, keeping the text in between
+            parts = []
+            last_end = 0
+            for start, end in line_type[1]:
+                text = original_line[start:end]
+                parts.append(original_line[last_end:start])
+                parts.append(translations.get(text, text))
+                last_end = end
+            parts.append(original_line[last_end:])
             
-            for fragment in fragments:
-                frag_type, prefix, text, suffix = fragment
-                translated_text = all_translated[translated_idx]
-                translated_idx += 1
-                
-                if frag_type == 'error':
-                    original_line = original_line.replace(f"{prefix}{text}{suffix}", f"{prefix}{translated_text}{suffix}")
-                elif frag_type == 'fprintf':
-                    original_line = original_line.replace(f"{prefix}{text}{suffix}", f"{prefix}{translated_text}{suffix}")
-                elif frag_type == 'string':
-                    original_line = original_line.replace(f"{prefix}{text}{suffix}", f"{prefix}{translated_text}{suffix}")
-                    
-            output_lines.append(original_line)
+            yield ''.join(parts)
             
         else:  # unchanged
-            output_lines.append(line_type[0][1])
-    
-    # Write the translated content back to the file
-    with open(path, 'w', encoding='utf-8') as f:
-        f.writelines(output_lines)
+            yield original_line
+
+def try_process_file(file_path):
+    """Process a file, reporting errors instead of raising them"""
+    try:
+        return process_file(file_path)
+    except Exception as e:
+        print(f"Error processing {file_path}: {str(e)}")
+        return False
+
+def iter_targets(root):
+    """
+    Find the files to translate below a directory
     
-    print(f"Successfully translated: {path}")
-    return True
+    Args:
+        root: Directory to search
+        
+    Yields:
+        Paths of the target files
+    """
+    # scandir entries already know whether they are directories, so no extra stat per name
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # Skip unwanted directories
+                if entry.name not in SKIP_DIRS and not entry.name.startswith('.'):
+                    yield from iter_targets(entry.path)
+            elif is_target_file(entry.name) and entry.is_file():
+                yield entry.path
 
 def main():
-    success_count = 0
-    error_count = 0
-    
     print("Starting improved translation of MATLAB and Markdown files...")
     
-    for root, dirs, files in os.walk('.'):
-        # Skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
-        
-        for fname in files:
-            if is_target_file(fname):
-                file_path = os.path.join(root, fname)
-                try:
-                    if process_file(file_path):
-                        success_count += 1
-                    else:
-                        error_count += 1
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
-                    error_count += 1
+    # Load the language profiles once, before the worker threads use them
+    if detect_langs is not None:
+        init_factory()
+    
+    # Translate several files at once
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(try_process_file, iter_targets('.')))
+    success_count = sum(1 for ok in results if ok)
+    error_count = len(results) - success_count
     
     print(f"Translation complete. Successfully processed: {success_count} files, Errors: {error_count}")
 